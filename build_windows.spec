@@ -7,7 +7,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'selenium.webdriver'],
+    hiddenimports=['PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets', 'selenium.webdriver',
+                   'src.automation.worker', 'webdriver_manager.chrome', 'psutil'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -2,16 +2,26 @@
 城北中央公園テニスコート予約システム
 メインエントリーポイント
 """
+# 起動時間の計測を最初に開始する
+from src.utils.startup import startup_timer
+
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import QTimer
+
+startup_timer.mark("PyQt5の読み込み")
 
+# 自動化モジュール（selenium等）はここでは読み込まず、ウィンドウ表示後に読み込む
 from src.gui.main_window import JohokuApp
 
+startup_timer.mark("メインウィンドウの読み込み")
+
 
 def main():
     """メインアプリケーションを起動"""
     app = QApplication(sys.argv)
+    startup_timer.mark("QApplicationの作成")
 
     # アプリケーションスタイルを設定（オプション - システムに応じたスタイルを適用）
     app.setStyle("Fusion")
@@ -25,6 +35,14 @@ def main():
     # メインウィンドウを作成して表示
     window = JohokuApp()
     window.show()
+    startup_timer.mark("ウィンドウの表示")
+
+    def on_event_loop_started():
+        startup_timer.mark("イベントループの開始")
+        # 画面が表示されてから自動化モジュールをバックグラウンドで読み込む
+        window.preload_automation()
+
+    QTimer.singleShot(0, on_event_loop_started)
 
     # イベントループを開始
     sys.exit(app.exec_())
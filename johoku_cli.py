@@ -0,0 +1,10 @@
+"""
+城北中央公園テニスコート予約システム
+コマンドライン版のエントリーポイント（画面を使わずに各タスクを実行する）
+"""
+import sys
+
+from src.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,7 @@ APP = ['johoku_app.py']
 DATA_FILES = []
 OPTIONS = {
     'argv_emulation': False,
-    'packages': ['PyQt5', 'pandas', 'selenium', 'webdriver_manager'],
+    'packages': ['PyQt5', 'selenium', 'webdriver_manager', 'requests', 'psutil'],
     'includes': ['sip', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets'],
     'excludes': ['tkinter', 'matplotlib', 'scipy'],
     'qt_plugins': plugins_path,
@@ -0,0 +1,161 @@
+"""アカウントCSVを1行ずつ読み込むモジュール（ファイル全体をメモリに載せない）"""
+import csv
+import re
+
+# Excelで保存したCSVの先頭に付くBOMも取り除く
+CSV_ENCODING = "utf-8-sig"
+
+BOOKING_DATE_PATTERN = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$")
+
+
+class AccountFileError(Exception):
+    """アカウントCSVの列や値が正しくない場合の例外"""
+
+
+def parse_shard(value):
+    """"2/4" のような分割指定を (2, 4) に変換する（None や空文字はNone）"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (tuple, list)):
+        index, count = value
+    else:
+        index, _, count = str(value).partition("/")
+    try:
+        index, count = int(index), int(count)
+    except (TypeError, ValueError):
+        raise ValueError(f"分割の指定が正しくありません（例: 1/4）: {value}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"分割の指定が正しくありません（1～{count}/{count} の範囲で指定してください）: {value}")
+    return index, count
+
+
+class Account:
+    """CSVの1行分のアカウント情報"""
+
+    __slots__ = ("line", "user_number", "password", "booking_date", "time_code", "name", "kana")
+
+    def __init__(self, line, user_number, password, booking_date="", time_code="", name="", kana=""):
+        self.line = line  # CSVの行番号（ヘッダーが1行目）
+        self.user_number = user_number
+        self.password = password
+        self.booking_date = booking_date
+        self.time_code = time_code
+        self.name = name
+        self.kana = kana
+
+    @property
+    def display_name(self):
+        """結果ファイルに出力する氏名（Kana → Name → 利用者番号の順に使う）"""
+        return self.kana or self.name or self.user_number
+
+    def __repr__(self):
+        return f"Account(line={self.line}, user_number={self.user_number!r})"
+
+
+class AccountSource:
+    """
+    アカウントCSVを先頭から順に読み込むクラス。
+    validate() でファイル全体を1回だけ検査して件数を数え、反復するたびにファイルを読み直します。
+    skip を指定すると、skip(account) がTrueになるアカウントを件数にも反復にも含めません。
+    shard=(i, N) を指定すると、データ行をN個に分けたうちi番目（CSVの順に i, i+N, i+2N, ... 件目）だけを扱います。
+    """
+
+    def __init__(self, path, required=("user_number", "password"), skip=None, shard=None):
+        self.path = path
+        self.required = tuple(required)
+        self.skip = skip
+        self.shard = parse_shard(shard)
+        self.fieldnames = []
+        self.skipped = 0
+        self._count = None
+
+    def _open(self):
+        return open(self.path, "r", encoding=CSV_ENCODING, newline="")
+
+    def rows(self):
+        """CSVの各行を辞書（列名 -> 文字列）として順に返す"""
+        with self._open() as file:
+            reader = csv.DictReader(file)
+            self.fieldnames = list(reader.fieldnames or [])
+            for row in reader:
+                # 空行は読み飛ばす
+                if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                    continue
+                yield reader.line_num, row
+
+    def _selected_rows(self):
+        """分割の指定に含まれる行だけを返す（skip による除外の前に分けるため、再開しても担当は変わらない）"""
+        if self.shard is None:
+            yield from self.rows()
+            return
+        index, count = self.shard
+        for position, (line, row) in enumerate(self.rows()):
+            if position % count == index - 1:
+                yield line, row
+
+    def _check(self, line, row):
+        errors = []
+        for column in self.required:
+            if not (row.get(column) or "").strip():
+                errors.append(f"{line}行目: {column} が空です")
+        booking_date = (row.get("booking_date") or "").strip()
+        if "booking_date" in self.required and booking_date and not BOOKING_DATE_PATTERN.match(booking_date):
+            errors.append(f"{line}行目: booking_date の形式が正しくありません（例: 2025-05-02）: {booking_date}")
+        time_code = (row.get("time_code") or "").strip()
+        if "time_code" in self.required and time_code and not time_code.isdigit():
+            errors.append(f"{line}行目: time_code が数値ではありません: {time_code}")
+        return errors
+
+    def validate(self, max_errors=10):
+        """必要な列と各行の値を検査して件数を返す（問題があればAccountFileErrorを送出）"""
+        count = 0
+        skipped = 0
+        errors = []
+        for line, row in self._selected_rows():
+            if self.skip is not None and self.skip(self._account(line, row)):
+                skipped += 1
+                continue
+            count += 1
+            if len(errors) < max_errors:
+                errors.extend(self._check(line, row))
+
+        missing = [c for c in self.required if c not in self.fieldnames]
+        if missing:
+            raise AccountFileError(f"{self.path} に必要な列がありません: {', '.join(missing)}")
+        if errors:
+            raise AccountFileError("アカウントCSVに誤りがあります:\n" + "\n".join(errors[:max_errors]))
+
+        self._count = count
+        self.skipped = skipped
+        return count
+
+    def __len__(self):
+        if self._count is None:
+            self.validate()
+        return self._count
+
+    @staticmethod
+    def _account(line, row):
+        return Account(
+            line,
+            row.get("user_number") or "",
+            row.get("password") or "",
+            (row.get("booking_date") or "").strip(),
+            (row.get("time_code") or "").strip(),
+            row.get("Name") or "",
+            row.get("Kana") or "",
+        )
+
+    def __iter__(self):
+        for line, row in self._selected_rows():
+            account = self._account(line, row)
+            if self.skip is not None and self.skip(account):
+                continue
+            yield account
+
+
+def load_accounts(path, required=("user_number", "password"), skip=None, shard=None):
+    """アカウントCSVを検査し、1行ずつ読み込むAccountSourceを返す"""
+    source = AccountSource(path, required, skip, shard)
+    source.validate()
+    return source
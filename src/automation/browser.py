@@ -1,10 +1,68 @@
 """ブラウザ設定モジュール"""
+import os
+import importlib.util
+import logging
+import subprocess
 from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
 
+from ..config import DEFAULT_BROWSER_PROFILE
+from .dialogs import enable_dialog_capture
+from .network_capture import enable_network_capture
+from .driver_resolver import resolve_chromedriver
 
-def setup_chrome_options(headless=True):
+# webdriver-managerのログを無効化（警告ダイアログを非表示に）
+os.environ['WDM_LOG_LEVEL'] = '0'
+os.environ['WDM_LOG'] = 'false'
+os.environ['WDM_PRINT_FIRST_LINE'] = 'False'
+logging.getLogger('WDM').setLevel(logging.ERROR)
+
+# 「高速」プロファイルで読み込まないURL（画像・フォント・動画・アクセス解析）
+BLOCKED_RESOURCE_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "ogg", "mp3", "wav",
+]
+BLOCKED_URL_PATTERNS = (
+    [f"*.{ext}" for ext in BLOCKED_RESOURCE_EXTENSIONS]
+    + [f"*.{ext}?*" for ext in BLOCKED_RESOURCE_EXTENSIONS]
+    + ["*google-analytics.com*", "*googletagmanager.com*", "*/analytics.js*"]
+)
+
+# プロファイルごとの設定
+# page_load_strategy: "normal" は画像等の読み込み完了まで、"eager" はDOMの構築完了まで待つ
+BROWSER_PROFILE_SETTINGS = {
+    "standard": {
+        "page_load_strategy": "normal",
+        "blocked_urls": [],
+        "arguments": [],
+        "prefs": {},
+    },
+    "fast": {
+        "page_load_strategy": "eager",
+        "blocked_urls": BLOCKED_URL_PATTERNS,
+        "arguments": [
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+        ],
+        # タブごとのURLブロックが効く前に開いたページでも画像を読み込まない
+        "prefs": {"profile.managed_default_content_settings.images": 2},
+    },
+}
+
+
+def get_profile_settings(profile):
+    """プロファイル名から設定を返す（不明な名前は標準とする）"""
+    return BROWSER_PROFILE_SETTINGS.get(profile) or BROWSER_PROFILE_SETTINGS[DEFAULT_BROWSER_PROFILE]
+
+
+def setup_chrome_options(headless=True, profile=DEFAULT_BROWSER_PROFILE):
     """Chromeブラウザのオプションを設定する関数"""
     options = webdriver.ChromeOptions()
+    settings = get_profile_settings(profile)
 
     if headless:
         # ヘッドレスモードを有効化
@@ -23,4 +81,92 @@ def setup_chrome_options(headless=True):
     options.add_argument('--disable-extensions')  # 拡張機能を無効化
     options.add_argument('--disable-popup-blocking')  # ポップアップブロックを無効化
 
+    # alert/confirm はDevToolsのイベントとして記録し、自動でOKを押す
+    enable_dialog_capture(options)
+    # ページが読み込んだ応答も記録し、画面の表示を待たずに情報を取り出せるようにする
+    enable_network_capture(options)
+
+    # プロファイルごとの読み込み設定
+    options.page_load_strategy = settings["page_load_strategy"]
+    for argument in settings["arguments"]:
+        options.add_argument(argument)
+    if settings["prefs"]:
+        options.add_experimental_option("prefs", settings["prefs"])
+
     return options
+
+
+def apply_profile(driver, profile=DEFAULT_BROWSER_PROFILE):
+    """
+    現在のタブにプロファイルのURLブロックを設定する（DevToolsの設定はタブごとのため、新しいタブを開くたびに呼び出す）。
+    設定できなかった場合はFalseを返します（ページは通常どおり読み込まれます）。
+    """
+    blocked_urls = get_profile_settings(profile)["blocked_urls"]
+    if not blocked_urls:
+        return True
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        return True
+    except Exception:
+        return False
+
+
+def recycle_tab(driver, profile=DEFAULT_BROWSER_PROFILE):
+    """
+    作業用のタブを1つだけ残して他のタブを閉じ、Cookieとストレージを消去して空白ページに戻す。
+    アカウントごとに新しいタブを開く代わりに呼び出し、タブが増え続けないようにします。
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    try:
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+    except Exception:
+        pass
+    try:
+        # 全てのドメインのCookieを消去する（delete_all_cookies は表示中のドメインのみ）
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception:
+        driver.delete_all_cookies()
+    driver.get("about:blank")
+    apply_profile(driver, profile)
+
+
+def psutil_available():
+    """メモリ使用量の取得に使う psutil が使えるかを返す"""
+    return importlib.util.find_spec("psutil") is not None
+
+
+def browser_memory_mb(driver):
+    """ChromeDriverとChrome（子プロセスを含む）のメモリ使用量（MB）を返す（psutil がなければNone）"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        total = 0
+        for process in [root] + root.children(recursive=True):
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def create_driver(headless=True, extra_arguments=None, profile=DEFAULT_BROWSER_PROFILE):
+    """Chromeブラウザを起動してドライバーを返す関数"""
+    options = setup_chrome_options(headless, profile)  # ヘッドレスモード設定を渡す
+    for argument in extra_arguments or []:
+        options.add_argument(argument)
+    # ChromeDriverのパスは1回だけ解決し、再起動時は使い回す
+    service = Service(resolve_chromedriver(), log_output=subprocess.DEVNULL)
+    driver = webdriver.Chrome(service=service, options=options)
+    apply_profile(driver, profile)
+    return driver
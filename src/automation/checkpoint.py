@@ -0,0 +1,91 @@
+"""抽選申込の進捗を記録し、中断した実行を再開するためのモジュール"""
+import os
+import json
+import zlib
+import threading
+from datetime import datetime
+
+# 再開時にスキップする結果（申込み済みと確認できたもの）
+DONE_OUTCOMES = ("applied", "already_applied")
+
+
+def checkpoint_path(directory, csv_file, apply_number_text):
+    """CSVファイルと申込み種類の組み合わせごとの記録ファイルのパスを返す"""
+    stem = os.path.splitext(os.path.basename(csv_file))[0]
+    digest = zlib.crc32(f"{os.path.abspath(csv_file)}|{apply_number_text}".encode("utf-8"))
+    return os.path.join(directory, "checkpoints", f"lottery_{stem}_{digest:08x}.jsonl")
+
+
+class CheckpointJournal:
+    """
+    アカウントごとの処理結果を1行ずつ追記する記録（JSON Lines形式）。
+    resume=True の場合は既存の記録を読み込み、申込み済みのアカウントを判定できるようにします。
+    resume=False の場合は記録を新しく作り直します。
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if resume:
+            self._load()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def key(user_number, booking_date, time_code, apply_number_text):
+        return (str(user_number), str(booking_date), str(time_code), str(apply_number_text))
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 書き込み途中で終了した最後の行は無視する
+                        continue
+                    key = self.key(entry.get("user_number"), entry.get("booking_date"),
+                                   entry.get("time_code"), entry.get("apply_number"))
+                    if entry.get("outcome") in DONE_OUTCOMES:
+                        self.done.add(key)
+                    else:
+                        # 後から失敗した記録があれば、その時点の結果を優先する
+                        self.done.discard(key)
+        except OSError:
+            pass
+
+    def is_done(self, account, apply_number_text):
+        """前回までの実行で申込み済みと確認できたアカウントならTrue（今回の実行の結果は含めない）"""
+        return self.key(account.user_number, account.booking_date, account.time_code, apply_number_text) in self.done
+
+    def record(self, account, apply_number_text, step, outcome, elapsed=None):
+        """1アカウント分の結果を追記し、すぐにディスクへ書き出す"""
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "user_number": account.user_number,
+            "booking_date": account.booking_date,
+            "time_code": account.time_code,
+            "apply_number": apply_number_text,
+            "step": step,
+            "outcome": outcome,
+        }
+        if elapsed is not None:
+            entry["elapsed"] = round(elapsed, 2)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            try:
+                os.fsync(self._file.fileno())
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
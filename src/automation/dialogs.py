@@ -0,0 +1,140 @@
+"""ブラウザのダイアログ（alert/confirm）を記録するモジュール"""
+import time
+import threading
+import weakref
+
+from .perf_log import PerformanceLog
+
+# ダイアログが表示される可能性のある操作の後、イベントの到着を待つ時間（秒）
+DIALOG_GRACE = 0.5
+
+# DevToolsのイベントを読み取る間隔（秒）
+POLL_INTERVAL = 0.05
+
+DIALOG_EVENT = "Page.javascriptDialogOpening"
+
+
+def enable_dialog_capture(options):
+    """
+    Chromeのオプションに、ダイアログをDevToolsのイベントとして記録する設定を追加する。
+    Page ドメインのイベント（Page.javascriptDialogOpening）はパフォーマンスログから読み取り、
+    ダイアログ自体は ChromeDriver が自動でOKを押して閉じます。
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": False, "enablePage": True})
+    options.unhandled_prompt_behavior = "accept"
+    return options
+
+
+class Dialog:
+    """表示されたダイアログ1件分の記録"""
+
+    __slots__ = ("type", "message", "url", "timestamp")
+
+    def __init__(self, type, message, url="", timestamp=None):
+        self.type = type
+        self.message = message
+        self.url = url
+        self.timestamp = timestamp or time.time()
+
+    def __repr__(self):
+        return f"Dialog({self.type!r}, {self.message!r})"
+
+
+class DialogMonitor:
+    """
+    ドライバーごとにダイアログの表示を記録するクラス。
+    DevToolsのイベントが読み取れない環境では、表示中のアラートを直接確認してOKを押します。
+    """
+
+    _monitors = weakref.WeakKeyDictionary()
+    _monitors_lock = threading.Lock()
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.supported = True
+        self.history = []
+        self._pending = []
+
+    @classmethod
+    def for_driver(cls, driver):
+        """ドライバーに対応する DialogMonitor を返す（同じドライバーには同じインスタンス）"""
+        with cls._monitors_lock:
+            monitor = cls._monitors.get(driver)
+            if monitor is None:
+                monitor = cls(driver)
+                cls._monitors[driver] = monitor
+            return monitor
+
+    def poll(self):
+        """新しく表示されたダイアログを読み取り、その件数を返す"""
+        found = self._read_events() if self.supported else []
+        if found or not self.supported:
+            # まだ閉じられていないダイアログがあればOKを押す（イベントがない環境ではここで検出する）
+            shown = self._accept_open()
+            if shown is not None and not found:
+                found.append(shown)
+        self.history.extend(found)
+        self._pending.extend(found)
+        return len(found)
+
+    def _read_events(self):
+        log = PerformanceLog.for_driver(self.driver)
+        log.watch(DIALOG_EVENT)
+        events = log.take(DIALOG_EVENT)
+        if not log.supported:
+            self.supported = False
+            return []
+
+        return [
+            Dialog(params.get("type", ""), params.get("message", ""), params.get("url", ""), timestamp / 1000 or None)
+            for params, timestamp in events
+        ]
+
+    def _accept_open(self):
+        try:
+            alert = self.driver.switch_to.alert
+            text = alert.text
+            alert.accept()
+            return Dialog("alert", text)
+        except Exception:
+            return None
+
+    def pending(self):
+        """まだ take() で受け取っていないダイアログの件数を返す"""
+        self.poll()
+        return len(self._pending)
+
+    def take(self):
+        """まだ受け取っていないダイアログを返す"""
+        self.poll()
+        taken, self._pending = self._pending, []
+        return taken
+
+    def wait(self, timeout=DIALOG_GRACE, fallback_timeout=None):
+        """
+        ダイアログが表示されるまで最大 timeout 秒待機し、表示されたものを返す。
+        ダイアログはイベントとして記録されるため、表示されない場合も短い待機で済みます。
+        イベントが読み取れない環境では fallback_timeout 秒（省略時は timeout 秒）まで待機します。
+        """
+        self.poll()
+        limit = timeout if self.supported else (fallback_timeout or timeout)
+        deadline = time.perf_counter() + limit
+        while not self._pending and time.perf_counter() < deadline:
+            time.sleep(POLL_INTERVAL)
+            self.poll()
+        return self.take()
+
+    def find(self, text):
+        """clear() 以降に表示されたダイアログのうち、メッセージに text を含むものを返す"""
+        self.poll()
+        for dialog in self.history:
+            if text in dialog.message:
+                return dialog
+        return None
+
+    def clear(self):
+        """これまでの記録を破棄する（アカウントの処理や操作をやり直す前に呼び出す）"""
+        self.poll()
+        self.history = []
+        self._pending = []
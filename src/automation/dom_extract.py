@@ -0,0 +1,93 @@
+"""表示中の画面から表の内容を1回のJavaScript呼び出しでまとめて取得するモジュール"""
+
+# 表の各行から列ごとのテキストを取り出すスクリプト
+# columns は {列名: CSSセレクタ} または {列名: [CSSセレクタ, 何番目の一致か]} の形式
+EXTRACT_TABLE_SCRIPT = """
+const [tableSelector, rowSelector, columns, skipRows, clickSelector] = arguments;
+const tables = document.querySelectorAll(tableSelector);
+if (!tables.length) {
+    return null;
+}
+const records = [];
+tables.forEach(table => {
+    const rows = Array.from(table.querySelectorAll(rowSelector)).slice(skipRows);
+    rows.forEach(row => {
+        const record = {};
+        for (const [name, spec] of Object.entries(columns)) {
+            const [selector, index] = Array.isArray(spec) ? spec : [spec, 0];
+            const cell = row.querySelectorAll(selector)[index];
+            record[name] = cell ? cell.innerText.trim() : null;
+        }
+        if (clickSelector) {
+            const target = row.querySelector(clickSelector);
+            record.clicked = !!target;
+            if (target) {
+                target.click();
+            }
+        }
+        records.push(record);
+    });
+});
+return records;
+"""
+
+
+def extract_table_records(driver, table_selector, row_selector, columns, skip_rows=0, click_selector=None):
+    """
+    表の全行を1回のexecute_scriptで取得する関数。
+    表が存在しない場合はNone、行がない場合は空のリストを返します。
+    click_selector を指定すると、各行でその要素をクリックします（チェックボックスの選択など）。
+    """
+    return driver.execute_script(EXTRACT_TABLE_SCRIPT, table_selector, row_selector, columns, skip_rows, click_selector)
+
+
+def extract_lottery_applications(driver):
+    """抽選申込みの確認画面（table.sp-block-table）から申込情報を取得する"""
+    records = extract_table_records(
+        driver,
+        "table.table.sp-block-table",
+        "tbody tr",
+        {
+            'status': ":scope > td:nth-of-type(2)",
+            'category': ":scope > td:nth-of-type(3)",
+            'facility': ":scope > td:nth-of-type(4)",
+            'date': ":scope > td:nth-of-type(5)",
+            'time': ":scope > td:nth-of-type(6)",
+        }
+    )
+    return [{k: (v or "") for k, v in record.items()} for record in records or []]
+
+
+def extract_reservations(driver):
+    """予約の確認画面（#rsvacceptlist）から予約情報を取得する（表がない場合はNone）"""
+    records = extract_table_records(
+        driver,
+        "#rsvacceptlist",
+        "tr",
+        {
+            'date': ["td[class='keep-wide']", 0],
+            'time': ["td[class='keep-wide']", 1],
+        },
+        skip_rows=1  # 最初の行はヘッダーなのでスキップ
+    )
+    if records is None:
+        return None
+    return [r for r in records if r['date'] is not None and r['time'] is not None]
+
+
+def extract_lottery_results(driver, select=False):
+    """
+    抽選結果画面から当選情報を取得する。
+    select=True の場合は同じ呼び出しの中で各行の選択ボタン（checkElect）もクリックします。
+    """
+    records = extract_table_records(
+        driver,
+        "table.table.sp-block-table",
+        ":scope > tbody > tr",
+        {
+            'date': "td:nth-of-type(2) > label > span:nth-of-type(2)",
+            'time': "td:nth-of-type(3) > label",
+        },
+        click_selector="input[name='checkElect']" if select else None
+    )
+    return records or []
@@ -0,0 +1,162 @@
+"""Chromeドライバープールモジュール"""
+import queue
+import threading
+from contextlib import contextmanager
+
+from ..config import DEFAULT_BROWSER_PROFILE, BROWSER_MEMORY_LIMIT_MB, BROWSER_MAX_ACCOUNTS
+from .browser import create_driver, browser_memory_mb, psutil_available
+
+
+class DriverPool:
+    """
+    複数のChromeドライバーを保持し、並列処理のワーカーに貸し出すクラス。
+    返却されたドライバーは、メモリ使用量が memory_limit_mb を超えたか、
+    max_uses 回貸し出した場合に再起動します（どちらも0で無効）。
+    """
+
+    def __init__(self, size, headless=True, extra_arguments=None, profile=DEFAULT_BROWSER_PROFILE,
+                 memory_limit_mb=BROWSER_MEMORY_LIMIT_MB, max_uses=BROWSER_MAX_ACCOUNTS, log=None):
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.extra_arguments = list(extra_arguments or [])
+        self.profile = profile
+        self.memory_limit_mb = memory_limit_mb or 0
+        self.max_uses = max_uses or 0
+        self.log = log
+        if self.memory_limit_mb and not psutil_available():
+            # psutil がなければメモリ使用量を取得できないため、処理件数による再起動だけを行う
+            if log:
+                log("psutil がインストールされていないため、メモリ使用量によるブラウザの再起動は行いません")
+            self.memory_limit_mb = 0
+        self.restarts = 0
+        self._uses = {}
+        self._failed = set()
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._launched = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _launch(self):
+        """新しいChromeブラウザを起動する"""
+        driver = create_driver(self.headless, self.extra_arguments, self.profile)
+        driver.get("about:blank")
+        with self._lock:
+            self._drivers.append(driver)
+            self._uses[driver] = 0
+        return driver
+
+    def acquire(self):
+        """空いているドライバーを取得する（上限まではその場で起動する）"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_launch = self._launched < self.size
+                if can_launch:
+                    self._launched += 1
+            if can_launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self._lock:
+                        self._launched -= 1
+                    raise
+
+            # 他のワーカーがドライバーを返却するまで待機
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def release(self, driver):
+        """ドライバーを返却する（応答しない・メモリ使用量が多い場合は再起動してから戻す）"""
+        if self._closed:
+            self._quit(driver)
+            return
+
+        reason = self._restart_reason(driver)
+        if reason:
+            if self.log:
+                self.log(f"ブラウザを再起動します（{reason}）")
+            self.restarts += 1
+            self._quit(driver)
+            try:
+                driver = self._launch()
+            except Exception:
+                # 再起動に失敗した場合は枠を空けて次回の取得時に再試行する
+                with self._lock:
+                    self._launched -= 1
+                return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        """with文でドライバーを借りて自動的に返却する"""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def mark_failed(self, driver):
+        """ドライバーを使えない状態として記録する（返却時に再起動する）"""
+        with self._lock:
+            self._failed.add(driver)
+
+    def _restart_reason(self, driver):
+        """再起動が必要な理由を返す（不要ならNone）"""
+        with self._lock:
+            failed = driver in self._failed
+            self._failed.discard(driver)
+        if failed:
+            return "タブの初期化に失敗"
+        if not self.is_alive(driver):
+            return "応答なし"
+        with self._lock:
+            uses = self._uses.get(driver, 0) + 1
+            self._uses[driver] = uses
+        if self.max_uses and uses >= self.max_uses:
+            return f"{uses}件を処理"
+        if self.memory_limit_mb:
+            memory = browser_memory_mb(driver)
+            if memory is not None and memory > self.memory_limit_mb:
+                return f"メモリ使用量 {memory:.0f}MB"
+        return None
+
+    @staticmethod
+    def is_alive(driver):
+        """ドライバーが操作可能な状態か確認する"""
+        try:
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._uses.pop(driver, None)
+            self._failed.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """全てのドライバーを終了する"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._uses.clear()
+            self._failed.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,144 @@
+"""ChromeDriverの場所を決定するモジュール（1回の起動につき1回だけ解決し、結果をディスクに保存する）"""
+import os
+import sys
+import json
+import time
+import threading
+
+from ..utils.helpers import get_writable_dir
+
+# 固定のChromeDriverを使う場合にパスを指定する環境変数（指定するとネットワークに一切アクセスしない）
+PINNED_DRIVER_ENV = "JOHOKU_CHROMEDRIVER"
+
+# アプリと同じフォルダに置かれていれば固定のChromeDriverとして使うファイル名
+BUNDLED_DRIVER_NAMES = ("chromedriver.exe", "chromedriver")
+
+# 解決したChromeDriverのパスとChromeのバージョンを保存するファイル
+CACHE_FILE = "chromedriver_cache.json"
+
+
+class DriverResolveError(Exception):
+    """ChromeDriverが見つからない・ダウンロードできない場合のエラー"""
+
+
+def get_chrome_version():
+    """インストールされているChromeのバージョンを返す（ネットワークにはアクセスしない。取得できなければNone）"""
+    try:
+        from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        # webdriver-manager 3.x
+        from webdriver_manager.core.utils import get_browser_version_from_os, ChromeType
+        return get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def major_version(version):
+    return str(version or "").split(".")[0]
+
+
+class DriverResolver:
+    """
+    ChromeDriverのパスを決定するクラス。
+    1. 固定のChromeDriver（環境変数 JOHOKU_CHROMEDRIVER、またはアプリと同じフォルダの chromedriver）
+    2. 前回解決したパス（Chromeのメジャーバージョンが同じ場合）
+    3. webdriver-manager によるダウンロード
+    の順に探し、結果はプロセス内で使い回します。
+    """
+
+    def __init__(self, cache_path=None, pinned_path=None):
+        self._cache_path = cache_path
+        self.pinned_path = pinned_path
+        self.path = None
+        self.source = None
+        self.chrome_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_path(self):
+        if self._cache_path is None:
+            self._cache_path = os.path.join(get_writable_dir(), CACHE_FILE)
+        return self._cache_path
+
+    def resolve(self):
+        """ChromeDriverのパスを返す（2回目以降はすぐに返す）"""
+        with self._lock:
+            if self.path is None:
+                self.path, self.source = self._resolve()
+            return self.path
+
+    def reset(self):
+        """解決済みのパスを破棄する（次回の resolve() で改めて探す）"""
+        with self._lock:
+            self.path = None
+            self.source = None
+
+    def _resolve(self):
+        pinned = self.pinned_path or os.environ.get(PINNED_DRIVER_ENV) or self._bundled_driver()
+        if pinned:
+            if not os.path.isfile(pinned):
+                raise DriverResolveError(f"指定されたChromeDriverが見つかりません: {pinned}")
+            return pinned, "固定"
+
+        self.chrome_version = get_chrome_version()
+        cached = self._load_cache()
+        cached_path = cached.get("driver_path") if cached else None
+        if cached_path and not os.path.isfile(cached_path):
+            cached_path = None
+
+        if cached_path and (self.chrome_version is None
+                            or major_version(cached.get("chrome_version")) == major_version(self.chrome_version)):
+            return cached_path, "キャッシュ"
+
+        try:
+            # webdriver-managerは読み込みに時間がかかるため、必要になったときに読み込む
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            if cached_path:
+                # ネットワークに接続できない場合は、Chromeのバージョンが変わっていても前回のドライバーを試す
+                return cached_path, "キャッシュ（更新失敗）"
+            raise DriverResolveError(f"ChromeDriverを取得できませんでした: {e}") from e
+
+        self._save_cache(path)
+        return path, "ダウンロード"
+
+    @staticmethod
+    def _bundled_driver():
+        base_dir = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.getcwd()
+        for name in BUNDLED_DRIVER_NAMES:
+            path = os.path.join(base_dir, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, path):
+        data = {"driver_path": path, "chrome_version": self.chrome_version, "resolved_at": time.time()}
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+
+# プロセス全体で共有する DriverResolver
+driver_resolver = DriverResolver()
+
+
+def resolve_chromedriver():
+    """ChromeDriverのパスを返す（プロセス内で1回だけ解決する）"""
+    return driver_resolver.resolve()
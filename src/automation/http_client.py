@@ -0,0 +1,218 @@
+"""ブラウザを使わずにHTTP通信だけで予約サイトを操作するクライアントモジュール"""
+import re
+from contextlib import contextmanager
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utils.html_parser import parse_html
+from . import page_parsers
+from .retry import LoginRejectedError
+
+# ブラウザ版と同じユーザーエージェントを使用する
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36'
+
+# 1リクエストあたりのタイムアウト（秒）
+REQUEST_TIMEOUT = 15
+
+# ページのスクリプトで表示されるアラートのメッセージ
+ALERT_PATTERN = re.compile(r"""alert\(\s*['"](.*?)['"]\s*\)""")
+
+
+class HttpEngineError(Exception):
+    """HTTPクライアントで画面遷移やログインができなかった場合の例外"""
+
+
+class SiteHttpClient:
+    """1アカウント分のセッション（Cookie）を保持して予約サイトを操作するクラス"""
+
+    def __init__(self, base_url, adapter=None):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'ja,en;q=0.8',
+        })
+        if adapter is not None:
+            # 接続プール（keep-alive）を全アカウントで共有する
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        self.current_url = None
+        self.page = None
+        self.html = ""
+
+    def close(self):
+        # 共有アダプターは閉じずにCookieだけ破棄する
+        self.session.cookies.clear()
+
+    def _load(self, response):
+        response.raise_for_status()
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        self.current_url = response.url
+        self.html = response.text
+        self.page = parse_html(self.html)
+        return self.page
+
+    def get(self, url):
+        """ページを取得して解析結果を返す"""
+        return self._load(self.session.get(urljoin(self.current_url or self.base_url, url), timeout=REQUEST_TIMEOUT))
+
+    def submit_form(self, form, values=None):
+        """フォームのhidden項目を引き継いで送信する"""
+        data = {}
+        for field in form.find_all('input'):
+            name = field.get('name')
+            if not name:
+                continue
+            field_type = (field.get('type') or 'text').lower()
+            if field_type in ('checkbox', 'radio') and 'checked' not in field.attrs:
+                continue
+            if field_type in ('submit', 'button', 'image'):
+                continue
+            data[name] = field.get('value', '')
+        for select in form.find_all('select'):
+            name = select.get('name')
+            if not name:
+                continue
+            options = select.find_all('option')
+            chosen = [o for o in options if 'selected' in o.attrs] or options[:1]
+            if chosen:
+                data[name] = chosen[0].get('value', chosen[0].text)
+        data.update(values or {})
+
+        action = urljoin(self.current_url or self.base_url, form.get('action') or self.current_url or self.base_url)
+        method = (form.get('method') or 'get').lower()
+        if method == 'post':
+            response = self.session.post(action, data=data, timeout=REQUEST_TIMEOUT)
+        else:
+            response = self.session.get(action, params=data, timeout=REQUEST_TIMEOUT)
+        return self._load(response)
+
+    def _find_login_form(self):
+        for form in self.page.find_all('form'):
+            if form.find('input', attrs={'name': 'userId'}) is not None:
+                return form
+        return None
+
+    def _follow(self, element):
+        """リンクやボタンが指す画面へ遷移する（JavaScriptのみのリンクは辿れない）"""
+        href = element.get('href') or element.get('data-href') or ''
+        if href and not href.startswith('#') and not href.lower().startswith('javascript:'):
+            return self.get(href)
+
+        # onclickに埋め込まれたURLを探す（location.href = '...' 形式）
+        onclick = element.get('onclick') or ''
+        match = re.search(r"""location(?:\.href)?\s*=\s*['"]([^'"]+)['"]""", onclick)
+        if match:
+            return self.get(match.group(1))
+
+        form = element.ancestor('form')
+        if form is not None:
+            return self.submit_form(form)
+
+        raise HttpEngineError(f"リンク先を特定できません: {element.text or element.tag}")
+
+    def is_logged_in(self):
+        return self.page is not None and self.page.find(id='userName') is not None
+
+    def restore_session(self, cookies):
+        """保存済みのCookieでログイン状態を復元できるか確認する"""
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+            )
+        try:
+            self.get(self.base_url)
+        except requests.RequestException:
+            return False
+        if self.is_logged_in():
+            return True
+        self.session.cookies.clear()
+        return False
+
+    def export_cookies(self):
+        """Cookieをブラウザ版と共通の形式（Seleniumのget_cookiesと同じ形式）で返す"""
+        cookies = []
+        for cookie in self.session.cookies:
+            entry = {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': bool(cookie.secure),
+            }
+            if cookie.expires:
+                entry['expiry'] = int(cookie.expires)
+            cookies.append(entry)
+        return cookies
+
+    def login(self, user_number, password):
+        """
+        ログインを行う（失敗した場合はHttpEngineErrorを送出）。
+        ログインが拒否された場合は、ブラウザ版と同じく LoginRejectedError（アラートのメッセージ）を送出します。
+        """
+        self.get(self.base_url)
+
+        form = self._find_login_form()
+        if form is None:
+            # 「ログイン」ボタンからログイン画面に遷移する
+            login_button = self.page.find(id='btn-login')
+            if login_button is None:
+                raise HttpEngineError("ログインボタンが見つかりません")
+            self._follow(login_button)
+            form = self._find_login_form()
+            if form is None:
+                raise HttpEngineError("ログインフォームが見つかりません")
+
+        self.submit_form(form, {'userId': user_number, 'password': password})
+        if not self.is_logged_in():
+            alert = ALERT_PATTERN.search(self.html)
+            raise LoginRejectedError(alert.group(1) if alert else "ログインに失敗しました")
+
+    def open_link(self, text, contains=False):
+        """表示テキストでリンクを探して遷移する"""
+        for anchor in self.page.find_all('a'):
+            anchor_text = anchor.text.strip()
+            if anchor_text == text or (contains and text in anchor_text):
+                return self._follow(anchor)
+        raise HttpEngineError(f"リンクが見つかりません: {text}")
+
+    def fetch_lottery_applications(self):
+        """抽選申込みの確認画面から申込情報を取得する"""
+        self.open_link('抽選申込みの確認')
+        return page_parsers.parse_lottery_applications(self.page)
+
+    def fetch_reservations(self):
+        """予約の確認画面から予約情報を取得する（表がない場合はNone）"""
+        self.open_link('予約の確認')
+        return page_parsers.parse_reservations(self.page)
+
+    def fetch_expiry(self):
+        """利用者情報画面から有効期限を取得する"""
+        self.open_link('利用者情報の変更・削除・更新', contains=True)
+        return page_parsers.parse_expiry(self.page)
+
+
+class HttpClientPool:
+    """HTTPクライアントを貸し出すクラス（DriverPoolと同じ使い方ができる）"""
+
+    def __init__(self, size, base_url):
+        self.size = max(1, int(size))
+        self.base_url = base_url
+        # 同時実行数に合わせた接続プールを用意し、接続を使い回す
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.size * 2)
+
+    @contextmanager
+    def driver(self):
+        """アカウントごとに新しいCookieのクライアントを渡す"""
+        client = SiteHttpClient(self.base_url, self.adapter)
+        try:
+            yield client
+        finally:
+            client.close()
+
+    def close(self):
+        self.adapter.close()
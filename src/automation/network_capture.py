@@ -0,0 +1,167 @@
+"""画面の表示を待たずに、ページが読み込んだ応答（HTML/JSON）から情報を取り出すモジュール"""
+import time
+import base64
+import threading
+import weakref
+
+from .perf_log import PerformanceLog
+
+RESPONSE_EVENT = "Network.responseReceived"
+FINISHED_EVENT = "Network.loadingFinished"
+
+# 取得の対象とする応答の種類（画像・CSS・スクリプトなどは対象外）
+CAPTURED_TYPES = ("Document", "XHR", "Fetch")
+
+# 応答を待つ間、イベントを読み取る間隔（秒）
+POLL_INTERVAL = 0.05
+
+# 応答が1件も届かないまま待機が終わった回数がこの値に達したら、そのドライバーでは取得をやめる
+MAX_SILENT_READS = 3
+
+
+def enable_network_capture(options):
+    """
+    パフォーマンスログにネットワークのイベントも記録する設定を追加する（enable_dialog_capture の後に呼び出す）。
+    応答の本文は、イベントの requestId を使って Network.getResponseBody で取得します。
+    """
+    prefs = dict(options.experimental_options.get("perfLoggingPrefs", {}))
+    prefs["enableNetwork"] = True
+    options.add_experimental_option("perfLoggingPrefs", prefs)
+    return options
+
+
+class CapturedResponse:
+    """読み込みが完了した応答1件分の記録"""
+
+    __slots__ = ("request_id", "url", "status", "mime_type", "type")
+
+    def __init__(self, request_id, url, status, mime_type, type):
+        self.request_id = request_id
+        self.url = url
+        self.status = status
+        self.mime_type = mime_type
+        self.type = type
+
+    def __repr__(self):
+        return f"CapturedResponse({self.type!r}, {self.status!r}, {self.url!r})"
+
+
+class ResponseCapture:
+    """
+    ドライバーごとにページが読み込んだ応答を記録するクラス。
+    操作の前に mark() を呼び出し、操作の後に read(parse) で応答の本文を解析します。
+    パフォーマンスログが読み取れない環境では supported がFalseになります（画面から取得してください）。
+    """
+
+    _captures = weakref.WeakKeyDictionary()
+    _captures_lock = threading.Lock()
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.log = PerformanceLog.for_driver(driver)
+        self.log.watch(RESPONSE_EVENT, FINISHED_EVENT)
+        self._responses = {}
+        self._finished = []
+        self._silent_reads = 0
+
+    @classmethod
+    def for_driver(cls, driver):
+        """ドライバーに対応する ResponseCapture を返す（同じドライバーには同じインスタンス）"""
+        with cls._captures_lock:
+            capture = cls._captures.get(driver)
+            if capture is None:
+                capture = cls(driver)
+                cls._captures[driver] = capture
+            return capture
+
+    @property
+    def supported(self):
+        return self.log.supported and self._silent_reads < MAX_SILENT_READS
+
+    def _poll(self):
+        self.log.poll()
+        for params, _ in self.log.take(RESPONSE_EVENT, poll=False):
+            if params.get("type") not in CAPTURED_TYPES:
+                continue
+            response = params.get("response", {})
+            request_id = params.get("requestId")
+            self._responses[request_id] = CapturedResponse(
+                request_id, response.get("url", ""), response.get("status", 0),
+                response.get("mimeType", ""), params.get("type"),
+            )
+        for params, _ in self.log.take(FINISHED_EVENT, poll=False):
+            response = self._responses.pop(params.get("requestId"), None)
+            if response is not None:
+                self._finished.append(response)
+
+    def mark(self):
+        """これまでに読み込まれた応答を破棄する（この後の操作で読み込まれた応答だけを read() の対象にする）"""
+        self._poll()
+        self._responses.clear()
+        self._finished = []
+
+    def body(self, response):
+        """応答の本文を文字列で返す（取得できない場合はNone）"""
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": response.request_id})
+        except Exception:
+            return None
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        return body
+
+    def read(self, parse, timeout=5.0):
+        """
+        mark() 以降に読み込まれた応答の本文を順に parse(body, response) で解析し、最初に得られた値を返す。
+        parse がNoneを返した応答は読み飛ばし、ページ本体（Document）の応答を解析しても値が得られなかった場合や、
+        timeout 秒以内に応答が届かない場合はNoneを返します。
+        """
+        deadline = time.perf_counter() + timeout
+        seen = False
+        while True:
+            self._poll()
+            finished, self._finished = self._finished, []
+            for response in finished:
+                seen = True
+                if response.status >= 400:
+                    continue
+                body = self.body(response)
+                if body is None:
+                    continue
+                value = parse(body, response)
+                if value is not None:
+                    self._silent_reads = 0
+                    return value
+                if response.type == "Document":
+                    self._silent_reads = 0
+                    return None
+            if time.perf_counter() >= deadline or not self.log.supported:
+                break
+            time.sleep(POLL_INTERVAL)
+        if not seen:
+            # ネットワークのイベントが記録されていない（設定が効いていない）環境では、次回から待機しない
+            self._silent_reads += 1
+        return None
+
+
+class CaptureStats:
+    """取得元ごとに、応答から取り出せた件数と画面から取得した件数を集計するクラス"""
+
+    def __init__(self):
+        self.steps = {}
+        self._lock = threading.Lock()
+
+    def add(self, step, captured):
+        with self._lock:
+            entry = self.steps.setdefault(step, {"captured": 0, "fallback": 0})
+            entry["captured" if captured else "fallback"] += 1
+
+    def summary(self):
+        """取得元ごとの取得率を1行の文字列で返す（記録がなければ空文字）"""
+        with self._lock:
+            parts = []
+            for step, entry in self.steps.items():
+                total = entry["captured"] + entry["fallback"]
+                parts.append(f"{step} {entry['captured']}/{total}件（{entry['captured'] / total:.0%}）")
+        return " / ".join(parts)
@@ -0,0 +1,64 @@
+"""予約サイトのHTMLから情報を取り出す解析モジュール"""
+from ..utils.html_parser import parse_html
+
+
+def _as_root(page):
+    """HTML文字列または解析済みの要素を受け取り、ルート要素を返す"""
+    return parse_html(page) if isinstance(page, str) else page
+
+
+def _cell_text(cells, position):
+    """XPathのtd[n]と同じく1始まりの位置でセルのテキストを取得する"""
+    if len(cells) >= position:
+        return cells[position - 1].text.strip()
+    return ""
+
+
+def parse_lottery_applications(page):
+    """抽選申込みの確認画面（table.sp-block-table）から申込情報を取り出す"""
+    root = _as_root(page)
+    applications = []
+    for table in root.find_all('table', class_name='sp-block-table'):
+        for tbody in table.find_all('tbody'):
+            for row in tbody.find_all('tr'):
+                cells = row.child_elements('td')
+                applications.append({
+                    'status': _cell_text(cells, 2),
+                    'category': _cell_text(cells, 3),
+                    'facility': _cell_text(cells, 4),
+                    'date': _cell_text(cells, 5),
+                    'time': _cell_text(cells, 6),
+                })
+    return applications
+
+
+def parse_reservations(page):
+    """予約の確認画面（#rsvacceptlist）から予約情報を取り出す（表がない場合はNone）"""
+    root = _as_root(page)
+    table = root.find(id='rsvacceptlist')
+    if table is None:
+        return None
+
+    reservations = []
+    rows = table.find_all('tr')
+    for row in rows[1:]:  # 最初の行はヘッダーなのでスキップ
+        cols = [td for td in row.find_all('td') if td.get('class') == 'keep-wide']
+        if len(cols) >= 2:
+            reservations.append({
+                'date': cols[0].text.strip(),
+                'time': cols[1].text.strip(),
+            })
+    return reservations
+
+
+def parse_expiry(page):
+    """利用者情報画面から有効期限（validEndYMD）の表示テキストを取り出す"""
+    root = _as_root(page)
+    for label in root.find_all('label', attrs={'for': 'validEndYMD'}):
+        th = label.ancestor('th')
+        if th is None:
+            continue
+        cells = th.following_siblings('td')
+        if cells:
+            return cells[0].text.strip()
+    return None
@@ -0,0 +1,73 @@
+"""Chromeのパフォーマンスログ（DevToolsのイベント）を読み取るモジュール"""
+import json
+import threading
+import weakref
+from collections import deque
+
+# イベントの種類ごとに保持する件数の上限（読み取られないまま溜まり続けないようにする）
+MAX_EVENTS = 500
+
+
+class PerformanceLog:
+    """
+    ドライバーごとにパフォーマンスログを読み取り、イベントの種類ごとに振り分けるクラス。
+    get_log("performance") は読み取った分が消えるため、ダイアログの記録とネットワーク応答の取得で共有します。
+    watch() で登録した種類のイベントだけを保持します。
+    """
+
+    _logs = weakref.WeakKeyDictionary()
+    _logs_lock = threading.Lock()
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.supported = True
+        self._events = {}
+
+    @classmethod
+    def for_driver(cls, driver):
+        """ドライバーに対応する PerformanceLog を返す（同じドライバーには同じインスタンス）"""
+        with cls._logs_lock:
+            log = cls._logs.get(driver)
+            if log is None:
+                log = cls(driver)
+                cls._logs[driver] = log
+            return log
+
+    def watch(self, *methods):
+        """保持するイベントの種類（"Page.javascriptDialogOpening" など）を登録する"""
+        for method in methods:
+            self._events.setdefault(method, deque(maxlen=MAX_EVENTS))
+
+    def poll(self):
+        """新しいイベントを読み取る（ログが読み取れない環境では supported をFalseにする）"""
+        if not self.supported or not self._events:
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            self.supported = False
+            return
+
+        for entry in entries:
+            message = entry.get("message", "")
+            # 全てのイベントを解析すると遅いため、登録した種類の名前を含むものだけ解析する
+            if not any(method in message for method in self._events):
+                continue
+            try:
+                event = json.loads(message)["message"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            events = self._events.get(event.get("method"))
+            if events is not None:
+                events.append((event.get("params", {}), entry.get("timestamp", 0)))
+
+    def take(self, method, poll=True):
+        """method のイベントを (params, timestamp) のリストで返し、保持していた分を破棄する"""
+        if poll:
+            self.poll()
+        events = self._events.get(method)
+        if not events:
+            return []
+        taken = list(events)
+        events.clear()
+        return taken
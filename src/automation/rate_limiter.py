@@ -0,0 +1,153 @@
+"""サイトへのアクセス間隔を全てのブラウザで共有して調整するモジュール"""
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from ..config import SITE_RATE_PER_MINUTE, SITE_MAX_SESSIONS, CAPTCHA_COOLDOWN
+
+# 一時停止中・待機中に中断を確認する間隔（秒）
+CHECK_INTERVAL = 0.5
+
+# 直近の結果をいくつまで見てエラーの増加を判定するか
+OUTCOME_WINDOW = 20
+
+
+class RateLimiter:
+    """
+    トークンバケット方式でアクセスの開始を調整するクラス（全てのスレッドで1つを共有する）。
+    rate_per_minute: 1分あたりのアクセス開始の上限（0で無制限）
+    max_sessions: 同時に処理するセッション数の上限
+    Captchaが表示されたりエラーが増えたりすると間隔を広げ、正常な処理が続くと元の間隔に戻します。
+    """
+
+    def __init__(self, rate_per_minute=SITE_RATE_PER_MINUTE, max_sessions=SITE_MAX_SESSIONS,
+                 captcha_cooldown=CAPTCHA_COOLDOWN, jitter=0.2, min_ratio=0.1,
+                 error_threshold=0.3, recover_after=5, log=None):
+        self.base_rate = max(0.0, float(rate_per_minute or 0))
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate * min_ratio
+        self.captcha_cooldown = captcha_cooldown
+        self.jitter = max(0.0, jitter)
+        self.error_threshold = error_threshold
+        self.recover_after = recover_after
+        self.log = log
+
+        self.capacity = max(1, int(max_sessions or 1))
+        self._sessions = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._outcomes = deque(maxlen=OUTCOME_WINDOW)
+        self._successes = 0
+        self._captcha_streak = 0
+
+        self.waited = 0.0
+        self.penalties = 0
+
+    @classmethod
+    def from_params(cls, params, log=None):
+        """タスクのパラメータ（rate_per_minute, max_sessions, captcha_cooldown）から作成する"""
+        return cls(
+            rate_per_minute=params.get("rate_per_minute", SITE_RATE_PER_MINUTE),
+            max_sessions=params.get("max_sessions", SITE_MAX_SESSIONS),
+            captcha_cooldown=params.get("captcha_cooldown", CAPTCHA_COOLDOWN),
+            log=log,
+        )
+
+    def _emit(self, message):
+        if self.log:
+            self.log(message)
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / 60.0)
+        self._updated = now
+
+    def acquire(self, should_continue=None):
+        """
+        アクセスを開始してよくなるまで待機し、待機した秒数を返す。
+        should_continue() がFalseを返した場合は待機をやめてNoneを返します。
+        """
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.rate <= 0 or self._tokens >= 1:
+                    if self.rate > 0:
+                        self._tokens -= 1
+                    waited = now - start
+                    self.waited += waited
+                    return waited
+                else:
+                    wait = (1 - self._tokens) * 60.0 / self.rate
+                    wait *= 1 + random.uniform(0, self.jitter)
+
+            if should_continue is not None and not should_continue():
+                return None
+            time.sleep(min(wait, CHECK_INTERVAL))
+
+    @contextmanager
+    def session(self, should_continue=None):
+        """同時に処理するセッション数の枠を確保し、アクセスの開始を待ってから処理させる"""
+        while not self._sessions.acquire(timeout=CHECK_INTERVAL):
+            if should_continue is not None and not should_continue():
+                yield False
+                return
+        try:
+            yield self.acquire(should_continue) is not None
+        finally:
+            self._sessions.release()
+
+    def pause(self, seconds, reason=""):
+        """全てのスレッドのアクセス開始を seconds 秒止める"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._emit(f"アクセスを{seconds:.0f}秒間停止します（{reason}）")
+
+    def _slow_down(self, reason):
+        with self._lock:
+            if self.base_rate <= 0:
+                return
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._successes = 0
+            self._outcomes.clear()
+            self.penalties += 1
+            rate = self.rate
+        self._emit(f"アクセス間隔を広げます（{reason}）: {rate:.1f}回/分")
+
+    def report_captcha(self):
+        """Captchaが表示されたことを知らせる（全体を一時停止し、間隔を広げる）"""
+        with self._lock:
+            self._captcha_streak += 1
+            seconds = self.captcha_cooldown * 2 ** min(self._captcha_streak - 1, 3)
+        self.pause(seconds, "Captchaを検出")
+        self._slow_down("Captchaを検出")
+
+    def report_error(self):
+        """処理に失敗したことを知らせる（直近のエラーの割合が高ければ間隔を広げる）"""
+        with self._lock:
+            self._outcomes.append(False)
+            self._successes = 0
+            failures = self._outcomes.count(False)
+            spike = len(self._outcomes) >= 5 and failures / len(self._outcomes) >= self.error_threshold
+        if spike:
+            self._slow_down(f"直近{len(self._outcomes)}件中{failures}件がエラー")
+
+    def report_success(self):
+        """処理に成功したことを知らせる（成功が続けば間隔を元に戻していく）"""
+        with self._lock:
+            self._outcomes.append(True)
+            self._captcha_streak = 0
+            self._successes += 1
+            if self.rate >= self.base_rate or self._successes < self.recover_after:
+                return
+            self._successes = 0
+            self.rate = min(self.base_rate, self.rate * 1.5)
+            rate = self.rate
+        self._emit(f"アクセス間隔を戻します: {rate:.1f}回/分")
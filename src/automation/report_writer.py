@@ -0,0 +1,71 @@
+"""結果ファイルを書き出すモジュール（1回の実行で1つのファイルハンドルを使う）"""
+import os
+
+# 何件の記録ごとにディスクへ書き出すか
+DEFAULT_FLUSH_EVERY = 20
+
+# 書き込みバッファのサイズ（バイト）
+BUFFER_SIZE = 64 * 1024
+
+
+class ReportWriter:
+    """
+    結果ファイルを一時ファイルに書き込み、close() で本来のファイル名に置き換えるクラス。
+    実行中も前回の結果ファイルは壊れず、途中経過は一時ファイル（.tmp）に flush_every 件ごとに書き出されます。
+    並べ替えが必要な行は add_sorted() で溜めておき、write_sorted() で1回だけ書き出します。
+    """
+
+    def __init__(self, path, flush_every=DEFAULT_FLUSH_EVERY, encoding="utf-8"):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.flush_every = max(1, int(flush_every))
+        self.records = 0
+        self._sorted = []
+        self._file = open(self.temp_path, "w", encoding=encoding, buffering=BUFFER_SIZE)
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write(self, text):
+        self._file.write(text)
+
+    def writelines(self, lines):
+        self._file.writelines(lines)
+
+    def end_record(self):
+        """1件分の記録を書き終えたことを知らせる（flush_every 件ごとにディスクへ書き出す）"""
+        self.records += 1
+        if self.records % self.flush_every == 0:
+            self.flush()
+
+    def add_sorted(self, key, text):
+        """並べ替えてから書き出す行を追加する（同じキーの行は追加した順のまま）"""
+        self._sorted.append((key, len(self._sorted), text))
+        self.end_record()
+
+    def write_sorted(self):
+        """add_sorted() で溜めた行をキーの順に書き出す"""
+        self._sorted.sort(key=lambda entry: (entry[0], entry[1]))
+        self._file.writelines(text for _, _, text in self._sorted)
+        self._sorted = []
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """残りを書き出して一時ファイルを結果ファイルに置き換える"""
+        if self._file is None:
+            return
+        if self._sorted:
+            self.write_sorted()
+        self._file.close()
+        self._file = None
+        os.replace(self.temp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,475 @@
+"""確認系タスク（抽選申込状況・予約状況・有効期限）と抽選の確定の結果を記録し、結果ファイルを作成するモジュール"""
+import re
+from collections import defaultdict, Counter
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from .report_writer import ReportWriter
+from .result_store import KIND_LOTTERY_STATUS, KIND_RESERVATION, KIND_EXPIRY, KIND_CONFIRMATION
+
+# 有効期限が取得できない場合の並べ替え用の日付
+NO_EXPIRY_DATE = datetime(9999, 12, 31)
+
+
+def parse_japanese_date(date_str):
+    """日本語の日付形式（例: 2024年4月10日）を解析してdatetimeオブジェクトに変換する"""
+    pattern = r'(\d+)年(\d+)月(\d+)日'
+    match = re.match(pattern, date_str)
+    if match:
+        year, month, day = map(int, match.groups())
+        return datetime(year, month, day)
+    return NO_EXPIRY_DATE  # パースできない場合のフォールバック
+
+
+def parse_reservation_date(date_str):
+    """予約の確認画面の利用日（例: 2025年5月2日(金)）をdatetimeオブジェクトに変換する（解析できなければNone）"""
+    # 月、日、年を個別に抽出
+    month_match = re.search(r'(\d+)月', date_str)
+    day_match = re.search(r'(\d+)日', date_str)
+    year_match = re.search(r'(\d{4})年', date_str)
+
+    if month_match and day_match and year_match:
+        month = int(month_match.group(1))
+        day = int(day_match.group(1))
+        year = int(year_match.group(1))
+        return datetime(year, month, day)
+    return None
+
+
+def date_key(date_str):
+    """画面の日付の表示（2025年5月2日(金)、2025/05/02 など）を並べ替え・絞り込み用の YYYY-MM-DD にする（解析できなければNone）"""
+    match = re.search(r'(\d{4})\D(\d{1,2})\D(\d{1,2})', date_str or '')
+    if not match:
+        return None
+    try:
+        return datetime(*map(int, match.groups())).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+class StoredReport:
+    """
+    結果をデータベース（ResultStore）に記録し、close() でその内容から結果ファイルを作成する基底クラス。
+    finish() を呼び出した場合は、集計結果も結果ファイルに書き込みます。
+    """
+
+    kind = None
+
+    def __init__(self, output_file, log, store, run_id):
+        self.output_file = output_file
+        self.log = log
+        self.store = store
+        self.run_id = run_id
+        self.finished = False
+        self._seq = 0
+        self._closed = False
+        self._passwords = {}
+
+    def _next_seq(self, row):
+        """アカウントの記録順の番号を返す（氏名も記録する）"""
+        self._seq += 1
+        self.store.save_account(row.user_number, row.name)
+        # パスワードはデータベースに記録せず、この実行の結果ファイルを作成するときだけ使う
+        self._passwords[row.user_number] = row.password
+        return self._seq
+
+    def _add(self, seq, account, status, **values):
+        self.store.add(self.run_id, self.kind, seq, account, status, **values)
+
+    def records(self):
+        """この実行の結果をアカウントごと（記録順）にまとめたリストを返す（CSVのパスワードを password に含める）"""
+        rows = [dict(row, password=self._passwords.get(row['account'], ''))
+                for row in self.store.results(self.run_id, self.kind)]
+        return [list(group) for _, group in groupby(rows, key=lambda r: r['seq'])]
+
+    def started_at(self):
+        return self.store.run_started_at(self.run_id)
+
+    def render(self, report):
+        raise NotImplementedError
+
+    def close(self):
+        """データベースの内容から結果ファイルを作成する（中断・エラー時もそれまでの結果を保存する）"""
+        if self._closed:
+            return
+        self._closed = True
+        with ReportWriter(self.output_file) as report:
+            self.render(report)
+
+
+class LotteryStatusReport(StoredReport):
+    """
+    抽選申込状況の確認結果（reservation_info.txt）を作成するクラス。
+    add() に渡す結果は {'status': 'ok' / 'display_error' / 'failed' / 'error', 'bookings': [...]} の形式です。
+    データベースには申込み1件ごとに1行（申込みがなければアカウントごとに1行）を記録します。
+    """
+
+    kind = KIND_LOTTERY_STATUS
+
+    # add() に渡す結果の status と、データベースに記録する status（申込みがない場合は 'none'）
+    STATUSES = {'failed': 'login_failed', 'error': 'error', 'display_error': 'display_error'}
+
+    def __init__(self, output_file, log, store, run_id):
+        super().__init__(output_file, log, store, run_id)
+        self.total_users = 0
+
+    def add(self, row, result, elapsed=None):
+        seq = self._next_seq(row)
+        user_name = (row.name or '不明')  # Name列がない場合は'不明'を使用
+        bookings = result.get('bookings', []) if result['status'] == 'ok' else []
+        if not bookings:
+            self._add(seq, row.user_number, self.STATUSES.get(result['status'], 'none'), name=user_name, elapsed=elapsed)
+            return
+        for status, category, facility, date, time_text in bookings:
+            self._add(seq, row.user_number, 'ok', name=user_name, elapsed=elapsed, detail=status, category=category,
+                      facility=facility, use_date=date, date_key=date_key(date), use_time=time_text)
+
+    def tally(self):
+        """アカウントごとの結果から集計に使う値をまとめる"""
+        tally = {
+            'records': self.records(),
+            # 日付と時刻の組み合わせを保存するリスト
+            'reservation_list': [],
+            # ログインに失敗したアカウントを保存するリスト
+            'failed_logins': [],
+            # 申込がされていないアカウントを保存するリスト
+            'no_bookings': [],
+            # 申込が1つのみのアカウントを保存するリスト
+            'one_booking': [],
+            # 各ユーザーの予約数を追跡する辞書
+            'user_booking_count': defaultdict(int),
+        }
+        for records in tally['records']:
+            first = records[0]
+            account = (first['account'], first['password'], first['name'])
+            if first['status'] == 'login_failed':
+                tally['failed_logins'].append(account)
+            elif first['status'] in ('display_error', 'none'):
+                tally['no_bookings'].append(account)
+                tally['user_booking_count'][account] = 0
+            elif first['status'] == 'ok':
+                tally['reservation_list'].extend((r['use_date'], r['use_time']) for r in records)
+                tally['user_booking_count'][account] = len(records)
+                if len(records) == 1:
+                    tally['one_booking'].append(account)
+
+        # 予約情報を集計してカウント
+        reservation_count = Counter(tally['reservation_list'])
+
+        # reservation_countから辞書リストを作成
+        reservation_data = []
+        for (date, time_text), count in reservation_count.most_common():
+            reservation_data.append({
+                'date_str': date,
+                'time': time_text,
+                'count': count
+            })
+
+        # datetimeオブジェクトでソート
+        if reservation_data:
+            reservation_data.sort(key=lambda x: parse_japanese_date(x['date_str']))
+        tally['reservation_data'] = reservation_data
+        return tally
+
+    def finish(self, total_users):
+        """集計結果をログに表示する（結果ファイルへは close() で書き込む）"""
+        self.finished = True
+        self.total_users = total_users
+        tally = self.tally()
+
+        # 集計結果を表示
+        summary = "\n=== 集計結果 ===\n"
+        summary += f"合計確認ユーザー数: {total_users}\n"
+        summary += f"ログイン失敗数: {len(tally['failed_logins'])}\n"
+        summary += f"申込みなしユーザー数: {len(tally['no_bookings'])}\n"
+        summary += f"申込み1つのみユーザー数: {len(tally['one_booking'])}\n"
+        summary += f"確認された予約総数: {sum(item['count'] for item in tally['reservation_data'])}\n"
+        summary += f"\n詳細な情報は {self.output_file} に保存されました。"
+
+        self.log(summary)
+
+    def render(self, report):
+        tally = self.tally()
+        report.write("=== 抽選申込状況の確認 ===\n")
+        report.write(f"実行日時: {self.started_at()}\n\n")
+
+        for records in tally['records']:
+            first = records[0]
+            if first['status'] in ('login_failed', 'error'):
+                continue
+
+            report.write(f"利用者番号: {first['account']}\n")
+            report.write(f"パスワード: {first['password']}\n")
+            report.write(f"利用者氏名: {first['name']}\n")
+
+            if first['status'] == 'display_error':
+                report.write("申込情報なし（表示エラー）\n")
+            elif first['status'] == 'none':
+                report.write("申込情報なし\n")
+            else:
+                for record in records:
+                    report.write(f"状況: {record['detail']}\n")
+                    report.write(f"分類: {record['category']}\n")
+                    report.write(f"公園・施設: {record['facility']}\n")
+                    report.write(f"利用日: {record['use_date']}\n")
+                    report.write(f"時刻: {record['use_time']}\n")
+
+            report.write("---------------\n")
+            report.end_record()
+
+        if not self.finished:
+            return
+
+        # 集計結果をテキストファイルに書き込み
+        report.write("=== 予約回数集計結果（日付順） ===\n")
+        for item in tally['reservation_data']:
+            report.write(f"利用日: {item['date_str']}, 時刻: {item['time']}, 回数: {item['count']}\n")
+
+        report.write("\n=== ログインに失敗したアカウント ===\n")
+        for user_number, password, user_name in tally['failed_logins']:
+            report.write(f"利用者番号: {user_number}, パスワード: {password}, 氏名: {user_name}\n")
+
+        report.write("\n=== 申込みがされていないアカウント ===\n")
+        for user_number, password, user_name in tally['no_bookings']:
+            report.write(f"利用者番号: {user_number}, パスワード: {password}, 氏名: {user_name}\n")
+
+        report.write("\n=== 申込みが1つだけのアカウント ===\n")
+        for user_number, password, user_name in tally['one_booking']:
+            report.write(f"利用者番号: {user_number}, パスワード: {password}, 氏名: {user_name}\n")
+
+        # 各ユーザーの予約数を記録
+        report.write("\n=== 各ユーザーの申込み数 ===\n")
+        for (user_number, password, user_name), count in sorted(tally['user_booking_count'].items(), key=lambda x: x[1]):
+            report.write(f"利用者番号: {user_number}, 氏名: {user_name}, 申込み数: {count}\n")
+
+
+class ReservationReport(StoredReport):
+    """
+    予約状況の確認結果（r_info.txt）を作成するクラス。
+    add() に渡す結果は {'reservations': [(利用日, 時刻), ...], 'failed': bool, 'error': エラーの内容} の形式です。
+    データベースには予約1件ごとに1行（予約がなければアカウントごとに1行）を記録します。
+    """
+
+    kind = KIND_RESERVATION
+
+    def add(self, row, result, elapsed=None):
+        seq = self._next_seq(row)
+        user_name = (row.name or '不明')  # Name列がない場合は'不明'を使用
+        if result['failed']:
+            self._add(seq, row.user_number, 'error', name=user_name, elapsed=elapsed, detail=result.get('error'))
+        elif not result['reservations']:
+            self._add(seq, row.user_number, 'none', name=user_name, elapsed=elapsed)
+        else:
+            for use_date, use_time in result['reservations']:
+                self._add(seq, row.user_number, 'ok', name=user_name, elapsed=elapsed,
+                          use_date=use_date, date_key=date_key(use_date), use_time=use_time)
+
+    def finish(self):
+        """予約がない場合とログインに失敗したアカウントをログに表示する（結果ファイルへは close() で書き込む）"""
+        self.finished = True
+        records = self.records()
+        if not any(first['status'] == 'ok' for first, *_ in records):
+            self.log("予約情報が存在しません。")
+
+        # ログイン失敗したアカウントの情報を出力
+        failed_logins = [first for first, *_ in records if first['status'] == 'error']
+        if failed_logins:
+            self.log("\nログインに失敗したアカウント:")
+            for first in failed_logins:
+                self.log(f"利用者番号: {first['account']}, 氏名: {first['name']}")
+
+    def render(self, report):
+        records = self.records()
+        report.write("=== 予約状況確認 ===\n")
+        report.write(f"実行日時: {self.started_at()}\n\n")
+
+        # 日付と時刻の組み合わせを保存するリスト
+        reservation_list = []
+        for account_records in records:
+            first = account_records[0]
+            if first['status'] == 'error':
+                report.write(f"エラー: {first['detail']}\n")
+                report.write("---------------\n")
+                report.end_record()
+                continue
+
+            report.write(f"利用者番号: {first['account']}\n")
+            report.write(f"利用者氏名: {first['name']}\n")
+            if first['status'] == 'none':
+                report.write("予約情報が存在しません。\n")
+            else:
+                for record in account_records:
+                    report.write(f"利用日: {record['use_date']}\n")
+                    report.write(f"時刻: {record['use_time']}\n")
+                    report.write("\n")
+                    reservation_list.append((record['use_date'], record['use_time'], record['name'], record['account']))
+            # 必ず区切り線を書き込む
+            report.write("---------------\n")
+            report.end_record()
+
+        if not self.finished:
+            return
+
+        # 予約情報がある場合は集計処理
+        try:
+            if reservation_list:
+                # 日付と時刻のフォーマットを修正し、無効な日付を除く
+                entries = []
+                for use_date, use_time, name, number in reservation_list:
+                    use_date = parse_reservation_date(use_date.replace('\n', ' ').strip())
+                    use_time = use_time.split('～')[0].strip() if '～' in use_time else use_time
+                    if use_date is not None:
+                        entries.append((use_date, use_time, name, number))
+
+                # ソート（同じ日時の中では取得順を保つ）
+                entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+                # 集計結果をテキストファイルに書き込み
+                report.write("\n=== 予約回数集計結果 ===\n")
+                if not entries:
+                    report.write("有効な予約情報がありません。\n")
+                else:
+                    for (date, time_val), group in groupby(entries, key=lambda entry: (entry[0], entry[1])):
+                        group = list(group)
+                        report.write(f"利用日: {date.strftime('%Y年%m月%d日')}, 時刻: {time_val}, 面数: {len(group)}\n")
+                        for _, _, name, number in group:
+                            report.write(f"\t利用者氏名: {name}, 利用者番号: {number}\n")
+            else:
+                report.write("\n=== 予約回数集計結果 ===\n")
+                report.write("予約情報が存在しません。\n")
+        except Exception as e:
+            self.log(f"集計処理中にエラーが発生しました: {e}")
+            report.write("\n=== 予約回数集計結果 ===\n")
+            report.write(f"集計処理中にエラーが発生しました: {e}\n")
+
+        # ログイン失敗したアカウントの情報を出力
+        failed_logins = [account_records[0] for account_records in records if account_records[0]['status'] == 'error']
+        if failed_logins:
+            report.write("\n=== ログインに失敗したアカウント ===\n")
+            for first in failed_logins:
+                report.write(f"利用者番号: {first['account']}, 氏名: {first['name']}\n")
+
+
+class ExpiryReport(StoredReport):
+    """
+    有効期限の確認結果（expiry.txt）を作成するクラス。
+    add() に渡す結果は {'user_number', 'user_name', 'expiry_info', 'expiry_date', 'login_failed'} の辞書です。
+    データベースにはアカウントごとに1行（有効期限は YYYY-MM-DD、取得できなければNULL）を記録します。
+    """
+
+    kind = KIND_EXPIRY
+
+    def add(self, row, result, elapsed=None):
+        seq = self._next_seq(row)
+        expiry_date = result['expiry_date']
+        self._add(seq, result['user_number'], 'login_failed' if result['login_failed'] else 'ok',
+                  name=result['user_name'], detail=result['expiry_info'], elapsed=elapsed,
+                  expiry=None if expiry_date == NO_EXPIRY_DATE else expiry_date.strftime('%Y-%m-%d'))
+
+    def results(self):
+        """記録した結果を有効期限の順（同じ日付は記録順）に返す"""
+        results = [
+            {
+                'user_number': first['account'],
+                'user_name': first['name'],
+                'expiry_info': first['detail'],
+                'expiry_date': datetime.strptime(first['expiry'], '%Y-%m-%d') if first['expiry'] else NO_EXPIRY_DATE,
+                'login_failed': first['status'] == 'login_failed',
+            }
+            for first, *_ in self.records()
+        ]
+        results.sort(key=lambda x: x['expiry_date'])
+        return results
+
+    def finish(self):
+        """ログインに失敗したアカウントと期限が近いユーザーをログに表示する（結果ファイルへは close() で書き込む）"""
+        self.finished = True
+        results = self.results()
+
+        self.log("\nすべてのデータを日付順にソートしました")
+        self.log(f"結果は {self.output_file} に保存されました")
+
+        # ログイン失敗したアカウントの情報を出力
+        failed_logins = [r for r in results if r['login_failed']]
+        if failed_logins:
+            self.log("\n=== ログインに失敗したアカウント ===")
+            for result in failed_logins:
+                self.log(f"利用者番号: {result['user_number']}, 氏名: {result['user_name']}")
+
+        # 今日から2週間以内に有効期限が切れるユーザーを表示
+        today = datetime.now()
+        two_weeks_later = today + timedelta(days=14)  # 今日から2週間後
+
+        self.log("\n=== 有効期限が2週間以内に切れるユーザー ===")
+        expiring_soon = [r for r in results if r['expiry_date'] <= two_weeks_later and r['expiry_date'] != NO_EXPIRY_DATE]
+
+        if expiring_soon:
+            for result in expiring_soon:
+                self.log(f"利用者番号: {result['user_number']}, 氏名: {result['user_name']}, 有効期限: {result['expiry_info']}")
+        else:
+            self.log("2週間以内に有効期限が切れるユーザーはいません。")
+
+    def render(self, report):
+        # 日付でソートして書き出す
+        results = self.results()
+        report.write("利用者番号,氏名,有効期限\n")
+        for result in results:
+            report.write(f"{result['user_number']},{result['user_name']},{result['expiry_info']}\n")
+
+        if not self.finished:
+            return
+
+        # ログイン失敗したアカウントの情報を出力
+        failed_logins = [r for r in self.records() if r[0]['status'] == 'login_failed']
+        if failed_logins:
+            report.write("\n=== ログインに失敗したアカウント ===\n")
+            for first, *_ in failed_logins:
+                report.write(f"利用者番号: {first['account']}, 氏名: {first['name']}\n")
+
+
+class ConfirmationReport(StoredReport):
+    """
+    抽選の確定結果（lottery_results.txt）を作成するクラス。
+    add() に渡す結果は {'status': ..., 'wins': [(日付, 時間), ...], 'error': エラーの内容} の形式です。
+    status は 'confirmed'（確定成功）、'confirmed_no_popup'、'confirm_error'、'no_results'（当選なし）、
+    'no_table'、'menu_error'、'error' のいずれかです。データベースには当選1件ごとに1行を記録します。
+    """
+
+    kind = KIND_CONFIRMATION
+
+    # 確定の操作まで進んだ場合の処理結果の表示
+    CONFIRM_RESULTS = {'confirmed': "確定成功", 'confirmed_no_popup': "確定処理完了（ポップアップなし）"}
+
+    def add(self, row, result, elapsed=None):
+        seq = self._next_seq(row)
+        values = {'name': row.display_name, 'detail': result.get('error'), 'elapsed': elapsed}
+        if not result['wins']:
+            self._add(seq, row.user_number, result['status'], **values)
+            return
+        for booking_date, booking_time in result['wins']:
+            self._add(seq, row.user_number, result['status'], use_date=booking_date, date_key=date_key(booking_date),
+                      use_time=booking_time, **values)
+
+    def render(self, report):
+        report.write("===== 抽選確定処理結果 =====\n")
+        report.write(f"実行日時: {self.started_at()}\n\n")
+
+        for records in self.records():
+            first = records[0]
+            status = first['status']
+            report.write(f"ユーザー: {first['name']} (ID: {first['account']})\n")
+            if status == 'no_results':
+                report.write("  当選情報なし\n\n")
+            elif status == 'no_table':
+                report.write("  当選テーブルなし\n\n")
+            elif status == 'menu_error':
+                report.write(f"  エラー: 抽選結果の処理に失敗 - {first['detail']}\n\n")
+            elif status == 'error':
+                report.write(f"  エラー: {first['detail']}\n\n")
+            else:
+                for record in records:
+                    if record['use_date'] is not None:
+                        report.write(f"  日付: {record['use_date']}, 時間: {record['use_time']}\n")
+                result = self.CONFIRM_RESULTS.get(status) or f"確定処理エラー - {first['detail']}"
+                report.write(f"  処理結果: {result}\n\n")
+            report.end_record()
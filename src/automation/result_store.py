@@ -0,0 +1,196 @@
+"""タスクの結果を実行ごとにSQLiteのデータベースへ記録するモジュール"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from ..config import RESULT_BATCH_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    success INTEGER,
+    message TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT PRIMARY KEY,
+    name TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    kind TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL,
+    detail TEXT,
+    category TEXT,
+    facility TEXT,
+    use_date TEXT,
+    date_key TEXT,
+    use_time TEXT,
+    expiry TEXT,
+    elapsed REAL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id, kind, seq);
+CREATE INDEX IF NOT EXISTS idx_results_account ON results(account, kind, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_date ON results(kind, date_key, use_time);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results(kind, status);
+CREATE INDEX IF NOT EXISTS idx_results_run_account ON results(run_id, kind, account);
+CREATE INDEX IF NOT EXISTS idx_results_run_date ON results(run_id, kind, date_key, use_time);
+CREATE INDEX IF NOT EXISTS idx_results_run_status ON results(run_id, kind, status);
+"""
+
+# 1件分の結果として記録できる列（results テーブル）
+RESULT_COLUMNS = ("run_id", "kind", "seq", "account", "name", "status", "detail", "category", "facility",
+                  "use_date", "date_key", "use_time", "expiry", "elapsed", "recorded_at")
+
+# 結果の種類（kind）
+KIND_LOTTERY_STATUS = "lottery_status"   # 抽選申込状況（1件の申込みごとに1行）
+KIND_RESERVATION = "reservation"         # 予約状況（1件の予約ごとに1行）
+KIND_EXPIRY = "expiry"                   # 有効期限（1アカウント1行）
+KIND_CONFIRMATION = "confirmation"       # 抽選の確定（1件の当選ごとに1行）
+KIND_APPLICATION = "application"         # 抽選申込み（1アカウント1行）
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ResultStore:
+    """
+    結果をSQLiteのデータベースに記録するクラス（全てのスレッドで1つを共有する）。
+    WALモードで開き、結果は batch_size 件ごとにまとめて書き込みます（flush() で残りを書き込む）。
+    複数のプロセス（--shard で分担した場合など）から同じファイルに書き込めます。
+    """
+
+    def __init__(self, path, batch_size=RESULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self._lock = threading.RLock()
+        self._pending = []
+        self._accounts = {}
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._drop_passwords()
+        self._conn.commit()
+
+    def _drop_passwords(self):
+        # 以前の形式のデータベースに残っているパスワードの列を削除する（パスワードは記録しない）
+        columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(accounts)")]
+        if "password" not in columns:
+            return
+        # 削除した値がファイルの空き領域に残らないようにする
+        self._conn.execute("PRAGMA secure_delete=ON")
+        try:
+            self._conn.execute("ALTER TABLE accounts DROP COLUMN password")
+        except sqlite3.OperationalError:
+            # 列を削除できない古いSQLiteでは値だけを消す
+            self._conn.execute("UPDATE accounts SET password = NULL")
+
+    def start_run(self, task, params=None):
+        """実行を記録して run_id を返す"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (task, started_at, params) VALUES (?, ?, ?)",
+                (task, _now(), json.dumps(params or {}, ensure_ascii=False, default=str)),
+            )
+            return cursor.lastrowid
+
+    def finish_run(self, run_id, success, message=""):
+        """残りの結果を書き込み、実行の終了を記録する"""
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute("UPDATE runs SET finished_at = ?, success = ?, message = ? WHERE run_id = ?",
+                                   (_now(), int(bool(success)), message, run_id))
+
+    def run_started_at(self, run_id):
+        """実行の開始日時（"%Y-%m-%d %H:%M:%S"）を返す"""
+        with self._lock:
+            row = self._conn.execute("SELECT started_at FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row["started_at"] if row else _now()
+
+    def save_account(self, account, name=None):
+        """アカウントの最新の氏名を記録する（結果と一緒に書き込む）"""
+        with self._lock:
+            self._accounts[account] = (account, name, _now())
+
+    def add(self, run_id, kind, seq, account, status, **values):
+        """結果を1行追加する（values には RESULT_COLUMNS の列を指定する）"""
+        record = dict(values, run_id=run_id, kind=kind, seq=seq, account=account, status=status)
+        record.setdefault("recorded_at", _now())
+        with self._lock:
+            self._pending.append(tuple(record.get(column) for column in RESULT_COLUMNS))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """溜めている結果を1回のトランザクションで書き込む"""
+        with self._lock:
+            if not self._pending and not self._accounts:
+                return
+            pending, self._pending = self._pending, []
+            accounts, self._accounts = list(self._accounts.values()), {}
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO accounts (account, name, updated_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(account) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at",
+                    accounts,
+                )
+                self._conn.executemany(
+                    f"INSERT INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' * len(RESULT_COLUMNS))})",
+                    pending,
+                )
+
+    def query(self, sql, parameters=()):
+        """書き込み待ちの結果を書き込んでからSQLを実行し、sqlite3.Row のリストを返す"""
+        with self._lock:
+            self.flush()
+            return self._conn.execute(sql, parameters).fetchall()
+
+    def results(self, run_id, kind):
+        """実行 run_id の kind の結果を記録順（CSVの順）に返す"""
+        return self.query(
+            "SELECT * FROM results WHERE run_id = ? AND kind = ? ORDER BY seq, id",
+            (run_id, kind),
+        )
+
+    def accounts_without_applications(self, rounds=3):
+        """
+        直近 rounds 回の抽選申込状況の確認で、全て申込みがなかった（または表示エラーだった）アカウントを返す。
+        確認されなかった回があるアカウントは含めません。
+        """
+        runs = [row["run_id"] for row in self.query(
+            "SELECT DISTINCT run_id FROM results WHERE kind = ? ORDER BY run_id DESC LIMIT ?",
+            (KIND_LOTTERY_STATUS, rounds),
+        )]
+        if len(runs) < rounds:
+            return []
+        placeholders = ", ".join("?" * len(runs))
+        return self.query(
+            "SELECT account, MAX(name) AS name FROM results"
+            f" WHERE kind = ? AND run_id IN ({placeholders})"
+            " GROUP BY account"
+            " HAVING COUNT(DISTINCT run_id) = ? AND SUM(status NOT IN ('none', 'display_error')) = 0"
+            " ORDER BY account",
+            (KIND_LOTTERY_STATUS, *runs, len(runs)),
+        )
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
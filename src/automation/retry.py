@@ -0,0 +1,255 @@
+"""失敗した処理の再試行（指数バックオフ）とサーキットブレーカーのモジュール"""
+import time
+import random
+import threading
+
+from selenium.common.exceptions import (TimeoutException, StaleElementReferenceException,
+                                        NoSuchElementException, WebDriverException)
+
+from ..config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+
+# 待機中に中断を確認する間隔（秒）
+CHECK_INTERVAL = 0.5
+
+
+class LoginRejectedError(Exception):
+    """利用者番号・パスワードの誤りなどでログインが拒否された場合の例外（再試行しない）"""
+
+
+class CircuitOpenError(Exception):
+    """サイトの障害が続いているため処理を止めている場合の例外"""
+
+
+class RetryPolicy:
+    """
+    1種類のエラーに対する再試行の方針。
+    attempt 回目の失敗の後は base_delay * multiplier ** (attempt - 1) 秒（最大 max_delay 秒）に
+    ±jitter の割合のゆらぎを加えて待機し、最初の試行から max_elapsed 秒を超える場合は再試行しません。
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, multiplier=2.0, max_delay=60.0, jitter=0.3, max_elapsed=180.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+
+    def delay(self, attempt):
+        seconds = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        return max(0.0, seconds * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+# 再試行しない
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+# エラーの種類ごとの再試行の方針（上から順に判定する）
+DEFAULT_POLICIES = [
+    (LoginRejectedError, NO_RETRY),
+    (CircuitOpenError, NO_RETRY),
+    # 要素が再描画された・まだ表示されていない: すぐにやり直す
+    ((StaleElementReferenceException, NoSuchElementException), RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=2.0)),
+    # 画面の表示が遅い: 間隔を広げながらやり直す
+    (TimeoutException, RetryPolicy(max_attempts=3, base_delay=3.0, max_delay=30.0)),
+    # ブラウザとの通信エラー（タブの異常など）
+    (WebDriverException, RetryPolicy(max_attempts=2, base_delay=5.0, max_delay=30.0)),
+]
+
+
+def _request_policies():
+    """HTTPクライアントの通信エラー（接続失敗・タイムアウト・エラー応答）の再試行の方針"""
+    try:
+        import requests
+    except ImportError:
+        return []
+    return [((requests.ConnectionError, requests.Timeout, requests.HTTPError), RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=30.0))]
+
+
+class CircuitBreaker:
+    """
+    失敗が failure_threshold 回続いたら、全ての処理を cooldown 秒止めるクラス（サイトの障害時に無駄なアクセスを続けない）。
+    停止後の最初の処理が失敗した場合は、停止時間を倍にして（最大 max_cooldown 秒）もう一度止めます。
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN,
+                 max_cooldown=600.0, on_open=None, log=None):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_open = on_open
+        self.log = log
+        self.opened = 0
+        self._failures = 0
+        self._current_cooldown = cooldown
+        self._open_until = 0.0
+        self._half_open = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return time.monotonic() < self._open_until
+
+    def wait(self, should_continue=None):
+        """停止中であれば再開できるまで待機し、待機した秒数を返す（中断された場合は CircuitOpenError）"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return time.monotonic() - start
+            if should_continue is not None and not should_continue():
+                raise CircuitOpenError("サイトの障害が続いているため処理を中断しました")
+            time.sleep(min(remaining, CHECK_INTERVAL))
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._half_open = False
+            self._current_cooldown = self.cooldown
+
+    def record_failure(self):
+        with self._lock:
+            if time.monotonic() < self._open_until:
+                # 停止前に始まっていた処理の失敗は数えない
+                return
+            self._failures += 1
+            if self._half_open:
+                # 再開後の最初の処理も失敗した: 停止時間を延ばす
+                self._current_cooldown = min(self.max_cooldown, self._current_cooldown * 2)
+            elif self._failures < self.failure_threshold:
+                return
+            seconds = self._current_cooldown
+            self._open_until = time.monotonic() + seconds
+            self._half_open = True
+            self._failures = 0
+            self.opened += 1
+        if self.log:
+            self.log(f"失敗が続いているため、全ての処理を{seconds:.0f}秒間停止します")
+        if self.on_open:
+            self.on_open(seconds)
+
+
+class RetryStats:
+    """ステップごとの試行回数・再試行回数・待機時間を集計するクラス"""
+
+    def __init__(self):
+        self.steps = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, step):
+        return self.steps.setdefault(step, {"calls": 0, "retries": 0, "failures": 0, "wait": 0.0})
+
+    def add(self, step, calls=0, retries=0, failures=0, wait=0.0):
+        with self._lock:
+            entry = self._entry(step)
+            entry["calls"] += calls
+            entry["retries"] += retries
+            entry["failures"] += failures
+            entry["wait"] += wait
+
+    def summary(self):
+        """再試行があったステップの集計を1行の文字列で返す（なければ空文字）"""
+        with self._lock:
+            parts = [f"{step} {entry['retries']}回（待機{entry['wait']:.1f}秒、失敗{entry['failures']}件）"
+                     for step, entry in self.steps.items() if entry["retries"] or entry["failures"]]
+        return " / ".join(parts)
+
+
+class Retrier:
+    """
+    エラーの種類ごとの方針に従って処理を再試行するクラス（全てのスレッドで1つを共有する）。
+    失敗と成功はサーキットブレーカーに記録し、障害が続く場合は全体を止めます。
+    再試行の待機時間は records（step_records と同じ形式）と tracer（Tracer）にも記録します。
+    """
+
+    def __init__(self, policies=None, breaker=None, should_continue=None, log=None, records=None, tracer=None):
+        self.policies = list(policies) if policies is not None else DEFAULT_POLICIES + _request_policies()
+        self.breaker = breaker
+        self.should_continue = should_continue
+        self.log = log
+        self.records = records
+        self.tracer = tracer
+        self.stats = RetryStats()
+
+    def policy_for(self, error):
+        for error_types, policy in self.policies:
+            if isinstance(error, error_types):
+                return policy
+        return NO_RETRY
+
+    def next_delay(self, step, error, attempt, started, max_attempts=None):
+        """
+        attempt 回目の試行が error で失敗したときの待機時間を返す（再試行しない場合はNone）。
+        独自の繰り返し処理の中で使う場合に呼び出します（失敗はサーキットブレーカーにも記録されます）。
+        max_attempts を指定すると、方針よりも少ない試行回数で打ち切ります。
+        """
+        if self.breaker is not None and not isinstance(error, (LoginRejectedError, CircuitOpenError)):
+            self.breaker.record_failure()
+        policy = self.policy_for(error)
+        limit = min(policy.max_attempts, max_attempts) if max_attempts else policy.max_attempts
+        if attempt >= limit:
+            self.stats.add(step, failures=1)
+            return None
+        delay = policy.delay(attempt)
+        if policy.max_elapsed is not None and time.monotonic() - started + delay > policy.max_elapsed:
+            self.stats.add(step, failures=1)
+            return None
+        return delay
+
+    def sleep(self, step, seconds):
+        """再試行前の待機（中断されたらFalse）。サーキットブレーカーの停止中は再開まで待機する"""
+        start = time.monotonic()
+        traced = time.perf_counter()
+        deadline = start + seconds
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self.should_continue is not None and not self.should_continue():
+                    return False
+                time.sleep(min(remaining, CHECK_INTERVAL))
+            if self.breaker is not None:
+                self.breaker.wait(self.should_continue)
+            return True
+        except CircuitOpenError:
+            return False
+        finally:
+            waited = time.monotonic() - start
+            self.stats.add(step, retries=1, wait=waited)
+            if self.records is not None:
+                self.records.append({'step': f"再試行待機（{step}）", 'elapsed': waited})
+            if self.tracer is not None:
+                self.tracer.record(f"再試行待機（{step}）", traced, "wait")
+
+    def succeeded(self, step):
+        self.stats.add(step, calls=1)
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def call(self, step, func, *args, on_retry=None, **kwargs):
+        """
+        func(*args, **kwargs) を実行し、方針に従って再試行する。
+        再試行の前に on_retry(error, attempt) を呼び出します（画面を開き直すなど）。
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            if self.breaker is not None:
+                self.breaker.wait(self.should_continue)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self.next_delay(step, e, attempt, started)
+                if delay is None:
+                    raise
+                if self.log:
+                    self.log(f"{step}に失敗しました。{delay:.1f}秒後に再試行します（{attempt}回目の失敗: {type(e).__name__}）")
+                if not self.sleep(step, delay):
+                    raise
+                if on_retry is not None:
+                    on_retry(e, attempt)
+                attempt += 1
+                continue
+            self.succeeded(step)
+            return result
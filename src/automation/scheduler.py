@@ -0,0 +1,49 @@
+"""予定時刻ちょうどに処理を開始するためのモジュール"""
+import time
+from datetime import datetime
+
+# 予定時刻の直前、この秒数からは sleep せずに待機する（sleep の誤差で遅れないようにする）
+SPIN_SECONDS = 0.02
+
+# 待機中に中断を確認する間隔（秒）
+CHECK_INTERVAL = 0.5
+
+
+def parse_scheduled_time(value):
+    """
+    予定時刻（"2025-05-01 09:00:00" などのISO形式の文字列、datetime、またはUNIX時刻）を
+    UNIX時刻（秒）に変換する。解釈できない場合は ValueError を送出します。
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"予定時刻は YYYY-MM-DD HH:MM:SS の形式で指定してください: {value}")
+
+
+def format_timestamp(timestamp):
+    """UNIX時刻をログ表示用の文字列（ミリ秒まで）にする"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def wait_until(timestamp, should_continue=None):
+    """
+    UNIX時刻 timestamp まで待機し、予定時刻から実際に戻るまでの遅れ（秒）を返す。
+    予定時刻を過ぎている場合はすぐに戻ります。should_continue() がFalseを返した場合はNoneを返します。
+    待機の途中でシステムの時刻が変わっても影響を受けないよう、開始時に perf_counter の時刻に換算します。
+    """
+    deadline = time.perf_counter() + (timestamp - time.time())
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= SPIN_SECONDS:
+            break
+        if should_continue is not None and not should_continue():
+            return None
+        time.sleep(min(remaining - SPIN_SECONDS, CHECK_INTERVAL))
+
+    while time.perf_counter() < deadline:
+        pass
+    return max(0.0, time.perf_counter() - deadline)
@@ -0,0 +1,65 @@
+"""利用者番号ごとのログインセッション（Cookie）を保存するモジュール"""
+import os
+import re
+import json
+import time
+import threading
+
+from ..utils.helpers import get_writable_dir
+
+# 保存したセッションを再利用する最大時間（秒）
+DEFAULT_MAX_AGE = 20 * 60
+
+
+class SessionStore:
+    """ログイン後のCookieを利用者番号ごとにディスクへ保存し、次回のログインを省略するためのクラス"""
+
+    def __init__(self, directory=None, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory or os.path.join(get_writable_dir(), "sessions")
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, user_number):
+        safe_name = re.sub(r'[^0-9A-Za-z_-]', '_', str(user_number))
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def load(self, user_number):
+        """有効期限内のCookieを返す（保存されていない・期限切れの場合はNone）"""
+        path = self._path(user_number)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        now = time.time()
+        if now - data.get("saved_at", 0) > self.max_age:
+            self.discard(user_number)
+            return None
+
+        cookies = [c for c in data.get("cookies", []) if not c.get("expiry") or c["expiry"] > now]
+        return cookies or None
+
+    def save(self, user_number, cookies):
+        """Cookieを保存する（一時ファイルに書いてから置き換える）"""
+        path = self._path(user_number)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        data = {"user_number": str(user_number), "saved_at": time.time(), "cookies": cookies}
+        with self._lock:
+            try:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(data, file, ensure_ascii=False)
+                os.replace(temp_path, path)
+            except OSError:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def discard(self, user_number):
+        """保存済みのセッションを削除する"""
+        try:
+            os.remove(self._path(user_number))
+        except OSError:
+            pass
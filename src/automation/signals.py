@@ -0,0 +1,31 @@
+"""PyQt5を使わずにタスクの進捗を通知するためのシグナルモジュール"""
+import threading
+
+
+class Signal:
+    """
+    pyqtSignal と同じ connect() / emit() の使い方ができる簡易シグナル。
+    emit() は呼び出したスレッドで、接続された関数を接続した順に呼び出します。
+    """
+
+    def __init__(self):
+        self._slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot):
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        """接続を解除する（slot を省略すると全て解除する）"""
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+
+    def emit(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
@@ -0,0 +1,1727 @@
+"""各タスク（抽選申込み・確認・確定など）の処理モジュール（PyQt5には依存しない）"""
+import os
+import csv
+import time
+import random
+import calendar
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+from ..config import (URL, MAX_CONCURRENCY, BROWSER_PROFILES, DEFAULT_BROWSER_PROFILE,
+                      BROWSER_MEMORY_LIMIT_MB, BROWSER_MAX_ACCOUNTS,
+                      CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN, SCHEDULE_PREPARE_LEAD,
+                      NETWORK_CAPTURE_TIMEOUT, RESULT_DB_NAME, TRACE_METRICS_INTERVAL)
+from ..utils.helpers import get_writable_dir
+from .accounts import AccountSource, load_accounts, parse_shard
+from .browser import recycle_tab
+from .checkpoint import CheckpointJournal, checkpoint_path
+from .dialogs import DialogMonitor
+from .rate_limiter import RateLimiter
+from .reports import LotteryStatusReport, ReservationReport, ExpiryReport, ConfirmationReport, NO_EXPIRY_DATE, date_key
+from .result_store import ResultStore, KIND_APPLICATION
+from .retry import Retrier, CircuitBreaker, LoginRejectedError
+from .scheduler import parse_scheduled_time, format_timestamp, wait_until
+from .driver_resolver import driver_resolver
+from .dom_extract import extract_lottery_applications, extract_reservations, extract_lottery_results
+from .driver_pool import DriverPool
+from .http_client import HttpClientPool, HttpEngineError
+from .network_capture import ResponseCapture, CaptureStats
+from . import page_parsers
+from .session_store import SessionStore
+from .signals import Signal
+from .timing import StepTimer
+from .tracing import Tracer, collect_page_metrics
+from .waits import PageWaiter, DEFAULT_MIN_JITTER, DEFAULT_MAX_JITTER
+
+# 実行できるタスクの種類
+TASK_TYPES = ("generate_csv", "lottery_application", "check_lottery_status",
+              "confirm_lottery", "check_reservation", "check_expiry", "account_sweep")
+
+
+class TaskRunner:
+    """
+    タスクを実行するクラス。
+    画面からは WorkerThread（別スレッド）経由で、コマンドラインからは直接 run() を呼び出して使います。
+    進捗は update_signal（ログ）、progress_signal（0～100）、finished_signal（成否, メッセージ）で通知します。
+    """
+
+    def __init__(self, task_type, params=None):
+        self.update_signal = Signal()
+        self.progress_signal = Signal()
+        self.finished_signal = Signal()
+        self.task_type = task_type
+        self.params = params if params else {}
+        self.is_running = True
+        self._session_store = None
+        self._result_store = None
+        self.driver_pool = None  # run_accounts() の実行中に使うChromeドライバーのプール
+        self.run_id = None  # 結果のデータベースでのこの実行の番号（最初に結果を記録するときに決まる）
+        self.account_elapsed = {}  # CSVの行番号 -> アカウントの処理時間（秒）
+        self.step_records = []  # 処理ステップごとの所要時間（ベンチマーク用）
+        # 処理ステップのスパン（params["trace"]がFalseなら記録しない）。run_accounts() の最後にトレースファイルを書き出す
+        self.tracer = Tracer(enabled=self.params.get("trace", True))
+        # サイトへのアクセス間隔は全てのブラウザで共有する
+        self.rate_limiter = RateLimiter.from_params(self.params, log=lambda message: self.update_signal.emit(message))
+        # ログイン・画面移動・申込みの再試行。失敗が続く場合は全てのブラウザのアクセスを止める
+        breaker = CircuitBreaker(
+            failure_threshold=self.params.get("circuit_failure_threshold", CIRCUIT_FAILURE_THRESHOLD),
+            cooldown=self.params.get("circuit_cooldown", CIRCUIT_COOLDOWN),
+            on_open=lambda seconds: self.rate_limiter.pause(seconds, "失敗が続いているため"),
+        )
+        self.retrier = Retrier(breaker=breaker, should_continue=lambda: self.is_running,
+                               log=lambda message: self.update_signal.emit(message), records=self.step_records,
+                               tracer=self.tracer)
+        # 一覧などを画面の代わりにページの応答から取り出せた件数
+        self.capture_stats = CaptureStats()
+
+    def run(self):
+        try:
+            if self.task_type == "generate_csv":
+                self.generate_csv_files()
+            elif self.task_type == "lottery_application":
+                self.run_lottery_application()
+            elif self.task_type == "check_lottery_status":
+                self.check_lottery_status()
+            elif self.task_type == "confirm_lottery":
+                self.confirm_lottery_selection()
+            elif self.task_type == "check_reservation":
+                self.check_reservation_status()
+            elif self.task_type == "check_expiry":
+                self.check_account_expiry()
+            elif self.task_type == "account_sweep":
+                self.sweep_accounts()
+
+            self.close_result_store(True, "処理が正常に完了しました。")
+            self.finished_signal.emit(True, "処理が正常に完了しました。")
+        except Exception as e:
+            self.update_signal.emit(f"エラーが発生しました: {str(e)}")
+            self.close_result_store(False, f"エラーが発生しました: {str(e)}")
+            self.finished_signal.emit(False, f"エラーが発生しました: {str(e)}")
+
+    def stop(self):
+        """処理中のアカウントが終わった時点で処理を中断する"""
+        self.is_running = False
+
+    def get_concurrency(self, total_users):
+        """同時実行数（起動するブラウザ数）をパラメータから決定する"""
+        try:
+            concurrency = int(self.params.get("concurrency", 1))
+        except (TypeError, ValueError):
+            concurrency = 1
+        return max(1, min(concurrency, MAX_CONCURRENCY, max(total_users, 1)))
+
+    def get_site_url(self):
+        """アクセス先のURL（params["base_url"]でローカルのモックサイトなどに切り替え可能）"""
+        return self.params.get("base_url") or URL
+
+    def get_shard(self):
+        """アカウントの分割指定（params["shard"]、例: "2/4"）を (2, 4) で返す（指定がなければNone）"""
+        return parse_shard(self.params.get("shard"))
+
+    def get_output_dir(self):
+        """
+        結果ファイルの出力先（params["output_dir"]がなければ書き込み可能なディレクトリ）。
+        アカウントを分割して実行する場合は、分割ごとのサブフォルダ（shard_2of4 など）に出力します。
+        """
+        output_dir = self.params.get("output_dir") or get_writable_dir()
+        shard = self.get_shard()
+        if shard:
+            output_dir = os.path.join(output_dir, f"shard_{shard[0]}of{shard[1]}")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    def get_session_store(self):
+        """ログインセッションの保存先を返す（params["session_cache"]がFalseの場合はNone）"""
+        if not self.params.get("session_cache", True):
+            return None
+        if self._session_store is None:
+            self._session_store = SessionStore(self.params.get("session_dir"))
+        return self._session_store
+
+    def get_result_store(self):
+        """
+        結果を記録するデータベースを返す（初めて呼び出したときにこの実行を記録し、run_id を決める）。
+        場所は params["result_db"]、省略時は出力先（分割実行の場合も共通）の results.sqlite3 です。
+        """
+        if self._result_store is None:
+            path = self.params.get("result_db")
+            if not path:
+                output_dir = self.params.get("output_dir") or get_writable_dir()
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                path = os.path.join(output_dir, RESULT_DB_NAME)
+            self._result_store = ResultStore(path)
+            self.run_id = self._result_store.start_run(self.task_type, self.params)
+        return self._result_store
+
+    def close_result_store(self, success, message):
+        """この実行の終了をデータベースに記録して閉じる（結果を記録していなければ何もしない）"""
+        if self._result_store is None:
+            return
+        try:
+            self._result_store.finish_run(self.run_id, success, message)
+            self._result_store.close()
+        except Exception as e:
+            self.update_signal.emit(f"結果のデータベースへの記録に失敗しました: {e}")
+        self._result_store = None
+
+    def restore_session(self, driver, user_number):
+        """保存済みのCookieでログイン状態を復元する（復元できればTrue）"""
+        store = self.get_session_store()
+        cookies = store.load(user_number) if store else None
+        if not cookies:
+            return False
+
+        # Cookieを設定するために、先に同じドメインのページを開く
+        driver.get(self.get_site_url())
+        driver.delete_all_cookies()
+        for cookie in cookies:
+            cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'path', 'secure', 'httpOnly', 'expiry')}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+        driver.get(self.get_site_url())
+
+        # ユーザーメニューが表示されればログイン済み
+        try:
+            WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "userName")))
+            self.update_signal.emit(f"保存済みのセッションでログインしました: {user_number}")
+            return True
+        except Exception:
+            store.discard(user_number)
+            driver.delete_all_cookies()
+            return False
+
+    def save_session(self, driver, user_number):
+        """ログイン後のCookieを保存する"""
+        store = self.get_session_store()
+        if store is None:
+            return
+        try:
+            store.save(user_number, driver.get_cookies())
+        except Exception as e:
+            self.update_signal.emit(f"セッションの保存に失敗しました: {user_number} - {e}")
+
+    def browser_login(self, driver, user_number, password, timeout=10):
+        """
+        ブラウザでログインする（保存済みのセッションが有効ならログインを省略）。
+        画面の表示が遅い場合などは再試行の方針に従ってやり直し、
+        アラートが表示されてログインが拒否された場合は LoginRejectedError を送出します。
+        """
+        def login():
+            if self.restore_session(driver, user_number):
+                return
+
+            # サイトにアクセス
+            driver.get(self.get_site_url())
+
+            # 「ログイン」ボタンの表示まで待機
+            wait = WebDriverWait(driver, timeout)
+            login_button = wait.until(EC.element_to_be_clickable((By.ID, "btn-login")))
+            login_button.click()
+
+            # ログインフォームの表示を待機
+            user_number_field = wait.until(EC.presence_of_element_located((By.NAME, "userId")))
+            password_field = driver.find_element(By.NAME, "password")
+
+            # 利用者番号とパスワードを入力
+            user_number_field.send_keys(user_number)
+            password_field.send_keys(password)
+            dialogs = DialogMonitor.for_driver(driver)
+            dialogs.clear()
+            password_field.send_keys(Keys.RETURN)  # エンターキーで送信
+
+            # ユーザーメニューが表示されるか、アラートが表示されるまで待機
+            wait.until(lambda d: dialogs.pending() or d.find_elements(By.ID, "userName"))
+            shown = dialogs.take()
+            if shown:
+                # アラートが出たということはログイン失敗（再試行しない）
+                raise LoginRejectedError(shown[0].message)
+
+            self.update_signal.emit(f"ログイン成功: {user_number}")
+            self.save_session(driver, user_number)
+
+        with self.tracer.span("ログイン"):
+            self.retrier.call("ログイン", login)
+
+    def http_login(self, client, user_number, password):
+        """HTTPクライアントでログインする（保存済みのセッションが有効ならログインを省略。通信エラーは再試行する）"""
+        store = self.get_session_store()
+        cookies = store.load(user_number) if store else None
+        if cookies and client.restore_session(cookies):
+            self.update_signal.emit(f"保存済みのセッションでログインしました: {user_number}")
+            return
+        if cookies:
+            store.discard(user_number)
+
+        with self.tracer.span("ログイン"):
+            self.retrier.call("ログイン", client.login, user_number, password)
+        if store:
+            store.save(user_number, client.export_cookies())
+
+    def open_menu(self, driver, step, menu_xpath, link_xpath, timeout=10):
+        """
+        メニューのモーダルを開いてリンクをクリックする（失敗した場合はトップページに戻ってやり直す）。
+        """
+        def click():
+            menu = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, menu_xpath)))
+            driver.execute_script("arguments[0].click();", menu)
+            link = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, link_xpath)))
+            driver.execute_script("arguments[0].click();", link)
+
+        with self.tracer.span(step):
+            self.retrier.call(step, click, on_retry=lambda error, attempt: driver.get(self.get_site_url()))
+
+    def start_capture(self, driver):
+        """
+        これから行う画面の操作で読み込まれる応答の記録を開始する。
+        params["network_capture"] がFalseの場合や、応答が記録できない環境ではNoneを返します。
+        """
+        if not self.params.get("network_capture", True):
+            return None
+        capture = ResponseCapture.for_driver(driver)
+        if not capture.supported:
+            return None
+        capture.mark()
+        return capture
+
+    def read_captured(self, capture, step, parse, started):
+        """
+        start_capture() 以降に読み込まれた応答を parse(body, response) で解析して返す（取り出せなければNone）。
+        Noneの場合は呼び出し元で画面から取得し、record_page_read() で記録してください。
+        """
+        if capture is None:
+            return None
+        value = capture.read(parse, timeout=self.params.get("network_capture_timeout", NETWORK_CAPTURE_TIMEOUT))
+        if value is not None:
+            self.capture_stats.add(step, True)
+            self.step_records.append({'step': f"{step}（応答から取得）", 'elapsed': time.perf_counter() - started})
+            self.tracer.record(f"{step}（応答から取得）", started)
+        return value
+
+    def record_page_read(self, step, started):
+        """画面から取得した場合の所要時間を記録する（応答から取得した場合との比較用）"""
+        self.capture_stats.add(step, False)
+        self.step_records.append({'step': f"{step}（画面から取得）", 'elapsed': time.perf_counter() - started})
+        self.tracer.record(f"{step}（画面から取得）", started)
+
+    @staticmethod
+    def html_page(parse):
+        """ページ本体（HTML）の応答だけを parse(body) で解析する関数を返す（ResponseCapture.read() に渡す）"""
+        def parse_response(body, response):
+            if response.type != "Document" or "html" not in response.mime_type:
+                return None
+            return parse(body)
+        return parse_response
+
+    def get_engine(self):
+        """取得方式（"browser": Chrome, "http": ブラウザなし）をパラメータから決定する"""
+        engine = self.params.get("engine", "browser")
+        return engine if engine in ("browser", "http") else "browser"
+
+    def get_browser_profile(self):
+        """ブラウザの読み込み設定（"standard" / "fast"）をパラメータから決定する"""
+        profile = self.params.get("browser_profile", DEFAULT_BROWSER_PROFILE)
+        return profile if profile in BROWSER_PROFILES else DEFAULT_BROWSER_PROFILE
+
+    def reset_tab(self, driver):
+        """作業用のタブを1つだけ残し、前のアカウントのCookieとストレージを消去する"""
+        recycle_tab(driver, self.get_browser_profile())
+
+    def run_accounts(self, users, process_account, handle_result, headless, extra_arguments=None, engine="browser"):
+        """
+        アカウントごとの処理をChromeドライバーのプールで並列に実行する関数。
+        process_account(driver, index, row) はワーカースレッドで実行され、
+        handle_result(index, row, result) はCSVの行順にこのスレッドで呼び出されます。
+        engine が "http" の場合は driver の代わりに SiteHttpClient が渡されます。
+        """
+        total_users = len(users)
+        concurrency = self.get_concurrency(total_users)
+
+        if engine == "http":
+            base_url = self.get_site_url()
+            self.update_signal.emit(f"HTTPクライアントで処理します（ブラウザは起動しません）: {base_url}")
+            pool = HttpClientPool(concurrency, base_url)
+        else:
+            profile = self.get_browser_profile()
+            # ChromeDriverの場所はここで1回だけ決定し、以降のブラウザの起動・再起動で使い回す
+            driver_path = driver_resolver.resolve()
+            self.update_signal.emit(f"ChromeDriver: {driver_path}（{driver_resolver.source}）")
+            self.update_signal.emit(f"Chromeブラウザを起動しています...（読み込み設定: {BROWSER_PROFILES[profile]}）")
+            pool = DriverPool(concurrency, headless, extra_arguments, profile,
+                              memory_limit_mb=self.params.get("browser_memory_limit_mb", BROWSER_MEMORY_LIMIT_MB),
+                              max_uses=self.params.get("browser_max_accounts", BROWSER_MAX_ACCOUNTS),
+                              log=self.update_signal.emit)
+            self.driver_pool = pool
+        if concurrency > 1:
+            self.update_signal.emit(f"同時実行数: {concurrency}（{concurrency}件を並列処理します）")
+        limiter = self.rate_limiter
+        # ページの処理時間の取得はWebDriverの往復が増えるため、トレースを記録する場合に一部のアカウントだけで行う
+        metrics_interval = self.params.get("trace_metrics_interval", TRACE_METRICS_INTERVAL) if self.tracer.enabled else 0
+        if limiter.base_rate > 0:
+            self.update_signal.emit(f"アクセスの上限: {limiter.base_rate:.0f}件/分（同時セッション数: {limiter.capacity}）")
+
+        def run_task(index, row):
+            if not self.is_running:
+                return None
+            # アクセス間隔の調整（ユーザー間の待機の代わり）。待機中に中断された場合は処理しない
+            queued = time.perf_counter()
+            with limiter.session(lambda: self.is_running) as allowed:
+                self.tracer.record("アクセス待ち", queued, "wait")
+                if not allowed:
+                    return None
+                with pool.driver() as driver:
+                    if engine == "browser":
+                        self.tracer.instrument(driver)
+                        # 前のアカウントのタブを片付けて、同じタブを使い回す
+                        with self.tracer.span("タブの初期化"):
+                            self.reset_tab(driver)
+                    start = time.perf_counter()
+                    with self.tracer.span("アカウント処理", "account", account=getattr(row, 'user_number', index)) as span:
+                        try:
+                            result = process_account(driver, index, row)
+                        except Exception:
+                            limiter.report_error()
+                            raise
+                        finally:
+                            elapsed = time.perf_counter() - start
+                            self.step_records.append({'step': 'アカウント処理', 'elapsed': elapsed})
+                            self.account_elapsed[index] = elapsed
+                            if engine == "browser" and metrics_interval and index % metrics_interval == 0:
+                                # 最後に表示したページのChromeの処理時間とナビゲーションタイミング
+                                metrics = collect_page_metrics(driver)
+                                span.update(metrics)
+                                self.tracer.counter("Chrome", metrics)
+                    if result is not False:
+                        limiter.report_success()
+                    return result
+
+        def deliver(entry):
+            index, row, future = entry
+            result = future.result()
+            if result is None:
+                return
+            handle_result(index, row, result)
+            self.progress_signal.emit(int(((index + 1) / total_users) * 100))
+
+        # 先読みしすぎないように、実行中の件数を同時実行数の2倍までに制限する
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            for index, row in enumerate(users):
+                if not self.is_running:
+                    break
+                pending.append((index, row, executor.submit(run_task, index, row)))
+                while len(pending) >= concurrency * 2:
+                    deliver(pending.popleft())
+
+            while pending:
+                deliver(pending.popleft())
+
+            if not self.is_running:
+                self.update_signal.emit("処理が中断されました。")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            pool.close()
+            self.driver_pool = None
+            retry_summary = self.retrier.stats.summary()
+            if retry_summary:
+                self.update_signal.emit(f"再試行: {retry_summary}")
+            capture_summary = self.capture_stats.summary()
+            if capture_summary:
+                self.update_signal.emit(f"応答からの取得: {capture_summary}")
+            self.export_trace()
+
+    def export_trace(self):
+        """
+        記録したスパンをトレースファイル（trace_タスク名_日時.json）に書き出し、ステップごとの集計表を表示する。
+        保存先は params["trace_dir"]（省略時は結果ファイルの出力先）です。
+        """
+        if not self.tracer.enabled or not self.tracer.events:
+            return
+        for line in self.tracer.summary_lines():
+            self.update_signal.emit(line)
+        try:
+            trace_dir = self.params.get("trace_dir") or self.get_output_dir()
+            os.makedirs(trace_dir, exist_ok=True)
+            path = os.path.join(trace_dir, f"trace_{self.task_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            self.tracer.export(path, task=self.task_type, engine=self.get_engine())
+            self.update_signal.emit(f"トレースを保存しました（chrome://tracing で開けます）: {path}")
+        except Exception as e:
+            self.update_signal.emit(f"トレースの保存に失敗しました: {e}")
+
+    # CSVファイル生成機能
+    def generate_csv_files(self):
+        try:
+            input_file = self.params.get("input_file", "Johoku1.csv")
+            booking_dates = self.params.get("booking_dates", [])
+            out1 = self.params.get("out1", "Johoku10.csv")
+            out2 = self.params.get("out2", "Johoku20.csv")
+
+            self.update_signal.emit(f"入力ファイル {input_file} を読み込んでいます...")
+
+            if not os.path.exists(input_file):
+                self.update_signal.emit(f"{input_file} が見つかりません。")
+                self.finished_signal.emit(False, f"{input_file} が見つかりません。")
+                return
+
+            source = AccountSource(input_file)
+            user_count = source.validate()
+            if user_count == 0:
+                self.update_signal.emit("ユーザーCSVが空です。")
+                self.finished_signal.emit(False, "ユーザーCSVが空です。")
+                return
+
+            self.update_signal.emit(f"{user_count}人のユーザー情報を読み込みました。")
+            self.update_signal.emit(f"予約日を分配します: {booking_dates}")
+
+            # 予約日を分配する（全ユーザーを2回ずつ申し込む）
+            new_dates = self.distribute_dates(user_count * 2, booking_dates)
+
+            # 入力CSVの列はそのまま残し、booking_date列だけを設定して2つのCSVに書き出す
+            fieldnames = list(source.fieldnames)
+            if "booking_date" not in fieldnames:
+                fieldnames.append("booking_date")
+            for out_file, dates in ((out1, new_dates[:user_count]), (out2, new_dates[user_count:])):
+                with open(out_file, "w", encoding="utf-8", newline="") as file:
+                    writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction="ignore")
+                    writer.writeheader()
+                    for (_, row), booking_date in zip(source.rows(), dates):
+                        row["booking_date"] = booking_date
+                        writer.writerow(row)
+
+            self.update_signal.emit(f"出力完了:\n{out1}\n{out2}")
+        except Exception as e:
+            self.update_signal.emit(f"CSV生成中にエラーが発生しました: {str(e)}")
+            raise
+
+    # 予約日を分配する関数
+    def distribute_dates(self, total, booking_dates):
+        """total人分の予約日をbooking_datesに均等に割り当てたリストを返す"""
+        base = total // len(booking_dates)
+        remainder = total % len(booking_dates)
+        distribution = [base + (1 if i < remainder else 0) for i in range(len(booking_dates))]
+
+        self.update_signal.emit(f"日付分配: 合計{total}人を{len(booking_dates)}日に分配します")
+        self.update_signal.emit(f"各日付の予約数: {distribution}")
+
+        new_dates = []
+        for date, count in zip(booking_dates, distribution):
+            new_dates.extend([date] * count)
+        return new_dates
+
+    # 抽選申込の実行
+    def run_lottery_application(self):
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        apply_number_text = self.params.get("apply_number_text", "申込み1件目")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+
+        self.update_signal.emit(f"CSVファイル {csv_file} から予約情報を読み込んでいます...")
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        # CSVからデータを読み込み
+        # 進捗の記録（resume=True の場合は前回までに申込み済みのアカウントをスキップする）
+        resume = self.params.get("resume", False)
+        journal = CheckpointJournal(checkpoint_path(self.get_output_dir(), csv_file, apply_number_text), resume=resume)
+        skip = (lambda account: journal.is_done(account, apply_number_text)) if resume else None
+
+        users = load_accounts(csv_file, required=('user_number', 'password', 'booking_date', 'time_code'), skip=skip,
+                              shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+        if resume:
+            self.update_signal.emit(f"前回の記録から再開します: 申込み済みの{users.skipped}人をスキップします（記録: {journal.path}）")
+
+        # 予定時刻の指定があれば、事前にログインとカレンダーの準備をしておき、予定時刻に一斉に送信する
+        scheduled_at = self.params.get("scheduled_at")
+        submissions = []  # 予定時刻に送信したアカウントの記録
+        if scheduled_at:
+            scheduled_at = parse_scheduled_time(scheduled_at)
+            prepare_lead = float(self.params.get("schedule_prepare_lead", SCHEDULE_PREPARE_LEAD))
+            concurrency = self.get_concurrency(total_users)
+            self.update_signal.emit(f"予定時刻 {format_timestamp(scheduled_at)} に送信します"
+                                    f"（{prepare_lead:.0f}秒前からログインとカレンダーの準備を始めます）")
+            if total_users > concurrency:
+                self.update_signal.emit(f"事前に準備できるのは同時実行数の{concurrency}人までです。"
+                                        f"残りの{total_users - concurrency}人は送信開始後に順次処理します。")
+
+        # 結果のデータベースには、アカウントごとに申込みの結果（applied / already_applied / failed）を記録する
+        store = self.get_result_store()
+        outcomes = {}
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+            password = row.password
+            booking_date = row.booking_date
+            time_code = row.time_code
+
+            # booking_date を正しく分解（例: 2025-05-02 -> 年=2025, 月=5, 日=2）
+            date_parts = booking_date.split('-')
+            year = int(date_parts[0])
+            month = int(date_parts[1])
+            booking_day = int(date_parts[2])
+
+            # 月の最終日を取得
+            month_end = calendar.monthrange(year, month)[1]
+
+            self.update_signal.emit(f"\nユーザー {user_number} の予約処理を開始します... ({index+1}/{total_users})")
+            self.update_signal.emit(f"予約日: {year}年{month}月{booking_day}日, 月末: {month_end}日")
+            self.update_signal.emit(f"申込み種類: {apply_number_text}")
+
+            # 選択された申込み種類を使用
+            progress = {'step': None}
+            start = time.perf_counter()
+            success = None
+            if scheduled_at:
+                success = self.handle_scheduled_booking(driver, user_number, password, booking_day, time_code, apply_number_text,
+                                                        month_end, scheduled_at, prepare_lead, progress=progress)
+            if success is None:
+                success = self.handle_booking_process(driver, user_number, password, booking_day, time_code, apply_number_text, month_end,
+                                                      progress=progress)
+
+            # 結果をすぐに記録する（中断しても次回はここから再開できる）
+            if progress.get('already_applied'):
+                outcome = 'already_applied'
+            else:
+                outcome = 'applied' if success else 'failed'
+            journal.record(row, apply_number_text, progress['step'], outcome, time.perf_counter() - start)
+            outcomes[index] = outcome
+            if 'latency' in progress:
+                submissions.append((progress['fired_at'], user_number, progress['lateness'], progress['latency'], outcome))
+            return success
+
+        def handle_result(index, row, success):
+            user_number = row.user_number
+            store.add(self.run_id, KIND_APPLICATION, index + 1, user_number, outcomes.pop(index, 'failed'),
+                      name=row.name, detail=apply_number_text, use_date=row.booking_date, date_key=date_key(row.booking_date),
+                      use_time=row.time_code, elapsed=self.account_elapsed.pop(index, None))
+            if success:
+                self.update_signal.emit(f"ユーザー {user_number} の全処理が完了しました。")
+            else:
+                self.update_signal.emit(f"ユーザー {user_number} の処理は失敗しました。次のユーザーに進みます。")
+
+        try:
+            # 応答しなくなったブラウザはプールへの返却時に再起動される
+            self.run_accounts(users, process_account, handle_result, headless)
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+            self.update_signal.emit("全ての予約処理が完了しました。")
+
+        except Exception as e:
+            self.update_signal.emit(f"実行中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            journal.close()
+            if submissions:
+                self.write_submission_times(submissions, scheduled_at)
+
+    def write_submission_times(self, submissions, scheduled_at):
+        """予定時刻に送信したアカウントの送信開始時刻・遅れ・所要時間をCSVファイルに書き出す"""
+        submissions = sorted(submissions)
+        output_file = os.path.join(self.get_output_dir(), "scheduled_submissions.csv")
+        with open(output_file, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["user_number", "scheduled_at", "fired_at", "lateness_ms", "latency_sec", "outcome"])
+            for fired_at, user_number, lateness, latency, outcome in submissions:
+                writer.writerow([user_number, format_timestamp(scheduled_at), format_timestamp(fired_at),
+                                 f"{lateness * 1000:.1f}", f"{latency:.3f}", outcome])
+
+        spread = submissions[-1][0] - submissions[0][0]
+        self.update_signal.emit(f"予定時刻に{len(submissions)}人分を送信しました"
+                                f"（最初と最後の送信開始の差: {spread * 1000:.0f}ミリ秒、"
+                                f"最大の送信時間: {max(entry[3] for entry in submissions):.2f}秒）")
+        self.update_signal.emit(f"送信時刻の記録: {output_file}")
+
+    # 既存の機能を呼び出す実装部分（元のスクリプトから必要な関数を実装）
+    def human_like_mouse_move(self, driver, element):
+        """より人間らしいマウスの動きをシミュレート"""
+        actions = ActionChains(driver)
+
+        # 現在のマウス位置から要素まで、途中で数回停止しながら移動
+        for _ in range(3):
+            # 要素までの途中の位置にランダムに移動
+            actions.move_by_offset(
+                random.randint(-100, 100),
+                random.randint(-100, 100)
+            )
+            actions.pause(random.uniform(0.1, 0.3))
+
+        # 最終的に要素まで移動
+        actions.move_to_element(element)
+        actions.pause(random.uniform(0.1, 0.2))
+        actions.perform()
+
+    def human_like_click(self, driver, element):
+        """より人間らしいクリック操作をシミュレート"""
+        try:
+            # まず要素まで自然に移動
+            self.human_like_mouse_move(driver, element)
+
+            # クリック前に少し待機（人間らしい遅延）
+            time.sleep(random.uniform(0.1, 0.3))
+
+            # クリック
+            element.click()
+
+            # クリック後に少し待機
+            time.sleep(random.uniform(0.1, 0.2))
+        except Exception as e:
+            self.update_signal.emit(f"人間らしいクリックに失敗しました: {str(e)}")
+            # 通常のクリックにフォールバック
+            element.click()
+
+    def navigate_to_date(self, driver, booking_day, month_end, waiter=None):
+        """
+        カレンダー上で指定された日を選択するためのセル位置(day_in_week)を計算します。
+        """
+        if waiter is None:
+            waiter = self.create_waiter(driver)
+
+        def click_next_week_with_retry(max_retries=3):
+            """次の週ボタンを安全にクリックし、例外が発生した場合は再試行する"""
+            for attempt in range(max_retries):
+                try:
+                    # 要素が表示され、クリック可能になるまで待機
+                    wait = WebDriverWait(driver, 10)
+                    next_week_button = wait.until(
+                        EC.presence_of_element_located((By.XPATH, "//button[@id='next-week']"))
+                    )
+                    previous_header = waiter.calendar_header_text()
+
+                    # JavaScriptを使用して直接クリック
+                    driver.execute_script("arguments[0].click();", next_week_button)
+
+                    # クリック後にカレンダーのヘッダーが再描画されるのを待機
+                    if previous_header:
+                        try:
+                            waiter.calendar_changed(previous_header)
+                        except TimeoutException:
+                            # クリック自体は済んでいるので再クリックはしない
+                            self.update_signal.emit("カレンダーの更新を確認できませんでした。処理を続行します。")
+                    else:
+                        # ヘッダーが見つからない場合は従来どおり一定時間待機
+                        time.sleep(1.5)
+                    return True
+                except StaleElementReferenceException:
+                    if attempt < max_retries - 1:
+                        self.update_signal.emit(f"StaleElementReferenceException が発生しました。再試行 {attempt + 1}/{max_retries}")
+                        time.sleep(2)
+                        continue
+                    else:
+                        self.update_signal.emit("最大再試行回数を超えました")
+                        return False
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        self.update_signal.emit(f"次の週ボタンのクリックに失敗しました: {e} - 再試行 {attempt + 1}/{max_retries}")
+                        time.sleep(2)
+                        continue
+                    else:
+                        self.update_signal.emit(f"次の週ボタンのクリックに失敗しました: {e} - 最大再試行回数を超えました")
+                        return False
+
+        def advance_weeks(weeks):
+            """目的の週まで一度に移動し、移動しきれなかった分は従来のクリックで進める"""
+            advanced = waiter.advance_calendar(weeks)
+            if advanced < weeks:
+                self.update_signal.emit(f"カレンダーの一括移動が{advanced}/{weeks}週で止まりました。クリックで移動します。")
+
+            success_count = advanced
+            for _ in range(weeks - advanced):
+                if click_next_week_with_retry():
+                    success_count += 1
+                else:
+                    self.update_signal.emit(f"ナビゲーション失敗。{success_count}/{weeks} 回成功")
+            return success_count
+
+        try:
+            if booking_day >= 29:
+                # 29日以降の処理
+                if advance_weeks(4) < 4:
+                    self.update_signal.emit("警告: すべてのナビゲーションが成功しませんでした")
+
+                # 月末の日数に応じた例外処理
+                if month_end == 31:
+                    day_mapping = {29: 5, 30: 6, 31: 7}
+                    day_in_week = day_mapping.get(booking_day)
+                    if day_in_week is None:
+                        raise ValueError(f"無効な予約日: {booking_day}")
+                elif month_end == 30:
+                    day_mapping = {29: 6, 30: 7}
+                    day_in_week = day_mapping.get(booking_day)
+                    if day_in_week is None:
+                        raise ValueError(f"無効な予約日: {booking_day}")
+                elif month_end == 29:
+                    if booking_day == 29:
+                        day_in_week = 7
+                    else:
+                        raise ValueError(f"無効な予約日: {booking_day}")
+                else:
+                    raise ValueError(f"無効な月末日: {month_end}")
+            else:
+                # 1日～28日の場合
+                weeks_to_advance = (booking_day - 1) // 7
+                day_in_week = (booking_day - 1) % 7 + 1
+
+                if advance_weeks(weeks_to_advance) < weeks_to_advance:
+                    self.update_signal.emit(f"警告: すべてのナビゲーション({weeks_to_advance}回)が成功しませんでした")
+
+            return day_in_week
+        except Exception as e:
+            self.update_signal.emit(f"カレンダーナビゲーションエラー: {e}")
+            # エラー発生時の画面キャプチャ
+            try:
+                driver.save_screenshot(f"calendar_nav_error.png")
+            except:
+                pass
+            raise
+
+    def check_for_captcha(self, driver):
+        """reCAPTCHAの有無をチェックする"""
+        try:
+            # まず記録されたダイアログにCaptcha特有のメッセージがあるかチェック
+            if DialogMonitor.for_driver(driver).find("確認のため、チェックを入れてから"):
+                return True
+
+            # reCAPTCHAの要素を探す
+            captcha_iframe = driver.find_elements(By.CSS_SELECTOR, "iframe[src*='recaptcha']")
+            if captcha_iframe:
+                return True
+            return False
+        except Exception as e:
+            self.update_signal.emit(f"Captchaチェック中にエラーが発生: {str(e)}")
+            return False
+
+    def create_waiter(self, driver, timer=None, timeout=10, jitter=True):
+        """パラメータのゆらぎ設定を反映した PageWaiter を作成する（jitter=False の場合はゆらぎを入れない）"""
+        return PageWaiter(
+            driver,
+            timeout=timeout,
+            min_jitter=self.params.get("min_jitter", DEFAULT_MIN_JITTER) if jitter else 0.0,
+            max_jitter=self.params.get("max_jitter", DEFAULT_MAX_JITTER) if jitter else 0.0,
+            timer=timer,
+            dialogs=DialogMonitor.for_driver(driver)
+        )
+
+    def prepare_booking(self, driver, waiter, timer, user_number, password, booking_day, month_end):
+        """
+        ログインして抽選申込みのカレンダーを開き、予約日の週まで移動する（申込みの送信の直前まで）。
+        予約日の列番号（1～7）を返します。
+        """
+        # ログイン（保存済みのセッションが有効ならログインを省略する）。
+        # 確認系のタスクと同じく、再試行の方針とサーキットブレーカーに従う（ログインの拒否は再試行しない）
+        with timer.step("ログイン", replaced_sleep=1.5):
+            self.browser_login(driver, user_number, password)
+
+        # 「抽選」タブをクリック
+        with timer.step("抽選メニュー", replaced_sleep=1.0):
+            lottery_tab = waiter.clickable((By.XPATH, "//a[@data-target='#modal-menus']"))
+            driver.execute_script("arguments[0].click();", lottery_tab)
+
+            # 「抽選申込み」ボタンをクリック（モーダルの表示を待つ）
+            waiter.modal_visible((By.ID, "modal-menus"))
+            lottery_application_button = waiter.clickable((By.XPATH, "//a[contains(text(), '抽選申込み')]"))
+            driver.execute_script("arguments[0].click();", lottery_application_button)
+
+        # 「テニス（人工芝）」の申込みボタンをクリック
+        with timer.step("種目選択", replaced_sleep=1.5):
+            artificial_grass_tennis_button = waiter.clickable((By.XPATH, "//tr[td[contains(text(), 'テニス（人工芝')]]//button[contains(text(), '申込み')]"))
+            driver.execute_script("arguments[0].click();", artificial_grass_tennis_button)
+            waiter.jitter()
+
+        # 公園選択（「城北中央公園」）
+        with timer.step("公園選択", replaced_sleep=2.0):
+            park_dropdown = waiter.option_available((By.ID, "bname"), "城北中央公園")
+            Select(park_dropdown).select_by_visible_text("城北中央公園")
+            waiter.jitter()
+
+        # 施設選択（「テニス（人工芝）」）: 公園に応じて選択肢が読み込まれるのを待つ
+        with timer.step("施設選択", replaced_sleep=2.0):
+            facility_dropdown = waiter.option_available((By.ID, "iname"), "テニス（人工芝・照明有）")
+            Select(facility_dropdown).select_by_visible_text("テニス（人工芝・照明有）")
+            waiter.calendar_ready()
+            waiter.jitter()
+
+        # 日付が見つかるまで翌週ボタンを押す（従来は1回のクリックごとに1.5秒待機）
+        weeks_to_advance = 4 if booking_day >= 29 else (booking_day - 1) // 7
+        with timer.step("日付へ移動", replaced_sleep=1.0 + 1.5 * weeks_to_advance):
+            day_in_week = self.navigate_to_date(driver, booking_day, month_end, waiter)
+
+        return day_in_week
+
+    def submit_booking(self, driver, waiter, timer, user_number, day_in_week, time_code, apply_number_text):
+        """
+        prepare_booking() で開いたカレンダーで日付・時間帯のセルを選択し、申込みを送信する。
+        送信した場合は 'submitted'、既に申し込み済みだった場合は 'already_applied' を返します。
+        """
+        dialogs = waiter.dialogs
+
+        # 日付と時間を選択する部分
+        time_index = int(time_code)
+
+        # 日付のセルを見つける
+        xpath = f'//*[@id="usedate-bheader-{time_index}"]/td[{day_in_week}]'
+        with timer.step("セル選択", replaced_sleep=1.5):
+            cell = waiter.clickable((By.XPATH, xpath))
+
+            # セルの現在の状態をチェック（すでに選択されているかどうか）
+            cell_class = cell.get_attribute("class")
+            self.update_signal.emit(f"クリック前のセルのクラス: {cell_class}")
+
+            # まだ選択されていない場合のみクリック
+            if "selected" not in cell_class.lower() and "active" not in cell_class.lower():
+                self.update_signal.emit(f"日付時間の選択: 時間帯={time_index}, 曜日={day_in_week}")
+                driver.execute_script("arguments[0].click();", cell)
+                # セルが選択状態になる（またはアラートが出る）まで待機
+                waiter.cell_selected((By.XPATH, xpath))
+            else:
+                self.update_signal.emit(f"セルはすでに選択されています。クリックをスキップします。")
+
+            # アラートをチェック（表示されたものは自動でOKが押されている）
+            try:
+                for dialog in dialogs.take():
+                    alert_text = dialog.message
+                    self.update_signal.emit(f"予期せぬアラートが表示されています: {alert_text}")
+
+                    # アラートが「利用時間帯を選択して下さい」の場合、もう一度クリックするが、注意して行う
+                    if "利用時間帯を選択して下さい" in alert_text:
+                        self.update_signal.emit("時間帯選択をやり直します。")
+                        waiter.jitter()
+
+                        # セルを再取得して状態を確認
+                        cell = driver.find_element(By.XPATH, xpath)
+                        cell_class = cell.get_attribute("class")
+
+                        # 選択されていない場合のみクリック
+                        if "selected" not in cell_class.lower() and "active" not in cell_class.lower():
+                            driver.execute_script("arguments[0].click();", cell)
+                            waiter.cell_selected((By.XPATH, xpath))
+            except:
+                # やり直しに失敗しても続行
+                pass
+
+        # 申込みボタンをクリック
+        with timer.step("申込みボタン", replaced_sleep=0.5):
+            try:
+                apply_button = waiter.clickable((By.XPATH, "//button[contains(text(), '申込み')]"))
+                driver.execute_script("arguments[0].click();", apply_button)
+            except Exception as e:
+                self.update_signal.emit(f"申込みボタンのクリックに失敗: {str(e)}")
+                # 画面をキャプチャして状況を確認
+                try:
+                    driver.save_screenshot(f"apply_button_error_{user_number}.png")
+                except:
+                    pass
+                raise e
+
+        # ここからキャプチャ監視対象の処理
+        with timer.step("申込み番号選択", replaced_sleep=1.8):
+            try:
+                # 申込み番号を選択
+                apply_number_select = waiter.clickable((By.ID, "apply"))
+                driver.execute_script("arguments[0].scrollIntoView(true);", apply_number_select)
+                driver.execute_script("arguments[0].click();", apply_number_select)
+                Select(apply_number_select).select_by_visible_text(apply_number_text)
+                waiter.jitter()
+            except NoSuchElementException as e:
+                # 修正: apply_number_textがエラーメッセージに含まれるかチェック
+                if apply_number_text in str(e):
+                    self.update_signal.emit(f"ユーザー {user_number} は既に {apply_number_text} で申し込み済みのようです。次のユーザーに進みます。")
+                    return 'already_applied'
+                raise e
+
+        # 確認画面で申込みボタンをクリックし、アラートのOKをクリック（2回）
+        for confirm_step in ("申込み確認1", "申込み確認2"):
+            with timer.step(confirm_step, replaced_sleep=4.0):
+                confirm_apply_button = waiter.clickable((By.XPATH, "//button[contains(text(), '申込み')]"))
+                driver.execute_script("arguments[0].click();", confirm_apply_button)
+
+                # 確認ダイアログは表示と同時にOKが押される（イベントを読み取れない環境では最大10秒待機）
+                if dialogs.wait(fallback_timeout=10):
+                    waiter.jitter()
+
+        return 'submitted'
+
+    def handle_scheduled_booking(self, driver, user_number, password, booking_day, time_code, apply_number_text, month_end,
+                                 scheduled_at, prepare_lead, progress=None):
+        """
+        予定時刻の prepare_lead 秒前からログインしてカレンダーの予約日の週まで移動しておき、
+        予定時刻（UNIX時刻）ちょうどに日付の選択と申込みの送信を行う。
+        送信の遅れと所要時間は progress の 'fired_at', 'lateness', 'latency' に記録されます。
+        準備や送信に失敗した場合、Captchaが表示された場合はNoneを返します（呼び出し元で通常の予約処理をやり直す）。
+        """
+        # 早く準備しすぎるとセッションが切れるため、予定時刻の少し前まで待機する
+        if wait_until(scheduled_at - prepare_lead, lambda: self.is_running) is None:
+            return False
+
+        timer = StepTimer(self.update_signal.emit, label=f"ユーザー {user_number}", sink=self.step_records, progress=progress,
+                          tracer=self.tracer)
+        waiter = self.create_waiter(driver, timer, timeout=60)
+        waiter.dialogs.clear()
+        try:
+            day_in_week = self.prepare_booking(driver, waiter, timer, user_number, password, booking_day, month_end)
+        except Exception as e:
+            self.update_signal.emit(f"ユーザー {user_number} の事前準備に失敗しました: {type(e).__name__}, {str(e)}")
+            self.rate_limiter.report_error()
+            return None
+
+        remaining = scheduled_at - time.time()
+        if remaining > 0:
+            self.update_signal.emit(f"ユーザー {user_number} の準備が完了しました。送信まで{remaining:.1f}秒待機します。")
+
+        # 送信はゆらぎを入れずに一気に行う
+        waiter = self.create_waiter(driver, timer, timeout=60, jitter=False)
+        waiter.dialogs.clear()
+        lateness = wait_until(scheduled_at, lambda: self.is_running)
+        if lateness is None:
+            return False
+
+        fired_at = time.time()
+        start = time.perf_counter()
+        try:
+            outcome = self.submit_booking(driver, waiter, timer, user_number, day_in_week, time_code, apply_number_text)
+        except Exception as e:
+            self.update_signal.emit(f"ユーザー {user_number} の予定時刻の送信に失敗しました: {type(e).__name__}, {str(e)}")
+            self.rate_limiter.report_error()
+            return None
+        latency = time.perf_counter() - start
+
+        if progress is not None:
+            progress.update(fired_at=fired_at, lateness=lateness, latency=latency)
+            if outcome == 'already_applied':
+                progress['already_applied'] = True
+        self.step_records.append({'step': '予定時刻からの遅れ', 'elapsed': lateness})
+        self.step_records.append({'step': '予定時刻の送信', 'elapsed': latency})
+        self.update_signal.emit(f"[計測] ユーザー {user_number}: 予定時刻から{lateness * 1000:.0f}ミリ秒後に送信開始、"
+                                f"{latency:.2f}秒で送信完了")
+
+        if outcome == 'submitted' and self.check_for_captcha(driver):
+            self.update_signal.emit(f"Captchaが検出されました。ユーザー {user_number} は通常の手順でやり直します。")
+            self.reset_tab(driver)
+            self.rate_limiter.report_captcha()
+            if self.rate_limiter.acquire(lambda: self.is_running) is None:
+                return False
+            return None
+
+        timer.log_summary()
+        self.retrier.succeeded("抽選申込み")
+        if outcome == 'submitted':
+            self.update_signal.emit(f"ユーザー {user_number} の予約処理が正常に完了しました。")
+        return True
+
+    def handle_booking_process(self, driver, user_number, password, booking_day, time_code, apply_number_text, month_end, max_retries=3, progress=None):
+        """
+        予約処理を実行する関数。
+        progress に辞書を渡すと、最後に開始したステップ名（'step'）と、
+        既に申し込み済みだった場合は 'already_applied' が記録されます。
+        """
+        retry_count = 0
+        started = time.monotonic()
+
+        while retry_count < max_retries:
+            # 各ステップの所要時間を計測してログに出力する
+            timer = StepTimer(self.update_signal.emit, label=f"ユーザー {user_number}", sink=self.step_records, progress=progress,
+                              tracer=self.tracer)
+            waiter = self.create_waiter(driver, timer, timeout=60)
+            dialogs = waiter.dialogs
+            # 前のアカウントや前回の試行で表示されたダイアログの記録は使わない
+            dialogs.clear()
+            try:
+                # ログインしてカレンダーを開き、日付・時間帯を選択して申込みを送信する
+                day_in_week = self.prepare_booking(driver, waiter, timer, user_number, password, booking_day, month_end)
+                outcome = self.submit_booking(driver, waiter, timer, user_number, day_in_week, time_code, apply_number_text)
+                if outcome == 'already_applied':
+                    if progress is not None:
+                        progress['already_applied'] = True
+                    timer.log_summary()
+                    self.retrier.succeeded("抽選申込み")
+                    return True
+
+                # Captchaチェック
+                if self.check_for_captcha(driver):
+                    self.update_signal.emit(f"Captchaが検出されました。ユーザー {user_number} の処理を再試行します。(試行回数: {retry_count + 1}/{max_retries})")
+                    retry_count += 1
+
+                    try:
+                        driver.save_screenshot(f"captcha_detected_{user_number}_retry_{retry_count}.png")
+                    except:
+                        pass
+
+                    # 作業用のタブを空白ページに戻し、Cookieを消去してからやり直す
+                    self.reset_tab(driver)
+
+                    # 全てのブラウザのアクセスを一時停止し、再開できるまで待機する
+                    self.rate_limiter.report_captcha()
+                    if self.rate_limiter.acquire(lambda: self.is_running) is None:
+                        return False
+                    continue
+
+                timer.log_summary()
+                self.retrier.succeeded("抽選申込み")
+
+                # 予約完了確認
+                try:
+                    completion_message = driver.find_element(By.XPATH, "//div[contains(text(), '申込みが完了しました')]")
+                    if completion_message:
+                        self.update_signal.emit(f"ユーザー {user_number} の予約処理が正常に完了しました。")
+                        return True
+                except:
+                    pass
+
+                return True
+
+            except Exception as e:
+                self.update_signal.emit(f"予約プロセス中にエラーが発生: {user_number}, エラー: {type(e).__name__}, {str(e)}")
+
+                try:
+                    driver.save_screenshot(f"error_process_{user_number}_retry_{retry_count}.png")
+                except:
+                    pass
+
+                retry_count += 1
+                self.rate_limiter.report_error()
+
+                # エラーの種類に応じた待機時間（再試行しないエラーの場合はNone）
+                delay = self.retrier.next_delay("抽選申込み", e, retry_count, started, max_attempts=max_retries)
+                if delay is not None:
+                    self.update_signal.emit(f"{delay:.1f}秒後にリトライを実行します。({retry_count}/{max_retries})")
+                    try:
+                        # 作業用のタブを空白ページに戻し、Cookieを消去してからやり直す
+                        self.reset_tab(driver)
+
+                        # 待機後、エラーが続いている場合はアクセス間隔が広がる
+                        if not self.retrier.sleep("抽選申込み", delay):
+                            return False
+                        if self.rate_limiter.acquire(lambda: self.is_running) is None:
+                            return False
+                    except Exception as tab_error:
+                        # このブラウザは使えないため、プールへの返却時に再起動してもらい、このユーザーはスキップする
+                        self.update_signal.emit(f"タブの切り替え中にエラーが発生: {str(tab_error)}")
+                        self.update_signal.emit(f"ブラウザを再起動するため、ユーザー {user_number} の処理をスキップします。")
+                        if self.driver_pool is not None:
+                            self.driver_pool.mark_failed(driver)
+                        return False
+                else:
+                    self.update_signal.emit(f"リトライを終了します（{retry_count}回失敗）。ユーザー {user_number} の処理をスキップします。")
+                    return False
+
+        return False
+
+    def login_account(self, driver, user_number, password, engine="browser"):
+        """取得方式に応じてログインする（engine が "http" の場合、driver は SiteHttpClient）"""
+        if engine == "http":
+            self.http_login(driver, user_number, password)
+            self.update_signal.emit(f"ログイン成功: {user_number}")
+        else:
+            self.browser_login(driver, user_number, password)
+
+    def read_lottery_applications(self, driver, user_number, engine="browser"):
+        """
+        ログイン後の画面から「抽選申込みの確認」を開いて申込情報を取得する。
+        戻り値は LotteryStatusReport.add() に渡す形式です。
+        """
+        if engine == "http":
+            try:
+                applications = driver.fetch_lottery_applications()
+            except HttpEngineError as e:
+                self.update_signal.emit(f"抽選申込みの確認画面を開けませんでした: {user_number} - エラー詳細: {e}")
+                return {'status': 'failed'}
+            except Exception as e:
+                self.update_signal.emit(f"予約情報の取得に失敗しました: {user_number} - エラー詳細: {e}")
+                return {'status': 'display_error'}
+        else:
+            # モーダルを表示して「抽選申込みの確認」リンクをクリック
+            capture = self.start_capture(driver)
+            started = time.perf_counter()
+            try:
+                self.open_menu(driver, "抽選メニュー", "//a[@data-target='#modal-menus']", "//a[text()='抽選申込みの確認']")
+                self.update_signal.emit(f"抽選申込みの確認ボタンをクリック: {user_number}")
+            except Exception as e:
+                self.update_signal.emit(f"抽選申込みの確認ボタンのクリックに失敗しました: {user_number} - エラー詳細: {e}")
+                return {'status': 'failed'}
+
+            # 画面の表示を待たずに、読み込まれたページの応答から申込情報を取り出す
+            applications = self.read_captured(capture, "抽選申込み一覧", self.html_page(page_parsers.parse_lottery_applications), started)
+            if applications is None:
+                # 利用日と時刻の情報を取得（表全体を1回の呼び出しで取得する。表が表示されない場合もある）
+                try:
+                    applications = extract_lottery_applications(driver)
+                except Exception as e:
+                    self.update_signal.emit(f"予約情報の取得に失敗しました: {user_number} - エラー詳細: {e}")
+                    # モーダル表示には成功しているので、予約情報なしと判断
+                    return {'status': 'display_error'}
+                self.record_page_read("抽選申込み一覧", started)
+
+        bookings = [(a['status'], a['category'], a['facility'], a['date'], a['time']) for a in applications]
+        return {'status': 'ok', 'bookings': bookings}
+
+    # 抽選申込状況の確認処理
+    def check_lottery_status(self):
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+        engine = self.get_engine()  # 取得方式
+
+        # CSVファイルからデータを読み込み
+        self.update_signal.emit(f"ファイル {csv_file} からユーザー情報を読み込んでいます...")
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        users = load_accounts(csv_file, shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+
+        # 書き込み可能なディレクトリを取得
+        writable_dir = self.get_output_dir()
+        # 結果ファイルを初期化
+        output_file = os.path.join(writable_dir, "reservation_info.txt")
+        self.update_signal.emit(f"出力ファイル: {output_file}")
+
+        report = LotteryStatusReport(output_file, self.update_signal.emit, self.get_result_store(), self.run_id)
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+
+            self.update_signal.emit(f"\nユーザー {user_number} の処理を開始します... ({index+1}/{total_users})")
+
+            # ログイン（保存済みのセッションが有効ならログインを省略する）
+            try:
+                self.login_account(driver, user_number, row.password, engine)
+            except Exception as e:
+                self.update_signal.emit(f"ログインに失敗: {user_number} - エラー詳細: {e}")
+                return {'status': 'failed'}
+
+            return self.read_lottery_applications(driver, user_number, engine)
+
+        def handle_result(index, row, result):
+            report.add(row, result, elapsed=self.account_elapsed.pop(index, None))
+
+        try:
+            self.run_accounts(users, process_account, handle_result, headless, engine=engine)
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+
+            # 予約情報を集計して書き込む
+            report.finish(total_users)
+
+        except Exception as e:
+            self.update_signal.emit(f"予約確認処理中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            # 中断・エラー時もそれまでの結果を保存する
+            report.close()
+
+    # 抽選確定処理
+    def confirm_lottery_selection(self):
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        user_count = self.params.get("user_count", "6")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+
+        # ヘッドレスモード情報をログに出力
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        # 書き込み可能なディレクトリを取得
+        writable_dir = self.get_output_dir()
+        # 結果を書き込むファイル名
+        output_file = os.path.join(writable_dir, "lottery_results.txt")
+        self.update_signal.emit(f"出力ファイル: {output_file}")
+
+        # CSVファイルからデータを読み込み
+        self.update_signal.emit(f"ファイル {csv_file} からユーザー情報を読み込んでいます...")
+        users = load_accounts(csv_file, shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+
+        report = ConfirmationReport(output_file, self.update_signal.emit, self.get_result_store(), self.run_id)
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+            password = row.password
+            # 氏名情報の取得（'Kana'または'Name'があれば使用、なければuser_numberを使用）
+            user_name = row.display_name
+
+            self.update_signal.emit(f"\nユーザー {user_number} ({user_name}) の処理を開始します... ({index+1}/{total_users})")
+
+            # 結果（CSVの順番で記録するため、まとめて返す。ConfirmationReport.add() に渡す形式）
+            result = {'status': 'error', 'wins': [], 'error': None}
+
+            try:
+                # ログイン（保存済みのセッションが有効ならログインを省略する）
+                self.browser_login(driver, user_number, password)
+
+                # モーダルを表示して「抽選結果」リンクをクリック
+                try:
+                    self.open_menu(driver, "抽選メニュー", "//a[@data-target='#modal-menus']", "//a[text()='抽選結果']")
+                    self.update_signal.emit(f"抽選結果ボタンをクリック: {user_number}")
+
+                    # 当選結果のテーブルが表示されるまで待機
+                    try:
+                        WebDriverWait(driver, 3).until(
+                            EC.presence_of_element_located((By.XPATH, "//table[@class='table sp-block-table']/tbody/tr"))
+                        )
+
+                        # 当選結果の情報を取得し、同じ呼び出しで各行の選択ボタンをクリック
+                        rows = extract_lottery_results(driver, select=True)
+
+                        if rows:
+                            for table_row in rows:
+                                booking_date = table_row['date']
+                                booking_time = table_row['time']
+                                if booking_date is None or booking_time is None or not table_row['clicked']:
+                                    self.update_signal.emit(f"行の処理に失敗: 日付・時間または選択ボタンが見つかりません ({table_row})")
+                                    continue
+
+                                result['wins'].append((booking_date, booking_time))
+                                self.update_signal.emit(f"当選情報: {user_name},{booking_date},{booking_time}")
+
+                            # 確認ボタンをクリック (JavaScriptでクリック)
+                            try:
+                                confirm_button = driver.find_element(By.ID, "btn-go")
+                                driver.execute_script("arguments[0].click();", confirm_button)
+                                self.update_signal.emit(f"確認ボタンをクリック: {user_number}")
+
+                                # 利用人数の入力ページが表示されるまで待機
+                                WebDriverWait(driver, 10).until(
+                                    EC.presence_of_element_located((By.XPATH, "//input[@name='applyNum']"))
+                                )
+
+                                # 利用人数を入力
+                                user_count_inputs = driver.find_elements(By.XPATH, "//input[@name='applyNum']")
+                                for input_field in user_count_inputs:
+                                    input_field.clear()  # 既存の入力をクリア
+                                    input_field.send_keys(user_count)  # 指定された利用人数を設定
+
+                                # 確認ボタンをクリック (JavaScriptでクリック)
+                                final_confirm_button = driver.find_element(By.XPATH, "//button[contains(text(), '確認')]")
+                                dialogs = DialogMonitor.for_driver(driver)
+                                dialogs.clear()
+                                driver.execute_script("arguments[0].click();", final_confirm_button)
+                                self.update_signal.emit(f"最終確認ボタンをクリック: {user_number}")
+
+                                # ポップアップの確認（表示と同時にOKが押される）
+                                if dialogs.wait(fallback_timeout=5):
+                                    self.update_signal.emit(f"ポップアップのOKボタンをクリック: {user_number}")
+                                    result['status'] = 'confirmed'
+                                else:
+                                    self.update_signal.emit(f"ポップアップは表示されませんでした: {user_number}")
+                                    result['status'] = 'confirmed_no_popup'
+                            except Exception as e:
+                                self.update_signal.emit(f"確定処理中にエラー: {str(e)}")
+                                result.update(status='confirm_error', error=str(e))
+                        else:
+                            self.update_signal.emit(f"ユーザー {user_number} に当選情報がありません")
+                            result['status'] = 'no_results'
+                    except Exception as e:
+                        self.update_signal.emit(f"当選テーブルが見つかりません: {user_number} - {str(e)}")
+                        result.update(status='no_table', wins=[])
+
+                except Exception as e:
+                    self.update_signal.emit(f"抽選結果の処理に失敗しました: {user_number} - エラー詳細: {e}")
+                    result.update(status='menu_error', error=str(e), wins=[])
+
+
+            except Exception as e:
+                self.update_signal.emit(f"エラーが発生しました: {str(e)}")
+                result.update(status='error', error=str(e), wins=[])
+
+            return result
+
+        def handle_result(index, row, result):
+            report.add(row, result, elapsed=self.account_elapsed.pop(index, None))
+
+        try:
+            self.run_accounts(users, process_account, handle_result, headless,
+                              extra_arguments=["--disable-popup-blocking"])  # ポップアップを無効化
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+
+            # 処理完了メッセージ
+            self.update_signal.emit("\n抽選確定処理が完了しました")
+            self.update_signal.emit(f"結果は {output_file} に保存されました")
+
+        except Exception as e:
+            self.update_signal.emit(f"抽選確定処理中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            # 中断・エラー時もそれまでの結果を保存する
+            report.close()
+
+    def read_reservation_list(self, driver, user_number):
+        """ログイン後の画面から「予約の確認」を開き、予約一覧を取得する（表がない場合はNone）"""
+        # 「予約の確認」メニューを開く
+        capture = self.start_capture(driver)
+        started = time.perf_counter()
+        self.open_menu(driver, "予約メニュー", "//a[@data-target='#modal-reservation-menus']", "//a[text()='予約の確認']")
+        self.update_signal.emit(f"予約の確認ボタンをクリック: {user_number}")
+
+        # 読み込まれたページの応答から取り出せれば、画面の表示を待たない（表がない場合は {'reservations': None}）
+        captured = self.read_captured(
+            capture, "予約一覧", self.html_page(lambda body: {'reservations': page_parsers.parse_reservations(body)}), started
+        )
+        if captured is not None:
+            return captured['reservations']
+
+        # 一旦待機して画面を読み込む
+        time.sleep(2)
+
+        # 表全体を1回の呼び出しで取得する（存在しない場合もエラーにしない）
+        reservations = extract_reservations(driver)
+        self.record_page_read("予約一覧", started)
+        return reservations
+
+    def read_reservations(self, driver, row, engine="browser"):
+        """
+        ログイン後の画面から予約情報を取得する（取得できない場合は例外を送出）。
+        戻り値は ReservationReport.add() に渡す形式です。
+        """
+        user_number = row.user_number
+
+        if engine == "http":
+            reservations = driver.fetch_reservations()
+        else:
+            reservations = self.read_reservation_list(driver, user_number)
+
+        result = {'reservations': [], 'failed': False, 'error': None}
+        if reservations is None:
+            # テーブルが存在しない場合
+            self.update_signal.emit("予約テーブルが存在しません（予約なし）")
+        elif not reservations:
+            self.update_signal.emit("テーブルはありますが、予約情報が存在しません。")
+        else:
+            self.update_signal.emit(f"予約件数: {len(reservations)}")
+            result['reservations'] = [(reservation['date'], reservation['time']) for reservation in reservations]
+            self.update_signal.emit(f"予約情報を取得しました: {user_number}")
+        return result
+
+    @staticmethod
+    def reservation_error(error):
+        """予約情報を取得できなかったアカウントの結果（ReservationReport.add() に渡す形式）"""
+        return {'reservations': [], 'failed': True, 'error': str(error)}
+
+    # 予約状況の確認処理
+    def check_reservation_status(self):
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+        engine = self.get_engine()  # 取得方式
+
+        # ヘッドレスモード情報をログに出力
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        # CSVファイルからデータを読み込み
+        self.update_signal.emit(f"ファイル {csv_file} からユーザー情報を読み込んでいます...")
+        users = load_accounts(csv_file, shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+
+        # 書き込み可能なディレクトリを取得
+        writable_dir = self.get_output_dir()
+        # 結果を書き込むファイル名
+        result_file = os.path.join(writable_dir, "r_info.txt")
+        self.update_signal.emit(f"出力ファイル: {result_file}")
+
+        # 結果ファイルの初期化
+        report = ReservationReport(result_file, self.update_signal.emit, self.get_result_store(), self.run_id)
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+
+            self.update_signal.emit(f"\nユーザー {user_number} の処理を開始します... ({index+1}/{total_users})")
+
+            try:
+                # ログイン（保存済みのセッションが有効ならログインを省略する）
+                self.login_account(driver, user_number, row.password, engine)
+                return self.read_reservations(driver, row, engine)
+            except Exception as e:
+                self.update_signal.emit(f"ユーザー {user_number} の処理中にエラーが発生しました - エラー詳細: {e}")
+                return self.reservation_error(e)
+
+        def handle_result(index, row, result):
+            report.add(row, result, elapsed=self.account_elapsed.pop(index, None))
+
+        try:
+            self.run_accounts(users, process_account, handle_result, headless, engine=engine)
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+
+            # 予約情報を集計して書き込む
+            report.finish()
+
+            self.update_signal.emit("\n予約状況の確認が完了しました")
+            self.update_signal.emit(f"結果は {result_file} に保存されました")
+
+        except Exception as e:
+            self.update_signal.emit(f"予約状況確認処理中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            # 中断・エラー時もそれまでの結果を保存する
+            report.close()
+
+    @staticmethod
+    def parse_expiry_date(expiry_info):
+        """有効期限の表示（例: "2025年2月28日"）をdatetimeオブジェクトに変換する"""
+        year = int(expiry_info[:4])
+        month = int(expiry_info[5:expiry_info.index("月")])
+        day = int(expiry_info[expiry_info.index("月")+1:expiry_info.index("日")])
+        return datetime(year, month, day)
+
+    @staticmethod
+    def expiry_result(row, expiry_info, expiry_date=NO_EXPIRY_DATE, login_failed=False):
+        """有効期限の確認結果（ExpiryReport.add() に渡す形式）。有効期限が取得できない場合は遠い未来の日付でソートする"""
+        return {
+            'user_number': row.user_number,
+            'user_name': row.display_name,  # 'Kana'または'Name'があれば使用、なければuser_numberを使用
+            'expiry_info': expiry_info,
+            'expiry_date': expiry_date,
+            'login_failed': login_failed
+        }
+
+    def login_failed_expiry_result(self, row, error):
+        """ログインに失敗したアカウントの有効期限の確認結果"""
+        if isinstance(error, LoginRejectedError):
+            # アラートが出たということはログイン失敗
+            self.update_signal.emit(f"アラート検出: {row.user_number} - {error}")
+            return self.expiry_result(row, f"ログイン失敗({error})", login_failed=True)
+        self.update_signal.emit(f"ログイン失敗: {row.user_number} - {error}")
+        return self.expiry_result(row, "ログイン失敗", login_failed=True)
+
+    def read_expiry(self, driver, row, engine="browser"):
+        """
+        ログイン後の画面から利用者情報を開いて有効期限を取得する。
+        戻り値は ExpiryReport.add() に渡す形式です。
+        """
+        user_number = row.user_number
+
+        if engine == "http":
+            try:
+                expiry_info = driver.fetch_expiry()
+            except Exception as e:
+                self.update_signal.emit(f"有効期限の取得に失敗: {user_number} - {e}")
+                return self.expiry_result(row, "取得失敗")
+            if not expiry_info:
+                self.update_signal.emit(f"有効期限の取得に失敗: {user_number} - 次のユーザーに移行します")
+                return self.expiry_result(row, "取得失敗")
+        else:
+            wait = WebDriverWait(driver, 10)
+
+            # マイメニューのドロップダウンを表示
+            try:
+                dropdown_menu = wait.until(EC.element_to_be_clickable((By.ID, "userName")))
+                dropdown_menu.click()
+            except Exception:
+                self.update_signal.emit(f"メニュー表示失敗: {user_number} - 次のユーザーに移行します")
+                return self.expiry_result(row, "メニュー表示失敗")
+
+            # 利用者情報の変更・削除・更新リンクをクリック
+            capture = self.start_capture(driver)
+            started = time.perf_counter()
+            try:
+                user_info_link = wait.until(
+                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), '利用者情報の変更・削除・更新')]"))
+                )
+                user_info_link.click()
+            except Exception:
+                self.update_signal.emit(f"利用者情報リンククリック失敗: {user_number} - 次のユーザーに移行します")
+                return self.expiry_result(row, "リンククリック失敗")
+
+            # 読み込まれたページの応答から有効期限を取り出す（取り出せなければ画面から取得する）
+            expiry_info = self.read_captured(capture, "有効期限", self.html_page(page_parsers.parse_expiry), started)
+            if expiry_info is None:
+                # ページ遷移の完了を待機
+                time.sleep(2)
+
+                # 有効期限を特定のXPathで探す
+                try:
+                    expiry_element = wait.until(
+                        EC.presence_of_element_located((By.XPATH,
+                            "//th[.//label[@for='validEndYMD']]/following-sibling::td"
+                        ))
+                    )
+                    expiry_info = expiry_element.text.strip()
+                except Exception:
+                    self.update_signal.emit(f"有効期限の取得に失敗: {user_number} - 次のユーザーに移行します")
+                    # 失敗した場合も結果に追加
+                    return self.expiry_result(row, "取得失敗")
+                self.record_page_read("有効期限", started)
+
+        self.update_signal.emit(f"有効期限を取得: {user_number} - {expiry_info}")
+
+        # 日付をdatetimeオブジェクトに変換
+        try:
+            return self.expiry_result(row, expiry_info, self.parse_expiry_date(expiry_info))
+        except Exception as e:
+            self.update_signal.emit(f"日付解析エラー: {expiry_info} - {str(e)}")
+            # 解析に失敗しても情報は保存
+            return self.expiry_result(row, expiry_info)
+
+    # 有効期限の確認処理
+    def check_account_expiry(self):
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+        engine = self.get_engine()  # 取得方式
+
+        # CSVファイルからデータを読み込み
+        self.update_signal.emit(f"ファイル {csv_file} からユーザー情報を読み込んでいます...")
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        users = load_accounts(csv_file, shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+
+        # 書き込み可能なディレクトリを取得
+        writable_dir = self.get_output_dir()
+        # 結果を書き込むファイル名（フルパス）
+        output_file = os.path.join(writable_dir, "expiry.txt")
+        self.update_signal.emit(f"出力ファイル: {output_file}")
+
+        # ファイルの初期化（ヘッダー行を書き込み）
+        report = ExpiryReport(output_file, self.update_signal.emit, self.get_result_store(), self.run_id)
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+
+            self.update_signal.emit(f"\nユーザー {user_number} の処理を開始します... ({index+1}/{total_users})")
+
+            # ログイン（保存済みのセッションが有効ならログインを省略する）
+            try:
+                self.login_account(driver, user_number, row.password, engine)
+            except Exception as e:
+                return self.login_failed_expiry_result(row, e)
+
+            try:
+                return self.read_expiry(driver, row, engine)
+            except Exception as e:
+                self.update_signal.emit(f"ユーザー {user_number} の処理中にエラーが発生: {str(e)}")
+                return self.expiry_result(row, "エラー発生")
+
+        def handle_result(index, row, result):
+            report.add(row, result, elapsed=self.account_elapsed.pop(index, None))
+
+        try:
+            self.update_signal.emit(f"=== アカウント有効期限の確認 ===")
+            self.update_signal.emit(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+            self.run_accounts(users, process_account, handle_result, headless,
+                              extra_arguments=['--no-sandbox', '--disable-dev-shm-usage', '--disable-popup-blocking'],
+                              engine=engine)
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+
+            # 日付でソートして書き出し、期限が近いユーザーを表示する
+            report.finish()
+
+        except Exception as e:
+            self.update_signal.emit(f"有効期限確認処理中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            # 中断・エラー時もそれまでの結果を保存する
+            report.close()
+
+    # 抽選申込状況・予約状況・有効期限の一括確認
+    def sweep_accounts(self):
+        """
+        アカウントごとに1回だけログインし、同じセッションで抽選申込状況・予約状況・有効期限を取得する。
+        結果は個別のタスクと同じ3つのファイル（reservation_info.txt, r_info.txt, expiry.txt）に書き出します。
+        """
+        csv_file = self.params.get("csv_file", "Johoku1.csv")
+        headless = self.params.get("headless", True)  # ヘッドレスモード設定
+        engine = self.get_engine()  # 取得方式
+
+        # CSVファイルからデータを読み込み
+        self.update_signal.emit(f"ファイル {csv_file} からユーザー情報を読み込んでいます...")
+        self.update_signal.emit(f"ヘッドレスモード: {'有効' if headless else '無効'}")
+
+        users = load_accounts(csv_file, shard=self.get_shard())
+        total_users = len(users)
+        self.update_signal.emit(f"{total_users}人のユーザー情報を読み込みました。")
+
+        # 書き込み可能なディレクトリを取得
+        writable_dir = self.get_output_dir()
+        lottery_file = os.path.join(writable_dir, "reservation_info.txt")
+        reservation_file = os.path.join(writable_dir, "r_info.txt")
+        expiry_file = os.path.join(writable_dir, "expiry.txt")
+        for output_file in (lottery_file, reservation_file, expiry_file):
+            self.update_signal.emit(f"出力ファイル: {output_file}")
+
+        store = self.get_result_store()
+        lottery_report = LotteryStatusReport(lottery_file, self.update_signal.emit, store, self.run_id)
+        reservation_report = ReservationReport(reservation_file, self.update_signal.emit, store, self.run_id)
+        expiry_report = ExpiryReport(expiry_file, self.update_signal.emit, store, self.run_id)
+
+        def process_account(driver, index, row):
+            user_number = row.user_number
+
+            self.update_signal.emit(f"\nユーザー {user_number} の処理を開始します... ({index+1}/{total_users})")
+
+            # ログイン（保存済みのセッションが有効ならログインを省略する）
+            try:
+                self.login_account(driver, user_number, row.password, engine)
+            except Exception as e:
+                self.update_signal.emit(f"ログインに失敗: {user_number} - エラー詳細: {e}")
+                return {'status': 'failed'}, self.reservation_error(e), self.login_failed_expiry_result(row, e)
+
+            # 抽選申込みの確認
+            lottery = self.read_lottery_applications(driver, user_number, engine)
+
+            # 予約の確認
+            try:
+                reservations = self.read_reservations(driver, row, engine)
+            except Exception as e:
+                self.update_signal.emit(f"予約情報の取得に失敗しました: {user_number} - エラー詳細: {e}")
+                reservations = self.reservation_error(e)
+
+            # 利用者情報の有効期限
+            try:
+                expiry = self.read_expiry(driver, row, engine)
+            except Exception as e:
+                self.update_signal.emit(f"ユーザー {user_number} の処理中にエラーが発生: {str(e)}")
+                expiry = self.expiry_result(row, "エラー発生")
+
+            return lottery, reservations, expiry
+
+        def handle_result(index, row, result):
+            lottery, reservations, expiry = result
+            elapsed = self.account_elapsed.pop(index, None)
+            lottery_report.add(row, lottery, elapsed=elapsed)
+            reservation_report.add(row, reservations, elapsed=elapsed)
+            expiry_report.add(row, expiry, elapsed=elapsed)
+
+        try:
+            self.update_signal.emit("=== 抽選申込状況・予約状況・有効期限の一括確認 ===")
+            self.update_signal.emit(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+            self.run_accounts(users, process_account, handle_result, headless, engine=engine)
+
+            # 最終的な進捗状況を100%に設定
+            self.progress_signal.emit(100)
+
+            # それぞれの結果を集計して書き込む
+            self.update_signal.emit("\n=== 抽選申込状況 ===")
+            lottery_report.finish(total_users)
+            self.update_signal.emit("\n=== 予約状況 ===")
+            reservation_report.finish()
+            self.update_signal.emit(f"結果は {reservation_file} に保存されました")
+            self.update_signal.emit("\n=== 有効期限 ===")
+            expiry_report.finish()
+
+            self.update_signal.emit("\n一括確認が完了しました")
+
+        except Exception as e:
+            self.update_signal.emit(f"一括確認処理中にエラーが発生しました: {str(e)}")
+            raise
+        finally:
+            # 中断・エラー時もそれまでの結果を保存する
+            lottery_report.close()
+            reservation_report.close()
+            expiry_report.close()
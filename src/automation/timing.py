@@ -0,0 +1,78 @@
+"""処理ステップの所要時間を計測するモジュール"""
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class StepTimer:
+    """処理ステップごとの所要時間と待機時間を記録してログに出力するクラス"""
+
+    def __init__(self, log=None, label="", sink=None, progress=None, tracer=None):
+        self.log = log
+        self.label = label
+        self.records = []
+        self.sink = sink  # 全アカウント分の記録を集めるリスト（任意）
+        self.progress = progress  # 最後に開始したステップ名を 'step' に記録する辞書（任意）
+        self.tracer = tracer  # ステップをスパンとして記録する Tracer（任意）
+        self._local = threading.local()
+
+    @property
+    def current(self):
+        """計測中のステップの記録（計測中でなければNone）"""
+        return getattr(self._local, 'record', None)
+
+    @contextmanager
+    def step(self, name, replaced_sleep=0.0):
+        """
+        with文の中の処理時間を計測する。
+        replaced_sleep には、このステップで以前使っていた固定待機時間（秒）を指定する。
+        """
+        record = {'step': name, 'elapsed': 0.0, 'waited': 0.0, 'jitter': 0.0, 'replaced_sleep': replaced_sleep}
+        previous = self.current
+        self._local.record = record
+        if self.progress is not None:
+            self.progress['step'] = name
+        with (self.tracer.span(name) if self.tracer is not None else nullcontext({})) as span:
+            start = time.perf_counter()
+            try:
+                yield record
+            finally:
+                record['elapsed'] = time.perf_counter() - start
+                self._local.record = previous
+                self.records.append(record)
+                if self.sink is not None:
+                    self.sink.append(record)
+                span.update(waited=record['waited'], jitter=record['jitter'])
+                if self.log:
+                    self.log(f"[計測] {name}: {record['elapsed']:.2f}秒"
+                             f"（条件待ち {record['waited']:.2f}秒 + ゆらぎ {record['jitter']:.2f}秒"
+                             f" / 従来の固定待機 {replaced_sleep:.1f}秒）")
+
+    def add_wait(self, seconds):
+        if self.current is not None:
+            self.current['waited'] += seconds
+
+    def add_jitter(self, seconds):
+        if self.current is not None:
+            self.current['jitter'] += seconds
+
+    def summary(self):
+        """固定待機と比べてどれだけ待ち時間を削減できたかをまとめる"""
+        replaced = sum(r['replaced_sleep'] for r in self.records)
+        idle = sum(r['waited'] + r['jitter'] for r in self.records)
+        elapsed = sum(r['elapsed'] for r in self.records)
+        return {
+            'steps': len(self.records),
+            'elapsed': elapsed,
+            'idle': idle,
+            'replaced_sleep': replaced,
+            'saved': replaced - idle,
+        }
+
+    def log_summary(self):
+        if not self.log or not self.records:
+            return
+        summary = self.summary()
+        prefix = f"{self.label} " if self.label else ""
+        self.log(f"[計測] {prefix}合計 {summary['elapsed']:.2f}秒: 待機 {summary['idle']:.2f}秒"
+                 f"（従来の固定待機 {summary['replaced_sleep']:.1f}秒 → 約{summary['saved']:.1f}秒削減）")
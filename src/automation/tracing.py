@@ -0,0 +1,208 @@
+"""処理ステップごとの所要時間を記録し、Chromeのトレース形式で書き出すモジュール"""
+import json
+import math
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Performance.getMetrics のうち記録する値（秒はそのまま、件数は累計）
+CHROME_METRICS = (
+    "TaskDuration", "ScriptDuration", "LayoutDuration", "RecalcStyleDuration",
+    "LayoutCount", "RecalcStyleCount", "Nodes", "JSHeapUsedSize",
+)
+
+# 最後に読み込んだページのナビゲーションタイミングを取得するスクリプト
+NAVIGATION_TIMING_SCRIPT = """
+const entry = performance.getEntriesByType('navigation')[0];
+return entry ? entry.toJSON() : null;
+"""
+
+# 集計表に含めるスパンの種類
+SUMMARY_CATEGORIES = ("account", "step", "wait")
+
+
+def percentile(values, ratio):
+    """最近傍法で百分位数を求める"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(ratio * len(ordered)) - 1))
+    return ordered[index]
+
+
+def collect_page_metrics(driver):
+    """
+    表示中のページについて、Chromeの処理時間（Performance.getMetrics）と
+    ナビゲーションタイミング（サーバーの応答待ち・転送・DOM構築・読み込み完了までのミリ秒）を返す。
+    取得できない値は含めません。
+    """
+    metrics = {}
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        for metric in driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", []):
+            if metric.get("name") in CHROME_METRICS:
+                metrics[metric["name"]] = metric.get("value")
+    except Exception:
+        pass
+
+    try:
+        timing = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+    except Exception:
+        timing = None
+    if timing:
+        def span(start, end):
+            if timing.get(start) and timing.get(end):
+                return round(timing[end] - timing[start], 1)
+            return None
+
+        for name, start, end in (
+            ("server_ms", "requestStart", "responseStart"),
+            ("download_ms", "responseStart", "responseEnd"),
+            ("dom_ms", "responseEnd", "domContentLoadedEventEnd"),
+            ("load_ms", "responseEnd", "loadEventEnd"),
+        ):
+            value = span(start, end)
+            if value is not None:
+                metrics[name] = value
+    return metrics
+
+
+class Tracer:
+    """
+    処理ステップをスパン（開始時刻と所要時間）として記録するクラス（全てのスレッドで1つを共有する）。
+    instrument() したドライバーでは、スパンの中で行われたWebDriverの呼び出し回数と時間もスパンに記録します。
+    export() で Chrome のトレースビューア（chrome://tracing、Perfetto）で開けるJSONを書き出します。
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self.started_at = time.time()
+
+    def _timestamp(self, perf_time):
+        # トレースの時刻はマイクロ秒
+        return (perf_time - self._origin) * 1_000_000
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _append(self, event):
+        thread = threading.current_thread()
+        event['pid'] = 1
+        event['tid'] = thread.ident
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+
+    def record(self, name, started, category="step", **args):
+        """perf_counter の時刻 started から現在までをスパンとして記録する"""
+        if not self.enabled:
+            return
+        self._append({
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': self._timestamp(started), 'dur': (time.perf_counter() - started) * 1_000_000,
+            'args': args,
+        })
+
+    @contextmanager
+    def span(self, name, category="step", **args):
+        """
+        with文の中の処理をスパンとして記録する。
+        with文で受け取る辞書に値を追加すると、スパンの args に記録されます（例外で終わった場合は error）。
+        """
+        if not self.enabled:
+            yield args
+            return
+        stack = self._stack()
+        stack.append(args)
+        started = time.perf_counter()
+        try:
+            yield args
+        except Exception as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            self.record(name, started, category, **args)
+
+    def counter(self, name, values):
+        """数値をカウンター（トレースビューアでグラフ表示される）として記録する"""
+        if not self.enabled or not values:
+            return
+        self._append({'name': name, 'ph': 'C', 'ts': self._timestamp(time.perf_counter()), 'args': values})
+
+    def instrument(self, driver):
+        """ドライバーのWebDriverコマンドの往復時間を、実行中のスパンに記録するようにする（1回だけ）"""
+        if not self.enabled or getattr(driver, '_traced_by', None) is self:
+            return
+        execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                for args in self._stack():
+                    args['webdriver_calls'] = args.get('webdriver_calls', 0) + 1
+                    args['webdriver_ms'] = args.get('webdriver_ms', 0.0) + elapsed * 1000
+
+        driver.execute = traced_execute
+        driver._traced_by = self
+
+    def summary_rows(self):
+        """スパン名ごとに (名前, 件数, p50秒, p95秒, WebDriver往復の平均回数, WebDriver往復の平均秒) を返す"""
+        durations = defaultdict(list)
+        round_trips = defaultdict(lambda: [0, 0.0])
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            if event['ph'] != 'X' or event['cat'] not in SUMMARY_CATEGORIES:
+                continue
+            durations[event['name']].append(event['dur'] / 1_000_000)
+            round_trips[event['name']][0] += event['args'].get('webdriver_calls', 0)
+            round_trips[event['name']][1] += event['args'].get('webdriver_ms', 0.0) / 1000
+        rows = []
+        for name, values in durations.items():
+            calls, seconds = round_trips[name]
+            rows.append((name, len(values), percentile(values, 0.5), percentile(values, 0.95),
+                         calls / len(values), seconds / len(values)))
+        return rows
+
+    def summary_lines(self):
+        """ステップごとの p50/p95 の集計表をログ用の文字列のリストで返す"""
+        rows = self.summary_rows()
+        if not rows:
+            return []
+        lines = ["[トレース] ステップ            件数    p50      p95    WebDriver往復（平均）"]
+        for name, count, p50, p95, calls, seconds in rows:
+            lines.append(f"[トレース] {name:<16} {count:>4} {p50:>7.2f}秒 {p95:>7.2f}秒  {calls:.1f}回 / {seconds:.2f}秒")
+        return lines
+
+    def export(self, path, **metadata):
+        """Chromeのトレース形式（JSON Object Format）で書き出す"""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        thread_names = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        other = {'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}
+        other.update(metadata)
+        other['summary'] = [
+            {'step': name, 'count': count, 'p50': p50, 'p95': p95, 'webdriver_calls': calls, 'webdriver_seconds': seconds}
+            for name, count, p50, p95, calls, seconds in self.summary_rows()
+        ]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({'traceEvents': thread_names + events, 'displayTimeUnit': 'ms', 'otherData': other},
+                      file, ensure_ascii=False)
+        return path
@@ -0,0 +1,175 @@
+"""画面の状態を条件として待機するモジュール（固定時間のsleepの代わりに使う）"""
+import time
+import random
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from ..config import DEFAULT_MIN_JITTER, DEFAULT_MAX_JITTER
+
+# 週間カレンダーの日付ヘッダー行（時間帯の行 usedate-bheader-N を含む表の先頭行）
+CALENDAR_ROW_XPATH = "//tr[starts-with(@id, 'usedate-bheader-')]"
+CALENDAR_HEADER_XPATH = "(//tr[starts-with(@id, 'usedate-bheader-')])[1]/ancestor::table[1]//tr[1]"
+
+# 「次の週」ボタンを指定回数押し、毎回ヘッダーの再描画を待つスクリプト（ブラウザ内で完結させる）
+ADVANCE_CALENDAR_SCRIPT = """
+const [weeks, headerXpath, stepTimeout, done] = arguments;
+const headerText = () => {
+    const node = document.evaluate(headerXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return node ? node.innerText.trim() : "";
+};
+let advanced = 0;
+const step = () => {
+    const before = headerText();
+    const button = document.getElementById("next-week");
+    if (advanced >= weeks || !button || !before) {
+        done({advanced: advanced, header: before});
+        return;
+    }
+    button.click();
+    const started = Date.now();
+    const poll = () => {
+        const now = headerText();
+        if (now && now !== before) {
+            advanced += 1;
+            step();
+        } else if (Date.now() - started > stepTimeout) {
+            done({advanced: advanced, header: now});
+        } else {
+            setTimeout(poll, 50);
+        }
+    };
+    poll();
+};
+step();
+"""
+
+
+class PageWaiter:
+    """DOMの状態を待機し、人間らしいゆらぎ（jitter）を別途加えるクラス"""
+
+    def __init__(self, driver, timeout=10, min_jitter=DEFAULT_MIN_JITTER, max_jitter=DEFAULT_MAX_JITTER, timer=None, dialogs=None):
+        self.driver = driver
+        self.dialogs = dialogs
+        self.timeout = timeout
+        self.min_jitter = max(0.0, float(min_jitter))
+        self.max_jitter = max(self.min_jitter, float(max_jitter))
+        self.timer = timer
+
+    def _until(self, condition, timeout=None):
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=0.1).until(condition)
+        finally:
+            if self.timer:
+                self.timer.add_wait(time.perf_counter() - start)
+
+    def jitter(self, scale=1.0):
+        """人間らしい操作間隔として、設定された範囲のランダムな時間だけ待機する"""
+        seconds = random.uniform(self.min_jitter, self.max_jitter) * scale
+        if seconds > 0:
+            time.sleep(seconds)
+            if self.timer:
+                self.timer.add_jitter(seconds)
+        return seconds
+
+    def clickable(self, locator, timeout=None):
+        """要素がクリック可能になるまで待機する"""
+        return self._until(EC.element_to_be_clickable(locator), timeout)
+
+    def present(self, locator, timeout=None):
+        """要素がDOMに存在するまで待機する"""
+        return self._until(EC.presence_of_element_located(locator), timeout)
+
+    def option_available(self, select_locator, option_text, timeout=None):
+        """ドロップダウンに指定した選択肢が読み込まれるまで待機する"""
+        def condition(driver):
+            try:
+                select = driver.find_element(*select_locator)
+                if not select.is_enabled():
+                    return False
+                for option in select.find_elements(By.TAG_NAME, "option"):
+                    if option.text.strip() == option_text:
+                        return select
+            except Exception:
+                return False
+            return False
+        return self._until(condition, timeout)
+
+    def calendar_header_text(self):
+        """カレンダーの日付ヘッダーのテキストを取得する（表示されていない場合は空文字）"""
+        try:
+            return self.driver.find_element(By.XPATH, CALENDAR_HEADER_XPATH).text
+        except Exception:
+            return ""
+
+    def calendar_ready(self, timeout=None):
+        """週間カレンダーが表示されるまで待機する"""
+        return self._until(EC.presence_of_element_located((By.XPATH, CALENDAR_ROW_XPATH)), timeout)
+
+    def calendar_changed(self, previous_header, timeout=None):
+        """カレンダーのヘッダーが再描画され、以前と異なる内容になるまで待機する"""
+        def condition(driver):
+            header = self.calendar_header_text()
+            return header if header and header != previous_header else False
+        return self._until(condition, timeout)
+
+    def advance_calendar(self, weeks, step_timeout=5):
+        """
+        カレンダーを指定した週数だけ1回のスクリプト呼び出しで進め、実際に進んだ週数を返す。
+        各週でヘッダーの再描画を待つため、固定時間のsleepは不要です。
+        """
+        if weeks <= 0:
+            return 0
+        start = time.perf_counter()
+        try:
+            self.driver.set_script_timeout(weeks * step_timeout + 5)
+            result = self.driver.execute_async_script(
+                ADVANCE_CALENDAR_SCRIPT, weeks, CALENDAR_HEADER_XPATH, int(step_timeout * 1000)
+            )
+        except Exception:
+            return 0
+        finally:
+            if self.timer:
+                self.timer.add_wait(time.perf_counter() - start)
+        return int((result or {}).get('advanced', 0))
+
+    def cell_selected(self, locator, timeout=None):
+        """セルが選択状態になるか、アラートが表示されるまで待機する"""
+        def condition(driver):
+            if self._dialog_shown():
+                return True
+            try:
+                cell_class = (driver.find_element(*locator).get_attribute("class") or "").lower()
+            except Exception:
+                return False
+            return "selected" in cell_class or "active" in cell_class
+        try:
+            return self._until(condition, timeout)
+        except TimeoutException:
+            return False
+
+    def modal_visible(self, locator, timeout=None):
+        """モーダルなどの要素が画面に表示されるまで待機する"""
+        return self._until(EC.visibility_of_element_located(locator), timeout)
+
+    def _dialog_shown(self):
+        if self.dialogs is not None:
+            return self.dialogs.pending() > 0
+        return self._alert_open()
+
+    def _alert_open(self):
+        try:
+            self.driver.switch_to.alert.text
+            return True
+        except Exception:
+            return False
+
+    def alert_present(self, timeout=None):
+        """アラートが表示されるまで待機し、表示されなければNoneを返す"""
+        try:
+            return self._until(EC.alert_is_present(), timeout)
+        except TimeoutException:
+            return None
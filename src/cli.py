@@ -0,0 +1,197 @@
+"""
+コマンドラインから各タスクを実行するモジュール（PyQt5を読み込まないため、画面のないサーバーやcronでも使える）
+
+使い方:
+    python johoku_cli.py check_expiry --csv Johoku1.csv --engine http --concurrency 4
+    python johoku_cli.py lottery_application --csv Johoku10.csv --apply-number 1 --shard 1/3
+    python johoku_cli.py lottery_application --csv Johoku10.csv --apply-number 1 --concurrency 8 --at "2025-05-01 09:00:00"
+    python johoku_cli.py generate_csv --input Johoku1.csv --booking-dates 2025-05-02 2025-05-03
+    python johoku_cli.py confirm_lottery --csv Johoku1.csv --user-count 4 --set min_jitter=0.5
+    python johoku_cli.py account_sweep --csv Johoku1.csv --engine http   # 申込状況・予約状況・有効期限を1回のログインで確認
+
+パラメータは画面から実行した場合と同じです（--params でJSONファイル、--set key=value で個別に指定可能）。
+--shard i/N を指定すると、CSVのアカウントをN個に分けたうちi番目だけを処理します（複数のプロセスで分担する場合に使う）。
+結果ファイルは出力先の shard_iofN フォルダに書き出されます。
+
+標準出力には1行に1つのJSONで進捗を出力します（--text を指定すると読みやすい形式）:
+    {"event": "start", "task": ..., "params": {...}}
+    {"event": "log", "time": ..., "message": ...}
+    {"event": "progress", "time": ..., "percent": ...}
+    {"event": "finished", "time": ..., "success": ..., "message": ..., "elapsed": ...}
+終了コードは成功なら0、失敗・中断なら1、引数の誤りなら2です。
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+
+from .automation.accounts import parse_shard
+from .automation.scheduler import parse_scheduled_time
+from .config import BROWSER_PROFILES
+
+
+class EventWriter:
+    """タスクの進捗を標準出力に1行ずつ書き出すクラス（どのスレッドから呼び出してもよい）"""
+
+    def __init__(self, stream=None, text=False):
+        self.stream = stream or sys.stdout
+        self.text = text
+        self._lock = threading.Lock()
+
+    def event(self, name, **fields):
+        now = datetime.now()
+        if self.text:
+            detail = fields.get("message")
+            if detail is None:
+                detail = " ".join(f"{key}={value}" for key, value in fields.items())
+            line = f"{now:%H:%M:%S} [{name}] {detail}"
+        else:
+            line = json.dumps(dict(event=name, time=now.isoformat(timespec="milliseconds"), **fields),
+                              ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def parse_value(text):
+    """--set で指定された値を解釈する（JSONとして読めなければ文字列のまま）"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def build_parser(task_types):
+    parser = argparse.ArgumentParser(description="城北中央公園テニスコート予約システム（コマンドライン版）")
+    parser.add_argument("task", choices=task_types, help="実行するタスク")
+    parser.add_argument("--csv", dest="csv_file", help="アカウントCSVファイル")
+    parser.add_argument("--shard", help="アカウントを分けて処理する場合の担当（例: 1/4）")
+
+    group = parser.add_argument_group("CSVファイル生成（generate_csv）")
+    group.add_argument("--input", dest="input_file", help="入力するアカウントCSVファイル")
+    group.add_argument("--booking-dates", nargs="+", help="予約日（例: 2025-05-02）")
+    group.add_argument("--out1", help="1件目の出力ファイル")
+    group.add_argument("--out2", help="2件目の出力ファイル")
+
+    group = parser.add_argument_group("抽選申込み・抽選確定")
+    group.add_argument("--apply-number", type=int, choices=[1, 2], help="申込み種類（1: 申込み1件目, 2: 申込み2件目）")
+    group.add_argument("--resume", action="store_true", help="前回の記録から再開する（申込み済みをスキップ）")
+    group.add_argument("--at", dest="scheduled_at", metavar="DATETIME",
+                       help="抽選申込みを送信する予定時刻（例: \"2025-05-01 09:00:00\"）。事前にログインしてカレンダーまで準備し、この時刻に一斉に送信する")
+    group.add_argument("--user-count", help="抽選確定時の利用人数")
+
+    group = parser.add_argument_group("実行方法")
+    group.add_argument("--show-browser", action="store_true", help="ヘッドレスモードを無効にする")
+    group.add_argument("--concurrency", type=int, help="同時実行数（ブラウザ数）")
+    group.add_argument("--engine", choices=["browser", "http"], help="確認系タスクの取得方式")
+    group.add_argument("--profile", dest="browser_profile", choices=list(BROWSER_PROFILES), help="ブラウザの読み込み設定")
+    group.add_argument("--output-dir", help="結果ファイルの出力先")
+    group.add_argument("--base-url", help="アクセス先のURL（モックサイトなど）")
+    group.add_argument("--no-session-cache", action="store_true", help="ログインセッションを再利用しない")
+    group.add_argument("--no-trace", action="store_true", help="処理ステップのトレースファイルを保存しない")
+    group.add_argument("--no-network-capture", action="store_true",
+                       help="ページの応答から情報を取り出さず、常に画面の表示から取得する")
+
+    group = parser.add_argument_group("その他のパラメータ")
+    group.add_argument("--params", help="パラメータを記述したJSONファイル")
+    group.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                       help="パラメータを個別に指定する（値はJSONとして解釈、複数指定可）")
+    group.add_argument("--text", action="store_true", help="JSONではなく読みやすい形式で出力する")
+    return parser
+
+
+def build_params(args, parser):
+    """コマンドライン引数から WorkerThread と同じ形式のパラメータを作る"""
+    params = {}
+    if args.params:
+        try:
+            with open(args.params, "r", encoding="utf-8") as file:
+                params.update(json.load(file))
+        except (OSError, ValueError) as e:
+            parser.error(f"パラメータファイルを読み込めません: {e}")
+
+    for name in ("csv_file", "input_file", "booking_dates", "out1", "out2", "user_count",
+                 "concurrency", "engine", "browser_profile", "output_dir", "base_url"):
+        value = getattr(args, name)
+        if value is not None:
+            params[name] = value
+    if args.apply_number:
+        params["apply_number_text"] = f"申込み{args.apply_number}件目"
+    if args.resume:
+        params["resume"] = True
+    if args.scheduled_at:
+        try:
+            parse_scheduled_time(args.scheduled_at)
+        except ValueError as e:
+            parser.error(str(e))
+        params["scheduled_at"] = args.scheduled_at
+    if args.show_browser:
+        params["headless"] = False
+    if args.no_session_cache:
+        params["session_cache"] = False
+    if args.no_trace:
+        params["trace"] = False
+    if args.no_network_capture:
+        params["network_capture"] = False
+    if args.shard:
+        try:
+            params["shard"] = "{}/{}".format(*parse_shard(args.shard))
+        except ValueError as e:
+            parser.error(str(e))
+
+    for item in args.set:
+        key, separator, value = item.partition("=")
+        if not separator or not key:
+            parser.error(f"--set は KEY=VALUE の形式で指定してください: {item}")
+        params[key.strip()] = parse_value(value)
+
+    if args.task == "generate_csv":
+        if not params.get("input_file"):
+            parser.error("generate_csv には --input が必要です")
+    elif not params.get("csv_file"):
+        parser.error(f"{args.task} には --csv が必要です")
+    return params
+
+
+def main(argv=None):
+    # 自動化モジュール（selenium等）は引数の確認が終わってから読み込む
+    from .automation.tasks import TASK_TYPES, TaskRunner
+
+    parser = build_parser(TASK_TYPES)
+    args = parser.parse_args(argv)
+    params = build_params(args, parser)
+
+    writer = EventWriter(text=args.text)
+    runner = TaskRunner(args.task, params)
+    outcome = {"success": False, "message": "処理が完了しませんでした。"}
+    runner.update_signal.connect(lambda message: writer.event("log", message=message))
+    runner.progress_signal.connect(lambda percent: writer.event("progress", percent=percent))
+    runner.finished_signal.connect(lambda success, message: outcome.update(success=success, message=message))
+
+    writer.event("start", task=args.task, params={k: v for k, v in params.items() if "password" not in k})
+    start = time.perf_counter()
+
+    # Ctrl+Cで中断できるように、タスクは別スレッドで実行する
+    thread = threading.Thread(target=runner.run, name=f"task-{args.task}", daemon=True)
+    thread.start()
+    interrupted = False
+    while thread.is_alive():
+        try:
+            thread.join(0.5)
+        except KeyboardInterrupt:
+            if interrupted:
+                break
+            interrupted = True
+            writer.event("log", message="中断を受け付けました。処理中のアカウントが終わるまでお待ちください（もう一度押すと強制終了）")
+            runner.stop()
+
+    success = outcome["success"] and not interrupted
+    message = "処理が中断されました。" if interrupted else outcome["message"]
+    writer.event("finished", success=success, message=message, elapsed=round(time.perf_counter() - start, 2))
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
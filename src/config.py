@@ -2,3 +2,60 @@
 
 # ウェブサイトのURL
 URL = "https://kouen.sports.metro.tokyo.lg.jp/web/"
+
+# 同時に起動できるChromeブラウザの上限
+MAX_CONCURRENCY = 8
+
+# 人間らしい操作間隔（秒）の既定値
+DEFAULT_MIN_JITTER = 0.2
+DEFAULT_MAX_JITTER = 0.6
+
+# 画面のログ欄に表示する最大行数（全てのログはファイルに保存される）
+LOG_MAX_LINES = 5000
+
+# ログ欄をまとめて更新する間隔（ミリ秒）
+LOG_FLUSH_INTERVAL_MS = 200
+
+# ブラウザの読み込み設定（プロファイル）と画面に表示する名前
+BROWSER_PROFILES = {
+    "standard": "標準（全て読み込む）",
+    "fast": "高速（画像・フォント・動画を読み込まない）",
+}
+DEFAULT_BROWSER_PROFILE = "standard"
+
+# Chrome（子プロセスを含む）のメモリ使用量（MB）がこの値を超えたらブラウザを再起動する（0で無効）。
+# psutil がインストールされていない場合は無効になり、BROWSER_MAX_ACCOUNTS による再起動だけを行う
+BROWSER_MEMORY_LIMIT_MB = 1500
+
+# 1つのブラウザで処理するアカウント数の上限（超えたら再起動する。0で無効）
+BROWSER_MAX_ACCOUNTS = 200
+
+# サイトへのアクセスの上限（全てのブラウザ合計で1分あたりに処理を開始するアカウント数。0で無制限）
+SITE_RATE_PER_MINUTE = 60
+
+# 同時にログインして処理するセッション数の上限
+SITE_MAX_SESSIONS = MAX_CONCURRENCY
+
+# Captchaを検出したときに全ての処理を止める時間（秒）。続けて検出されると倍になる
+CAPTCHA_COOLDOWN = 20
+
+# 失敗が続いた回数がこの値に達したら、サイトの障害とみなして全ての処理を止める
+CIRCUIT_FAILURE_THRESHOLD = 8
+
+# サイトの障害とみなしたときに全ての処理を止める時間（秒）。再開後も失敗すると倍になる
+CIRCUIT_COOLDOWN = 60
+
+# 予定時刻に抽選申込みを送信する場合、何秒前からログインとカレンダーの準備を始めるか
+SCHEDULE_PREPARE_LEAD = 120
+
+# 画面を操作した後、ページが読み込んだ応答から情報を取り出すまでに待つ時間の上限（秒）。届かなければ画面から取得する
+NETWORK_CAPTURE_TIMEOUT = 5
+
+# トレースを記録する場合に、何アカウントごとに1回Chromeの処理時間とナビゲーションタイミングを取得するか（0で取得しない）
+TRACE_METRICS_INTERVAL = 10
+
+# 結果を記録するデータベースのファイル名（結果ファイルの出力先に作成する）
+RESULT_DB_NAME = "results.sqlite3"
+
+# 結果を何件ごとにまとめてデータベースへ書き込むか
+RESULT_BATCH_SIZE = 50
@@ -0,0 +1,288 @@
+"""
+モックサイトに対して各タスクを実行し、処理性能を測定するベンチマークモジュール
+
+使い方:
+    python -m src.devtools.benchmark --accounts 20 --concurrency 4 --latency 0.05
+    python -m src.devtools.benchmark --tasks check_lottery_status check_expiry --engine http --json result.json
+    python -m src.devtools.benchmark --tasks --page-loads 5 --profiles standard fast
+    python -m src.devtools.benchmark --tasks check_reservation check_expiry --compare-capture
+    python -m src.devtools.benchmark --tasks lottery_application --trace traces
+
+タスクごとに、処理件数/分、処理ステップごとの所要時間（p50/p95）、最大メモリ使用量を表示します。
+--page-loads を指定すると、読み込み設定（プロファイル）ごとに1画面あたりの読み込み時間と転送量を表示します。
+メモリ使用量は psutil があればChromeを含む子プロセスの合計、なければこのプロセスの値です。
+--compare-capture を指定すると、ページの応答から情報を取り出す場合と画面から取得する場合の両方で測定し、
+取得率（応答から取り出せた割合）と処理時間の差を表示します。
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+
+from ..automation.tracing import percentile
+from .mock_site import MockSite, SESSION_COOKIE
+
+TASK_TYPES = ["lottery_application", "check_lottery_status", "confirm_lottery", "check_reservation", "check_expiry",
+              "account_sweep"]
+
+PROFILES = ["standard", "fast"]
+
+# 読み込み時間を測定する画面（ログイン後の各メニュー）
+PAGE_LOAD_PATHS = ["", "lottery/apply", "lottery/list", "lottery/result", "rsv/list", "user/info"]
+
+
+class MemorySampler:
+    """処理中のメモリ使用量（RSS）を定期的に測定し、最大値を記録するクラス"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def sample(self):
+        if self._process is not None:
+            total = 0
+            for process in [self._process] + self._process.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except Exception:
+                    pass
+            return total
+        try:
+            import resource
+            # Linuxではキロバイト、macOSではバイト単位
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return usage if sys.platform == "darwin" else usage * 1024
+        except ImportError:
+            return 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.sample())
+
+    def __enter__(self):
+        self.peak = self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.sample())
+
+
+def write_accounts(path, count, target_month):
+    """ベンチマーク用のアカウントCSVを作成する（予約日は対象月に分散させる）"""
+    year, month = target_month
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["user_number", "password", "Name", "booking_date", "time_code"])
+        for i in range(count):
+            day = i % 28 + 1
+            writer.writerow([f"{10000001 + i}", f"pass{i:04d}", f"テスト{i + 1}", f"{year}-{month:02d}-{day:02d}", str(i % 6 + 1)])
+
+
+def run_task(task_type, params, accounts):
+    """タスクをこのスレッドで直接実行し、ログと結果を返す"""
+    from ..automation.tasks import TaskRunner
+
+    worker = TaskRunner(task_type, params)
+    logs = []
+    outcome = {}
+    worker.update_signal.connect(logs.append)
+    worker.finished_signal.connect(lambda success, message: outcome.update(success=success, message=message))
+
+    with MemorySampler() as memory:
+        start = time.perf_counter()
+        worker.run()
+        elapsed = time.perf_counter() - start
+
+    steps = defaultdict(list)
+    for record in worker.step_records:
+        steps[record['step']].append(record['elapsed'])
+
+    return {
+        "task": task_type,
+        "success": outcome.get("success", False),
+        "accounts": accounts,
+        "elapsed": elapsed,
+        "accounts_per_minute": accounts / elapsed * 60 if elapsed > 0 else 0.0,
+        "peak_memory_mb": memory.peak / (1024 * 1024),
+        "steps": {
+            name: {"count": len(values), "p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+            for name, values in steps.items()
+        },
+        "network_capture": {
+            step: dict(entry) for step, entry in worker.capture_stats.steps.items()
+        },
+        "log_lines": len(logs),
+    }
+
+
+def run_page_loads(site, profile, headless, repeat):
+    """1つのブラウザで各画面を repeat 回ずつ開き、画面ごとの読み込み時間と転送量を測定する"""
+    from ..automation.browser import create_driver
+
+    driver = create_driver(headless, profile=profile)
+    try:
+        token = site.login("10000001", "pass0000")
+        driver.get(site.base_url)
+        driver.add_cookie({"name": SESSION_COOKIE, "value": token, "path": "/"})
+
+        before = dict(site.stats)
+        times = defaultdict(list)
+        for _ in range(repeat):
+            for path in PAGE_LOAD_PATHS:
+                start = time.perf_counter()
+                driver.get(site.base_url + path)
+                times[path or "top"].append(time.perf_counter() - start)
+        # "eager" では画像等の読み込みを待たずに戻るため、残りの転送が終わるまで待ってから集計する
+        time.sleep(1.0)
+        after = dict(site.stats)
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    loads = repeat * len(PAGE_LOAD_PATHS)
+    all_times = [value for values in times.values() for value in values]
+    return {
+        "task": "page_load",
+        "profile": profile,
+        "success": True,
+        "loads": loads,
+        "load_p50": percentile(all_times, 0.5),
+        "load_p95": percentile(all_times, 0.95),
+        "kb_per_page": (after["bytes_sent"] - before["bytes_sent"]) / loads / 1024,
+        "static_requests_per_page": (after["static_requests"] - before["static_requests"]) / loads,
+        "pages": {
+            path: {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+            for path, values in times.items()
+        },
+    }
+
+
+def print_page_load_report(result):
+    print(f"\n== 画面の読み込み: {result['profile']} ({result['loads']}回) ==")
+    print(f"  読み込み時間 p50={result['load_p50']:.3f}秒  p95={result['load_p95']:.3f}秒"
+          f"  転送量 {result['kb_per_page']:.1f}KB/画面  静的ファイル {result['static_requests_per_page']:.1f}件/画面")
+    for path, stat in result["pages"].items():
+        print(f"  {path:<16} p50={stat['p50']:.3f}秒  p95={stat['p95']:.3f}秒")
+
+
+def print_report(result):
+    status = "成功" if result["success"] else "失敗"
+    profile = f" [{result['profile']}]" if result.get("profile") else ""
+    print(f"\n== {result['task']}{profile} ({status}) ==")
+    print(f"  {result['accounts']}件 / {result['elapsed']:.1f}秒 = {result['accounts_per_minute']:.1f}件/分"
+          f"  最大メモリ {result['peak_memory_mb']:.0f}MB")
+    for name, stat in result["steps"].items():
+        print(f"  {name:<12} n={stat['count']:<4} p50={stat['p50']:.2f}秒  p95={stat['p95']:.2f}秒")
+    for step, entry in result.get("network_capture", {}).items():
+        total = entry["captured"] + entry["fallback"]
+        print(f"  応答からの取得 {step}: {entry['captured']}/{total}件（{entry['captured'] / total:.0%}）")
+
+
+def print_capture_comparison(captured, page):
+    """応答から取得した場合と画面から取得した場合の処理時間の差を表示する"""
+    saved = page["elapsed"] - captured["elapsed"]
+    print(f"\n== 応答からの取得による短縮: {captured['task']} [{captured['profile']}] ==")
+    print(f"  画面から {page['elapsed']:.1f}秒 → 応答から {captured['elapsed']:.1f}秒"
+          f"（{saved:.1f}秒、1件あたり{saved / max(captured['accounts'], 1):.2f}秒の短縮）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="モックサイトに対するベンチマーク")
+    parser.add_argument("--tasks", nargs="*", choices=TASK_TYPES, default=TASK_TYPES,
+                        help="実行するタスク（何も指定しない場合はタスクを実行しない）")
+    parser.add_argument("--accounts", type=int, default=10, help="処理するアカウント数")
+    parser.add_argument("--concurrency", type=int, default=1, help="同時実行数")
+    parser.add_argument("--engine", choices=["browser", "http"], default="browser",
+                        help="確認系タスクの取得方式（抽選申込み・当選確定は常にブラウザ）")
+    parser.add_argument("--latency", type=float, default=0.0, help="モックサイトの1リクエストあたりの遅延（秒）")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--captcha-rate", type=float, default=0.0)
+    parser.add_argument("--show-browser", action="store_true", help="ヘッドレスモードを無効にする")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=["standard"],
+                        help="ブラウザの読み込み設定（複数指定するとそれぞれで測定する）")
+    parser.add_argument("--page-loads", type=int, default=0,
+                        help="各画面を開く回数（指定するとプロファイルごとに読み込み時間と転送量を測定する）")
+    parser.add_argument("--session-cache", action="store_true", help="ログインセッションの再利用を有効にする")
+    parser.add_argument("--rate", type=float, default=0, help="アクセスの上限（件/分、既定値の0は無制限）")
+    parser.add_argument("--trace", metavar="DIR",
+                        help="タスクごとのトレースファイル（chrome://tracing で開けるJSON）を保存するフォルダ")
+    parser.add_argument("--no-network-capture", action="store_true", help="ページの応答から情報を取り出さない")
+    parser.add_argument("--compare-capture", action="store_true",
+                        help="応答から取り出す場合と画面から取得する場合の両方で測定して比較する")
+    parser.add_argument("--json", help="結果をJSONで保存するファイル")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="johoku_bench_") as work_dir, \
+            MockSite(latency=args.latency, latency_jitter=args.latency_jitter,
+                     captcha_rate=args.captcha_rate, seed=0) as site:
+        csv_file = os.path.join(work_dir, "accounts.csv")
+        write_accounts(csv_file, args.accounts, site.target_month)
+        print(f"モックサイト: {site.base_url}  アカウント数: {args.accounts}  同時実行数: {args.concurrency}")
+
+        for profile in args.profiles:
+            if args.page_loads > 0:
+                result = run_page_loads(site, profile, not args.show_browser, args.page_loads)
+                results.append(result)
+                print_page_load_report(result)
+
+            for task_type in args.tasks:
+                params = {
+                    "csv_file": csv_file,
+                    "base_url": site.base_url,
+                    "output_dir": os.path.join(work_dir, profile, task_type),
+                    "session_cache": args.session_cache,
+                    "session_dir": os.path.join(work_dir, profile, "sessions"),
+                    "concurrency": args.concurrency,
+                    "engine": args.engine,
+                    "headless": not args.show_browser,
+                    "browser_profile": profile,
+                    "rate_per_minute": args.rate,
+                    "user_count": "4",
+                    "network_capture": not args.no_network_capture,
+                    "trace": bool(args.trace),
+                    "trace_dir": args.trace,
+                }
+                result = run_task(task_type, params, args.accounts)
+                result["profile"] = profile
+                results.append(result)
+                print_report(result)
+
+                if args.compare_capture and params["network_capture"] and args.engine == "browser":
+                    params = dict(params, network_capture=False,
+                                  output_dir=os.path.join(work_dir, profile, task_type + "_page"))
+                    page_result = run_task(task_type, params, args.accounts)
+                    page_result["profile"] = profile
+                    page_result["network_capture_disabled"] = True
+                    results.append(page_result)
+                    print_report(page_result)
+                    print_capture_comparison(result, page_result)
+
+        print(f"\nモックサイトの統計: {site.stats}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    return 0 if all(r["success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,551 @@
+"""
+予約サイトを模したローカルサーバーモジュール
+本番サイトにアクセスせずに、全てのタスク（ブラウザ版・HTTP版）の動作確認や性能測定を行うために使います。
+
+使い方:
+    python -m src.devtools.mock_site --port 8766 --latency 0.2 --captcha-rate 0.1
+
+再現している画面:
+    ログイン（#btn-login → userId/password、誤ったパスワードはアラート）
+    抽選メニューのモーダル（#modal-menus）と予約メニューのモーダル（#modal-reservation-menus）
+    抽選申込み（種目選択 → #bname/#iname → 週間カレンダー usedate-bheader-N → 申込み番号 → 確認2回）
+    抽選申込みの確認・抽選結果（table.sp-block-table）、予約の確認（#rsvacceptlist）、利用者情報（validEndYMD）
+パスワードが invalid_password（既定値 "wrong"）のアカウントはログインに失敗します。
+各画面は本番サイトと同様に画像・Webフォント・アクセス解析のスクリプト（/web/static/）を読み込みます。
+"""
+import sys
+import time
+import html
+import zlib
+import random
+import secrets
+import argparse
+import calendar
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# 公園と施設の選択肢（先頭が申込み処理で選択されるもの）
+PARKS = {
+    "城北中央公園": ["テニス（人工芝・照明有）", "テニス（ハード）"],
+    "石神井公園": ["テニス（人工芝）"],
+}
+
+# 時間帯（usedate-bheader-N の N が添字）
+TIME_SLOTS = ["7:00～9:00", "9:00～11:00", "11:00～13:00", "13:00～15:00",
+              "15:00～17:00", "17:00～19:00", "19:00～21:00", "21:00～23:00"]
+
+APPLY_NUMBERS = ["申込み1件目", "申込み2件目"]
+
+SESSION_COOKIE = "JSESSIONID"
+
+# 各画面が読み込む静的ファイル: ファイル名 -> (Content-Type, バイト数)
+STATIC_FILES = {
+    "logo.png": ("image/png", 24 * 1024),
+    "banner.jpg": ("image/jpeg", 160 * 1024),
+    "site.woff2": ("font/woff2", 96 * 1024),
+    "analytics.js": ("application/javascript", 48 * 1024),
+}
+
+SITE_CSS = """@font-face { font-family: "Site"; src: url("site.woff2") format("woff2"); }
+body { font-family: "Site", sans-serif; }
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="/web/static/site.css">
+<script async src="/web/static/analytics.js"></script>
+<style>.selected {{ background: #f9c; }} td {{ cursor: pointer; }}</style>
+<script>
+function toggleMenu(id) {{
+    const menu = document.getElementById(id);
+    menu.style.display = menu.style.display === "none" ? "block" : "none";
+}}
+</script>
+</head>
+<body>
+<img src="/web/static/logo.png" alt="">
+{nav}
+<div id="contents">
+{body}
+</div>
+<img src="/web/static/banner.jpg" alt="">
+{script}
+</body>
+</html>
+"""
+
+LOGGED_IN_NAV = """<nav>
+<a id="userName" href="#" onclick="toggleMenu('user-menu'); return false;">{user} 様</a>
+<ul id="user-menu" style="display:none">
+<li><a href="/web/user/info">利用者情報の変更・削除・更新</a></li>
+</ul>
+<a href="#" data-target="#modal-menus" onclick="toggleMenu('modal-menus'); return false;">抽選</a>
+<a href="#" data-target="#modal-reservation-menus" onclick="toggleMenu('modal-reservation-menus'); return false;">予約</a>
+</nav>
+<div id="modal-menus" class="modal" style="display:none">
+<a href="/web/lottery/apply">抽選申込み</a>
+<a href="/web/lottery/list">抽選申込みの確認</a>
+<a href="/web/lottery/result">抽選結果</a>
+</div>
+<div id="modal-reservation-menus" class="modal" style="display:none">
+<a href="/web/rsv/list">予約の確認</a>
+</div>
+"""
+
+LOGGED_OUT_NAV = """<nav>
+<button id="btn-login" type="button" onclick="location.href='/web/login'">ログイン</button>
+</nav>
+"""
+
+# 施設選択・週間カレンダー画面のスクリプト（選択肢とカレンダーは非同期に読み込む）
+FACILITY_SCRIPT = """<script>
+let week = 0;
+const bname = document.getElementById("bname");
+const iname = document.getElementById("iname");
+const calendarArea = document.getElementById("calendar");
+
+function loadCalendar() {
+    fetch("/web/api/calendar?week=" + week).then(r => r.text()).then(text => {
+        calendarArea.innerHTML = text;
+    });
+}
+
+bname.addEventListener("change", () => {
+    iname.disabled = true;
+    fetch("/web/api/facilities?park=" + encodeURIComponent(bname.value)).then(r => r.json()).then(items => {
+        iname.innerHTML = '<option value="">選択してください</option>' +
+            items.map(name => '<option value="' + name + '">' + name + '</option>').join("");
+        iname.disabled = false;
+    });
+});
+
+iname.addEventListener("change", () => {
+    week = 0;
+    loadCalendar();
+});
+
+document.getElementById("next-week").addEventListener("click", () => {
+    week += 1;
+    loadCalendar();
+});
+
+calendarArea.addEventListener("click", event => {
+    const cell = event.target.closest("td[data-date]");
+    if (!cell) {
+        return;
+    }
+    calendarArea.querySelectorAll("td.selected").forEach(td => td.classList.remove("selected"));
+    cell.classList.add("selected");
+    document.getElementById("use-date").value = cell.dataset.date;
+    document.getElementById("use-time").value = cell.dataset.time;
+});
+
+function apply() {
+    if (!document.getElementById("use-date").value) {
+        alert("利用時間帯を選択して下さい");
+        return;
+    }
+    document.forms.f.submit();
+}
+</script>
+"""
+
+
+class MockSite:
+    """予約サイトの画面遷移を再現するサーバー"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, latency_jitter=0.0,
+                 captcha_rate=0.0, invalid_password="wrong", target_month=None, seed=None):
+        self.latency = max(0.0, float(latency))
+        self.latency_jitter = max(0.0, float(latency_jitter))
+        self.captcha_rate = max(0.0, min(1.0, float(captcha_rate)))
+        self.invalid_password = invalid_password
+        self.target_month = target_month or self.next_month()
+        self.random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self.sessions = {}      # セッションID -> 利用者番号
+        self.applications = {}  # 利用者番号 -> 抽選申込みのリスト
+        self.reservations = {}  # 利用者番号 -> 確定した予約のリスト
+        self.stats = {"requests": 0, "logins": 0, "failed_logins": 0, "applications": 0, "captchas": 0,
+                      "static_requests": 0, "bytes_sent": 0}
+        self.static_files = self.build_static_files()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @staticmethod
+    def next_month(today=None):
+        """抽選の対象となる翌月の (年, 月) を返す"""
+        today = today or date.today()
+        if today.month == 12:
+            return today.year + 1, 1
+        return today.year, today.month + 1
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/web/"
+
+    def start(self):
+        """バックグラウンドスレッドでサーバーを起動する"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- サイトの状態 ---
+
+    def delay(self):
+        """通信遅延を再現する"""
+        seconds = self.latency + (self.random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def roll_captcha(self):
+        with self._lock:
+            hit = self.captcha_rate > 0 and self.random.random() < self.captcha_rate
+            if hit:
+                self.stats["captchas"] += 1
+        return hit
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    @staticmethod
+    def build_static_files():
+        """静的ファイルの内容を作成する（画像・フォントは指定サイズのランダムなバイト列）"""
+        files = {"site.css": ("text/css; charset=utf-8", SITE_CSS.encode("utf-8"))}
+        generator = random.Random(0)
+        for name, (content_type, size) in STATIC_FILES.items():
+            if content_type == "application/javascript":
+                line = b"// analytics " + b"x" * 50 + b"\n"
+                data = line * (size // len(line))
+            else:
+                data = generator.randbytes(size)
+            files[name] = (content_type, data)
+        return files
+
+    def login(self, user_number, password):
+        """ログインに成功した場合はセッションIDを返す"""
+        if not user_number or not password or password == self.invalid_password:
+            self.count("failed_logins")
+            return None
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = user_number
+            self.stats["logins"] += 1
+        return token
+
+    def user_for(self, cookie_header):
+        for part in (cookie_header or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                with self._lock:
+                    return self.sessions.get(value)
+        return None
+
+    def week_days(self, week):
+        """週間カレンダーの week 週目に表示する日付（最終週は月末までの7日間）"""
+        year, month = self.target_month
+        month_end = calendar.monthrange(year, month)[1]
+        week = max(0, min(int(week), 4))
+        first = 1 + 7 * week if week < 4 else month_end - 6
+        return [date(year, month, day) for day in range(first, first + 7)]
+
+    def lottery_wins(self, user_number):
+        """抽選結果（利用者番号から決まる当選情報）"""
+        seed = zlib.crc32(str(user_number).encode("utf-8"))
+        if seed % 3:
+            return []
+        day = self.week_days(seed % 4)[seed % 7]
+        return [{"date": f"{day.year}年{day.month}月{day.day}日", "time": TIME_SLOTS[seed % len(TIME_SLOTS)]}]
+
+    def expiry_text(self, user_number):
+        seed = zlib.crc32(str(user_number).encode("utf-8"))
+        year, month = self.target_month
+        return f"{year + seed % 3}年{seed % 12 + 1}月28日"
+
+    # --- 画面 ---
+
+    def render(self, title, body, user=None, script=""):
+        nav = LOGGED_IN_NAV.format(user=html.escape(user)) if user else LOGGED_OUT_NAV
+        return PAGE_TEMPLATE.format(title=title, nav=nav, body=body, script=script)
+
+    def page_top(self, user, form):
+        return self.render("トップ", "<h1>公園施設予約システム</h1>", user)
+
+    def page_login(self, user, form):
+        body = """<form name="login" method="post" action="/web/login">
+<input type="text" name="userId">
+<input type="password" name="password">
+<button type="submit">ログイン</button>
+</form>"""
+        return self.render("ログイン", body)
+
+    def page_lottery_apply(self, user, form):
+        rows = "".join(
+            f"<tr><td>{name}</td><td><button type=\"button\" onclick=\"location.href='/web/lottery/facility'\">申込み</button></td></tr>"
+            for name in ("テニス（ハード）", "テニス（人工芝）")
+        )
+        return self.render("抽選申込み", f"<table class=\"table\"><tbody>{rows}</tbody></table>", user)
+
+    def page_lottery_facility(self, user, form):
+        parks = "".join(f"<option value=\"{name}\">{name}</option>" for name in PARKS)
+        body = f"""<form name="f" method="post" action="/web/lottery/confirm">
+<select id="bname" name="bname"><option value="">選択してください</option>{parks}</select>
+<select id="iname" name="iname" disabled><option value="">選択してください</option></select>
+<button id="next-week" type="button">次の週</button>
+<div id="calendar"></div>
+<input type="hidden" id="use-date" name="date">
+<input type="hidden" id="use-time" name="time">
+<button type="button" onclick="apply()">申込み</button>
+</form>"""
+        return self.render("施設選択", body, user, FACILITY_SCRIPT)
+
+    def fragment_calendar(self, user, form):
+        days = self.week_days(form.get("week", "0"))
+        header = "".join(f"<th>{day.month}/{day.day}</th>" for day in days)
+        rows = []
+        for index, slot in enumerate(TIME_SLOTS):
+            cells = "".join(f"<td data-date=\"{day.isoformat()}\" data-time=\"{index}\">○</td>" for day in days)
+            rows.append(f"<tr id=\"usedate-bheader-{index}\"><th>{slot}</th>{cells}</tr>")
+        return f"<table class=\"calendar\"><tr><th>時間帯</th>{header}</tr>{''.join(rows)}</table>"
+
+    def page_lottery_confirm(self, user, form):
+        with self._lock:
+            used = {a["apply_number"] for a in self.applications.get(user, [])}
+        options = "".join(f"<option>{text}</option>" for text in APPLY_NUMBERS if text not in used)
+        body = f"""<form name="f" method="post" action="/web/lottery/check">
+<p>利用日: {html.escape(form.get('date', ''))} 時間帯: {html.escape(form.get('time', ''))}</p>
+<input type="hidden" name="date" value="{html.escape(form.get('date', ''))}">
+<input type="hidden" name="time" value="{html.escape(form.get('time', ''))}">
+<select id="apply" name="apply">{options}</select>
+<button type="button" onclick="if (confirm('申込みますか？')) {{ document.forms.f.submit(); }}">申込み</button>
+</form>"""
+        return self.render("申込み内容の入力", body, user)
+
+    def page_lottery_check(self, user, form):
+        hidden = "".join(
+            f"<input type=\"hidden\" name=\"{name}\" value=\"{html.escape(form.get(name, ''))}\">"
+            for name in ("date", "time", "apply")
+        )
+        body = f"""<form name="f" method="post" action="/web/lottery/submit">
+{hidden}
+<button type="button" onclick="if (confirm('申込みを確定しますか？')) {{ document.forms.f.submit(); }}">申込み</button>
+</form>"""
+        return self.render("申込み内容の確認", body, user)
+
+    def page_lottery_submit(self, user, form):
+        if self.roll_captcha():
+            body = "<iframe src=\"/web/recaptcha/anchor\" title=\"reCAPTCHA\"></iframe>"
+            script = "<script>alert('確認のため、チェックを入れてから申込みボタンを押してください');</script>"
+            return self.render("申込み内容の確認", body, user, script)
+
+        try:
+            slot = TIME_SLOTS[int(form.get("time", "0"))]
+        except (ValueError, IndexError):
+            slot = ""
+        application = {
+            "status": "抽選待ち",
+            "category": "テニス（人工芝）",
+            "facility": "城北中央公園 テニス（人工芝・照明有）",
+            "date": form.get("date", "").replace("-", "/"),
+            "time": slot,
+            "apply_number": form.get("apply", ""),
+        }
+        with self._lock:
+            self.applications.setdefault(user, []).append(application)
+            self.stats["applications"] += 1
+        return self.render("申込み完了", "<div class=\"alert\">申込みが完了しました</div>", user)
+
+    def page_lottery_list(self, user, form):
+        with self._lock:
+            applications = list(self.applications.get(user, []))
+        rows = "".join(
+            f"<tr><td>{no}</td><td>{a['status']}</td><td>{a['category']}</td>"
+            f"<td>{a['facility']}</td><td>{a['date']}</td><td>{a['time']}</td></tr>"
+            for no, a in enumerate(applications, 1)
+        )
+        body = f"<table class=\"table sp-block-table\"><thead><tr><th>No</th><th>状態</th></tr></thead><tbody>{rows}</tbody></table>"
+        return self.render("抽選申込みの確認", body, user)
+
+    def page_lottery_result(self, user, form):
+        wins = self.lottery_wins(user)
+        if not wins:
+            return self.render("抽選結果", "<p>当選した申込みはありません</p>", user)
+        rows = "".join(
+            f"<tr><td><input type=\"checkbox\" name=\"checkElect\" value=\"{no}\"></td>"
+            f"<td><label><span>No.{no}</span><span>{w['date']}</span></label></td>"
+            f"<td><label>{w['time']}</label></td></tr>"
+            for no, w in enumerate(wins, 1)
+        )
+        body = f"""<form name="f" method="post" action="/web/lottery/elect">
+<table class="table sp-block-table"><tbody>{rows}</tbody></table>
+<button id="btn-go" type="button" onclick="document.forms.f.submit()">次へ</button>
+</form>"""
+        return self.render("抽選結果", body, user)
+
+    def page_lottery_elect(self, user, form):
+        body = """<form name="f" method="post" action="/web/lottery/elected">
+<input type="text" name="applyNum" value="">
+<button type="button" onclick="if (confirm('当選を確定しますか？')) { document.forms.f.submit(); }">確認</button>
+</form>"""
+        return self.render("利用人数の入力", body, user)
+
+    def page_lottery_elected(self, user, form):
+        with self._lock:
+            self.reservations[user] = self.lottery_wins(user)
+        return self.render("確定完了", "<div>当選を確定しました</div>", user)
+
+    def page_reservation_list(self, user, form):
+        with self._lock:
+            reservations = list(self.reservations.get(user, []))
+        rows = "".join(
+            f"<tr><td class=\"keep-wide\">{r['date']}</td><td class=\"keep-wide\">{r['time']}</td><td>城北中央公園</td></tr>"
+            for r in reservations
+        )
+        body = f"<table id=\"rsvacceptlist\"><tr><th>利用日</th><th>時間帯</th><th>施設</th></tr>{rows}</table>"
+        return self.render("予約の確認", body, user)
+
+    def page_user_info(self, user, form):
+        body = f"""<table class="table">
+<tr><th><label for="userId">利用者番号</label></th><td>{html.escape(user)}</td></tr>
+<tr><th><label for="validEndYMD">有効期限</label></th><td>{self.expiry_text(user)}</td></tr>
+</table>"""
+        return self.render("利用者情報", body, user)
+
+    # ログインが必要な画面のルーティング
+    ROUTES = {
+        "/web/lottery/apply": "page_lottery_apply",
+        "/web/lottery/facility": "page_lottery_facility",
+        "/web/lottery/confirm": "page_lottery_confirm",
+        "/web/lottery/check": "page_lottery_check",
+        "/web/lottery/submit": "page_lottery_submit",
+        "/web/lottery/list": "page_lottery_list",
+        "/web/lottery/result": "page_lottery_result",
+        "/web/lottery/elect": "page_lottery_elect",
+        "/web/lottery/elected": "page_lottery_elected",
+        "/web/rsv/list": "page_reservation_list",
+        "/web/user/info": "page_user_info",
+        "/web/api/calendar": "fragment_calendar",
+    }
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive接続を有効にする
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body="", content_type="text/html; charset=utf-8", headers=None):
+                data = body if isinstance(body, bytes) else body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+                    site.count("bytes_sent", len(data))
+
+            def _respond(self):
+                site.delay()
+                site.count("requests")
+
+                url = urlsplit(self.path)
+                form = {k: v[0] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    body = self.rfile.read(length).decode("utf-8", errors="replace")
+                    form.update({k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()})
+
+                path = url.path
+                user = site.user_for(self.headers.get("Cookie"))
+
+                if path in ("/", "/web"):
+                    return self._send(302, headers={"Location": "/web/"})
+                if path == "/web/":
+                    return self._send(200, site.page_top(user, form))
+                if path == "/web/login":
+                    if self.command != "POST":
+                        return self._send(200, site.page_login(user, form))
+                    token = site.login(form.get("userId", ""), form.get("password", ""))
+                    if token is None:
+                        script = "<script>alert('利用者番号またはパスワードが正しくありません');</script>"
+                        return self._send(200, site.render("ログイン", "<p>ログインできませんでした</p>", script=script))
+                    return self._send(302, headers={
+                        "Location": "/web/",
+                        "Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/",
+                    })
+                if path.startswith("/web/static/"):
+                    static = site.static_files.get(path[len("/web/static/"):])
+                    if static is None:
+                        return self._send(404, "Not Found", "text/plain; charset=utf-8")
+                    site.count("static_requests")
+                    return self._send(200, static[1], static[0])
+                if path == "/web/recaptcha/anchor":
+                    return self._send(200, "<html><body>reCAPTCHA</body></html>")
+                if path == "/web/api/facilities":
+                    names = PARKS.get(form.get("park", ""), [])
+                    items = ",".join(f"\"{name}\"" for name in names)
+                    return self._send(200, f"[{items}]", "application/json; charset=utf-8")
+
+                handler = site.ROUTES.get(path)
+                if handler is None:
+                    return self._send(404, "Not Found", "text/plain; charset=utf-8")
+                if user is None:
+                    # セッション切れはトップ画面（未ログイン）に戻す
+                    return self._send(302, headers={"Location": "/web/"})
+                return self._send(200, getattr(site, handler)(user, form))
+
+            do_GET = _respond
+            do_POST = _respond
+            do_HEAD = _respond
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="予約サイトを模したローカルサーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="1リクエストあたりの遅延（秒）")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="遅延に加えるランダムな揺らぎの最大値（秒）")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="申込み確定時にCaptchaを表示する確率（0～1）")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    site = MockSite(args.host, args.port, args.latency, args.latency_jitter, args.captcha_rate, seed=args.seed)
+    year, month = site.target_month
+    print(f"モックサイトを起動しました: {site.base_url}  (対象月: {year}年{month}月, Ctrl+Cで終了)")
+    try:
+        site.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
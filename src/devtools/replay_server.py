@@ -0,0 +1,147 @@
+"""
+記録したページを返すローカルサーバーモジュール
+本番サイトにアクセスせずにHTTPクライアント（engine="http"）の動作を確認するために使います。
+
+使い方:
+    python -m src.devtools.replay_server 記録ディレクトリ --port 8765
+
+記録ディレクトリに manifest.json がある場合は、その routes に従ってページを返します。
+    {
+        "routes": {
+            "GET /web/": "top.html",
+            "POST /web/login": {"file": "home.html", "set_cookie": "JSESSIONID=replay"},
+            "GET /web/lottery": {"file": "lottery.html", "requires_cookie": "JSESSIONID"}
+        }
+    }
+manifest.json がない場合は、リクエストパスに対応するHTMLファイル（例: /web/a → web/a.html,
+/web/ → web/index.html）を返します。
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class ReplayServer:
+    """記録ディレクトリのHTMLを返すサーバー"""
+
+    def __init__(self, record_dir, host="127.0.0.1", port=0):
+        self.record_dir = os.path.abspath(record_dir)
+        self.routes = {}
+        manifest_path = os.path.join(self.record_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                self.routes = json.load(file).get("routes", {})
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def resolve(self, method, path):
+        """リクエストに対応するルート情報を返す（見つからない場合はNone）"""
+        route = self.routes.get(f"{method} {path}")
+        if route is None and method == "HEAD":
+            route = self.routes.get(f"GET {path}")
+        if isinstance(route, str):
+            route = {"file": route}
+        if route is not None:
+            return route
+
+        relative = path.lstrip("/")
+        candidates = [relative + ".html", os.path.join(relative, "index.html")]
+        if relative.endswith(".html"):
+            candidates.insert(0, relative)
+        for candidate in candidates:
+            full_path = os.path.normpath(os.path.join(self.record_dir, candidate))
+            if full_path.startswith(self.record_dir) and os.path.isfile(full_path):
+                return {"file": os.path.relpath(full_path, self.record_dir)}
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive接続を有効にする
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self):
+                path = urlsplit(self.path).path
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                route = server.resolve(self.command, path)
+                required = route.get("requires_cookie") if route else None
+                if required and f"{required}=" not in (self.headers.get("Cookie") or ""):
+                    route = None
+
+                if route is None:
+                    body = b"Not Found"
+                    self.send_response(404)
+                    self.send_header("Content-Type", "text/plain; charset=utf-8")
+                else:
+                    with open(os.path.join(server.record_dir, route["file"]), "rb") as file:
+                        body = file.read()
+                    self.send_response(int(route.get("status", 200)))
+                    self.send_header("Content-Type", route.get("content_type", "text/html; charset=utf-8"))
+                    if route.get("set_cookie"):
+                        self.send_header("Set-Cookie", f"{route['set_cookie']}; Path=/")
+
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_GET = _respond
+            do_POST = _respond
+            do_HEAD = _respond
+
+        return Handler
+
+    def start(self):
+        """バックグラウンドスレッドでサーバーを起動する"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="記録したページを返すローカルサーバー")
+    parser.add_argument("record_dir", help="記録したHTMLファイルのディレクトリ")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = ReplayServer(args.record_dir, args.host, args.port)
+    print(f"記録ページを配信しています: {server.base_url}  (Ctrl+Cで終了)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
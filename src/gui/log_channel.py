@@ -0,0 +1,109 @@
+"""ワーカースレッドのログをまとめて画面に表示するモジュール"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtGui import QTextCursor
+
+from ..config import LOG_MAX_LINES, LOG_FLUSH_INTERVAL_MS
+from ..utils.helpers import get_writable_dir
+
+
+class LogChannel(QObject):
+    """
+    ワーカーのログを溜めておき、一定間隔でまとめてテキスト欄に追加するクラス。
+    テキスト欄は max_lines 行までに制限し、全てのログはファイルに保存します。
+    """
+
+    def __init__(self, text_edit, name, max_lines=LOG_MAX_LINES, interval_ms=LOG_FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent or text_edit)
+        self.text_edit = text_edit
+        self.name = name
+        self.max_lines = max(1, int(max_lines))
+        self.text_edit.document().setMaximumBlockCount(self.max_lines)
+
+        self._pending = deque()
+        self._skipped = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self.log_path = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def attach(self, worker):
+        """ワーカーのログの受け取りを開始する（前回の表示はクリアしない）"""
+        self.close_file()
+        self._open_file()
+        # 受け取りはワーカー側のスレッドで直接行い、メッセージごとのシグナル送信を避ける
+        worker.update_signal.connect(self.write, Qt.DirectConnection)
+        worker.finished.connect(self.finish)
+        self._timer.start()
+
+    def _open_file(self):
+        try:
+            log_dir = os.path.join(get_writable_dir(), "logs")
+            os.makedirs(log_dir, exist_ok=True)
+            self.log_path = os.path.join(log_dir, f"{self.name}_{datetime.now():%Y%m%d_%H%M%S}.log")
+            self._file = open(self.log_path, "w", encoding="utf-8")
+        except OSError:
+            self._file = None
+            self.log_path = None
+
+    def write(self, message):
+        """ログを1件受け取る（どのスレッドから呼び出してもよい）"""
+        with self._lock:
+            self._pending.append(message)
+            # 画面に表示しきれない古いログは、ファイルにだけ残す
+            if len(self._pending) > self.max_lines * 2:
+                self._pending.popleft()
+                self._skipped += 1
+            if self._file is not None:
+                self._file.write(message + "\n")
+
+    def flush(self):
+        """溜まったログを1回の操作でテキスト欄に追加する"""
+        with self._lock:
+            if not self._pending:
+                return
+            messages = list(self._pending)
+            self._pending.clear()
+            skipped = self._skipped
+            self._skipped = 0
+
+        if skipped or len(messages) > self.max_lines:
+            # 省略したことを示す1行の分だけ表示するログを減らす
+            keep = self.max_lines - 1
+            skipped += max(0, len(messages) - keep)
+            messages = messages[len(messages) - keep:] if keep else []
+            messages.insert(0, f"...（{skipped}行を省略しました。全てのログ: {self.log_path}）")
+
+        scroll_bar = self.text_edit.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 4
+
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.End)
+        if not self.text_edit.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(messages))
+
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def finish(self):
+        """ワーカー終了時に残りのログを表示し、ログファイルを閉じる"""
+        self._timer.stop()
+        self.flush()
+        self.close_file()
+
+    def close_file(self):
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
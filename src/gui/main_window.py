@@ -1,15 +1,26 @@
 """メインウィンドウモジュール"""
 import os
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel,
-                             QComboBox, QTabWidget, QLineEdit, QTextEdit, QFileDialog,
+                             QComboBox, QTabWidget, QLineEdit, QTextEdit, QPlainTextEdit, QFileDialog,
                              QMessageBox, QGridLayout, QGroupBox, QHBoxLayout, QProgressBar,
-                             QCheckBox)
-from PyQt5.QtCore import Qt
+                             QCheckBox, QSpinBox, QDoubleSpinBox, QDateTimeEdit)
+from PyQt5.QtCore import Qt, QDateTime
 from PyQt5.QtGui import QFont
 
-from ..automation.worker import WorkerThread
+from ..config import (MAX_CONCURRENCY, DEFAULT_MIN_JITTER, DEFAULT_MAX_JITTER, BROWSER_PROFILES, DEFAULT_BROWSER_PROFILE,
+                      RESULT_DB_NAME)
 from ..utils.helpers import get_writable_dir
+from ..utils.startup import startup_timer
+from .log_channel import LogChannel
+from .result_viewer import ResultViewer, RESULT_FILE_KINDS, has_results
+
+
+def load_worker_module():
+    """自動化モジュール（selenium等を含む）を読み込む（初回のみ時間がかかる）"""
+    from ..automation import worker
+    return worker
 
 
 class JohokuApp(QMainWindow):
@@ -29,18 +40,80 @@ class JohokuApp(QMainWindow):
         self.create_lottery_confirm_tab()
         self.create_reservation_check_tab()
         self.create_account_expiry_tab()
+        self.create_account_sweep_tab()
 
         # ワーカースレッド
         self.worker = None
+        self.log_channels = {}  # ログ欄ごとのLogChannel
 
         # フォントの設定
         self.set_font()
 
+    def preload_automation(self):
+        """ウィンドウの表示後に自動化モジュールをバックグラウンドで読み込んでおく"""
+        def load():
+            try:
+                load_worker_module()
+                startup_timer.mark("自動化モジュールの読み込み（バックグラウンド）")
+            except Exception as e:
+                startup_timer.mark(f"自動化モジュールの読み込み失敗({e})")
+            startup_timer.write_report()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def create_worker(self, task_type, params):
+        """ワーカースレッドを作成する（自動化モジュールが未読み込みならここで読み込む）"""
+        return load_worker_module().WorkerThread(task_type, params)
+
+    def attach_log(self, log_widget, name):
+        """ワーカーのログをまとめてログ欄に表示する（全てのログはファイルにも保存される）"""
+        channel = self.log_channels.get(name)
+        if channel is None:
+            channel = LogChannel(log_widget, name)
+            self.log_channels[name] = channel
+        channel.attach(self.worker)
+
     def set_font(self):
         font = QFont()
         font.setPointSize(10)
         self.setFont(font)
 
+    # 同時実行数（ブラウザ数）の入力欄を作成する関数
+    def create_concurrency_spinbox(self, layout):
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("同時実行数（ブラウザ数）:"))
+        spinbox = QSpinBox()
+        spinbox.setRange(1, MAX_CONCURRENCY)
+        spinbox.setValue(1)  # デフォルトは1台で順番に処理
+        concurrency_layout.addWidget(spinbox)
+        concurrency_layout.addStretch()
+        layout.addLayout(concurrency_layout)
+        return spinbox
+
+    # 取得方式（ブラウザ / HTTP）の選択欄を作成する関数
+    def create_engine_combobox(self, layout):
+        engine_layout = QHBoxLayout()
+        engine_layout.addWidget(QLabel("取得方式:"))
+        combobox = QComboBox()
+        combobox.addItem("ブラウザ（Chrome）", "browser")
+        combobox.addItem("HTTP（ブラウザなし・高速）", "http")
+        engine_layout.addWidget(combobox)
+        layout.addLayout(engine_layout)
+        return combobox
+
+    # ブラウザの読み込み設定（標準 / 高速）の選択欄を作成する関数
+    def create_browser_profile_combobox(self, layout):
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("読み込み設定:"))
+        combobox = QComboBox()
+        for profile, label in BROWSER_PROFILES.items():
+            combobox.addItem(label, profile)
+        combobox.setCurrentIndex(combobox.findData(DEFAULT_BROWSER_PROFILE))
+        profile_layout.addWidget(combobox)
+        profile_layout.addStretch()
+        layout.addLayout(profile_layout)
+        return combobox
+
     # タブ1: CSVファイル生成
     def create_generate_csv_tab(self):
         tab = QWidget()
@@ -146,6 +219,48 @@ class JohokuApp(QMainWindow):
         self.lottery_headless_checkbox.setChecked(True)  # デフォルトはオン
         layout.addWidget(self.lottery_headless_checkbox)
 
+        # 同時実行数の設定
+        self.lottery_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.lottery_browser_profile = self.create_browser_profile_combobox(layout)
+
+        # 操作間隔のゆらぎ（画面の準備ができた後に加える人間らしい待機時間）
+        jitter_layout = QHBoxLayout()
+        jitter_layout.addWidget(QLabel("操作間隔のゆらぎ（秒）:"))
+        self.lottery_min_jitter = QDoubleSpinBox()
+        self.lottery_min_jitter.setRange(0.0, 10.0)
+        self.lottery_min_jitter.setSingleStep(0.1)
+        self.lottery_min_jitter.setValue(DEFAULT_MIN_JITTER)
+        jitter_layout.addWidget(self.lottery_min_jitter)
+        jitter_layout.addWidget(QLabel("～"))
+        self.lottery_max_jitter = QDoubleSpinBox()
+        self.lottery_max_jitter.setRange(0.0, 10.0)
+        self.lottery_max_jitter.setSingleStep(0.1)
+        self.lottery_max_jitter.setValue(DEFAULT_MAX_JITTER)
+        jitter_layout.addWidget(self.lottery_max_jitter)
+        jitter_layout.addStretch()
+        layout.addLayout(jitter_layout)
+
+        # 中断した実行の再開
+        self.lottery_resume_checkbox = QCheckBox("前回の続きから再開（申込み済みのアカウントをスキップ）")
+        self.lottery_resume_checkbox.setChecked(False)
+        layout.addWidget(self.lottery_resume_checkbox)
+
+        # 予定時刻に送信（事前にログインしてカレンダーまで準備し、予定時刻に一斉に送信する）
+        schedule_layout = QHBoxLayout()
+        self.lottery_schedule_checkbox = QCheckBox("予定時刻に送信:")
+        self.lottery_schedule_checkbox.setChecked(False)
+        schedule_layout.addWidget(self.lottery_schedule_checkbox)
+        self.lottery_scheduled_at = QDateTimeEdit(QDateTime.currentDateTime().addSecs(3600))
+        self.lottery_scheduled_at.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.lottery_scheduled_at.setCalendarPopup(True)
+        self.lottery_scheduled_at.setEnabled(False)
+        self.lottery_schedule_checkbox.toggled.connect(self.lottery_scheduled_at.setEnabled)
+        schedule_layout.addWidget(self.lottery_scheduled_at)
+        schedule_layout.addStretch()
+        layout.addLayout(schedule_layout)
+
         # 実行ボタン
         self.lottery_button = QPushButton("抽選申込を実行")
         self.lottery_button.setMinimumHeight(40)
@@ -204,6 +319,15 @@ class JohokuApp(QMainWindow):
         self.check_status_headless_checkbox.setChecked(True)  # デフォルトはオン
         layout.addWidget(self.check_status_headless_checkbox)
 
+        # 同時実行数の設定
+        self.check_status_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.check_status_browser_profile = self.create_browser_profile_combobox(layout)
+
+        # 取得方式の選択
+        self.check_status_engine = self.create_engine_combobox(layout)
+
         # 実行ボタン
         self.check_status_button = QPushButton("申込状況を確認")
         self.check_status_button.setMinimumHeight(40)
@@ -274,6 +398,12 @@ class JohokuApp(QMainWindow):
         self.confirm_headless_checkbox.setChecked(True)  # デフォルトはオン
         layout.addWidget(self.confirm_headless_checkbox)
 
+        # 同時実行数の設定
+        self.confirm_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.confirm_browser_profile = self.create_browser_profile_combobox(layout)
+
         # 実行ボタン
         self.confirm_button = QPushButton("抽選確定処理を実行")
         self.confirm_button.setMinimumHeight(40)
@@ -337,6 +467,15 @@ class JohokuApp(QMainWindow):
         self.reservation_headless_checkbox.setChecked(True)  # デフォルトはオン
         layout.addWidget(self.reservation_headless_checkbox)
 
+        # 同時実行数の設定
+        self.reservation_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.reservation_browser_profile = self.create_browser_profile_combobox(layout)
+
+        # 取得方式の選択
+        self.reservation_engine = self.create_engine_combobox(layout)
+
         # 実行ボタン
         self.reservation_button = QPushButton("予約状況を確認")
         self.reservation_button.setMinimumHeight(40)
@@ -400,6 +539,15 @@ class JohokuApp(QMainWindow):
         self.expiry_headless_checkbox.setChecked(True)  # デフォルトはオン
         layout.addWidget(self.expiry_headless_checkbox)
 
+        # 同時実行数の設定
+        self.expiry_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.expiry_browser_profile = self.create_browser_profile_combobox(layout)
+
+        # 取得方式の選択
+        self.expiry_engine = self.create_engine_combobox(layout)
+
         # 実行ボタン
         self.expiry_button = QPushButton("有効期限を確認")
         self.expiry_button.setMinimumHeight(40)
@@ -432,6 +580,87 @@ class JohokuApp(QMainWindow):
         tab.setLayout(layout)
         self.tabs.addTab(tab, "有効期限確認")
 
+    # タブ7: 抽選申込状況・予約状況・有効期限の一括確認
+    def create_account_sweep_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+
+        # 説明ラベル
+        title_label = QLabel("抽選申込状況・予約状況・有効期限の一括確認")
+        title_label.setAlignment(Qt.AlignCenter)
+        font = title_label.font()
+        font.setPointSize(14)
+        font.setBold(True)
+        title_label.setFont(font)
+        layout.addWidget(title_label)
+
+        description_label = QLabel("アカウントごとに1回だけログインし、3つの確認結果をまとめて作成します。")
+        description_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(description_label)
+
+        layout.addSpacing(10)
+
+        # CSVファイル選択
+        file_layout = QHBoxLayout()
+        file_layout.addWidget(QLabel("CSVファイル:"))
+        self.sweep_csv_file = QLineEdit("Johoku1.csv")
+        file_layout.addWidget(self.sweep_csv_file)
+        self.browse_sweep_button = QPushButton("参照...")
+        self.browse_sweep_button.clicked.connect(lambda: self.browse_file(self.sweep_csv_file))
+        file_layout.addWidget(self.browse_sweep_button)
+        layout.addLayout(file_layout)
+
+        # ヘッドレスモード選択
+        self.sweep_headless_checkbox = QCheckBox("ヘッドレスモード（ブラウザ非表示）")
+        self.sweep_headless_checkbox.setChecked(True)  # デフォルトはオン
+        layout.addWidget(self.sweep_headless_checkbox)
+
+        # 同時実行数の設定
+        self.sweep_concurrency = self.create_concurrency_spinbox(layout)
+
+        # ブラウザの読み込み設定
+        self.sweep_browser_profile = self.create_browser_profile_combobox(layout)
+
+        # 取得方式の選択
+        self.sweep_engine = self.create_engine_combobox(layout)
+
+        # 実行ボタン
+        self.sweep_button = QPushButton("一括確認を実行")
+        self.sweep_button.setMinimumHeight(40)
+        self.sweep_button.clicked.connect(self.start_account_sweep)
+        layout.addWidget(self.sweep_button)
+
+        # 停止ボタン
+        self.stop_sweep_button = QPushButton("処理を停止")
+        self.stop_sweep_button.clicked.connect(self.stop_worker)
+        layout.addWidget(self.stop_sweep_button)
+
+        # プログレスバー
+        self.sweep_progress = QProgressBar()
+        layout.addWidget(self.sweep_progress)
+
+        # 結果を表示するボタン
+        results_layout = QHBoxLayout()
+        for label, file_name in (("申込状況結果を表示", "reservation_info.txt"),
+                                 ("予約状況結果を表示", "r_info.txt"),
+                                 ("有効期限結果を表示", "expiry.txt")):
+            button = QPushButton(label)
+            button.clicked.connect(lambda checked, name=file_name: self.show_results_file(name))
+            results_layout.addWidget(button)
+        layout.addLayout(results_layout)
+
+        # スクロール可能なログ表示エリア
+        log_group = QGroupBox("実行ログ")
+        log_layout = QVBoxLayout()
+        self.sweep_log = QTextEdit()
+        self.sweep_log.setReadOnly(True)
+        log_layout.addWidget(self.sweep_log)
+        log_group.setLayout(log_layout)
+        layout.addWidget(log_group)
+
+        tab.setLayout(layout)
+        self.tabs.addTab(tab, "一括確認")
+
     # ファイル選択ダイアログを表示する関数
     def browse_input_file(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "入力CSVファイルを選択", "", "CSV Files (*.csv)")
@@ -443,13 +672,20 @@ class JohokuApp(QMainWindow):
         if file_name:
             line_edit.setText(file_name)
 
-    # 結果ファイルを表示する関数
+    # 結果ファイルを表示する関数（結果のデータベースがあれば表で表示する）
     def show_results_file(self, file_name):
         try:
             # 書き込み可能なディレクトリを取得
             writable_dir = get_writable_dir()
             full_path = os.path.join(writable_dir, file_name)
+            db_path = os.path.join(writable_dir, RESULT_DB_NAME)
+
+            kind = RESULT_FILE_KINDS.get(file_name)
+            if kind and os.path.exists(db_path) and has_results(db_path, kind):
+                ResultViewer(db_path, kind, f"結果: {file_name}", self).show()
+                return
 
+            # データベースに記録がない（以前の結果の）場合はファイルの内容を表示する
             if os.path.exists(full_path):
                 with open(full_path, 'r', encoding='utf-8') as file:
                     content = file.read()
@@ -458,9 +694,9 @@ class JohokuApp(QMainWindow):
                 dialog.setWindowTitle(f"結果: {file_name}")
                 dialog.setGeometry(200, 200, 800, 600)
 
-                text_edit = QTextEdit(dialog)
+                text_edit = QPlainTextEdit(dialog)
                 text_edit.setReadOnly(True)
-                text_edit.setText(content)
+                text_edit.setPlainText(content)
                 dialog.setCentralWidget(text_edit)
 
                 dialog.show()
@@ -514,8 +750,8 @@ class JohokuApp(QMainWindow):
         }
 
         # ワーカースレッドを作成・起動
-        self.worker = WorkerThread("generate_csv", params)
-        self.worker.update_signal.connect(lambda msg: self.csv_log.append(msg))
+        self.worker = self.create_worker("generate_csv", params)
+        self.attach_log(self.csv_log, "csv")
         self.worker.progress_signal.connect(self.csv_progress.setValue)
         self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -530,6 +766,15 @@ class JohokuApp(QMainWindow):
         csv_file = self.lottery_csv_file.text()
         apply_number_text = self.apply_type.currentText()
         headless = self.lottery_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.lottery_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.lottery_browser_profile.currentData()  # 読み込み設定を取得
+        min_jitter = self.lottery_min_jitter.value()  # 操作間隔のゆらぎ（最小）
+        max_jitter = max(min_jitter, self.lottery_max_jitter.value())  # 操作間隔のゆらぎ（最大）
+        resume = self.lottery_resume_checkbox.isChecked()  # 前回の続きから再開するか
+        # 予定時刻に送信する場合の時刻
+        scheduled_at = None
+        if self.lottery_schedule_checkbox.isChecked():
+            scheduled_at = self.lottery_scheduled_at.dateTime().toString("yyyy-MM-dd HH:mm:ss")
 
         # 入力チェック
         if not csv_file:
@@ -547,7 +792,11 @@ class JohokuApp(QMainWindow):
         # 確認ダイアログを表示
         message = (f"CSVファイル: {csv_file}\n"
                   f"申込み種類: {apply_number_text}\n"
-                  f"ヘッドレスモード: {'有効' if headless else '無効'}\n\n"
+                  f"ヘッドレスモード: {'有効' if headless else '無効'}\n"
+                  f"同時実行数: {concurrency}\n"
+                  f"読み込み設定: {BROWSER_PROFILES[browser_profile]}\n"
+                  f"再開モード: {'有効（申込み済みをスキップ）' if resume else '無効（最初から実行）'}\n"
+                  f"送信時刻: {scheduled_at + '（事前に準備して一斉に送信）' if scheduled_at else '準備ができ次第'}\n\n"
                   f"処理を開始しますか？")
 
         reply = QMessageBox.question(self, "確認", message,
@@ -558,12 +807,19 @@ class JohokuApp(QMainWindow):
             params = {
                 "csv_file": csv_file,
                 "apply_number_text": apply_number_text,
-                "headless": headless  # ヘッドレスモード設定を追加
+                "resume": resume,
+                "headless": headless,  # ヘッドレスモード設定を追加
+                "concurrency": concurrency,  # 同時実行数を追加
+                "browser_profile": browser_profile,  # 読み込み設定を追加
+                "min_jitter": min_jitter,
+                "max_jitter": max_jitter
             }
+            if scheduled_at:
+                params["scheduled_at"] = scheduled_at
 
             # ワーカースレッドを作成・起動
-            self.worker = WorkerThread("lottery_application", params)
-            self.worker.update_signal.connect(lambda msg: self.lottery_log.append(msg))
+            self.worker = self.create_worker("lottery_application", params)
+            self.attach_log(self.lottery_log, "lottery")
             self.worker.progress_signal.connect(self.lottery_progress.setValue)
             self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -577,6 +833,9 @@ class JohokuApp(QMainWindow):
     def start_check_lottery_status(self):
         csv_file = self.check_status_csv_file.text()
         headless = self.check_status_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.check_status_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.check_status_browser_profile.currentData()  # 読み込み設定を取得
+        engine = self.check_status_engine.currentData()  # 取得方式を取得
 
         # 入力チェック
         if not csv_file:
@@ -594,12 +853,15 @@ class JohokuApp(QMainWindow):
         # パラメータを設定
         params = {
             "csv_file": csv_file,
-            "headless": headless  # ヘッドレスモード設定を追加
+            "headless": headless,  # ヘッドレスモード設定を追加
+            "concurrency": concurrency,  # 同時実行数を追加
+            "engine": engine,  # 取得方式を追加
+            "browser_profile": browser_profile  # 読み込み設定を追加
         }
 
         # ワーカースレッドを作成・起動
-        self.worker = WorkerThread("check_lottery_status", params)
-        self.worker.update_signal.connect(lambda msg: self.check_status_log.append(msg))
+        self.worker = self.create_worker("check_lottery_status", params)
+        self.attach_log(self.check_status_log, "check_status")
         self.worker.progress_signal.connect(self.check_status_progress.setValue)
         self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -614,6 +876,8 @@ class JohokuApp(QMainWindow):
         csv_file = self.confirm_csv_file.text()
         user_count = self.user_count.text()
         headless = self.confirm_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.confirm_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.confirm_browser_profile.currentData()  # 読み込み設定を取得
 
         # 入力チェック
         if not csv_file:
@@ -638,7 +902,9 @@ class JohokuApp(QMainWindow):
         # 確認ダイアログを表示
         message = (f"CSVファイル: {csv_file}\n"
                   f"利用人数: {user_count}\n"
-                  f"ヘッドレスモード: {'有効' if headless else '無効'}\n\n"
+                  f"ヘッドレスモード: {'有効' if headless else '無効'}\n"
+                  f"同時実行数: {concurrency}\n"
+                  f"読み込み設定: {BROWSER_PROFILES[browser_profile]}\n\n"
                   f"抽選確定処理を開始しますか？")
 
         reply = QMessageBox.question(self, "確認", message,
@@ -649,12 +915,14 @@ class JohokuApp(QMainWindow):
             params = {
                 "csv_file": csv_file,
                 "user_count": user_count,
-                "headless": headless  # ヘッドレスモード設定を追加
+                "headless": headless,  # ヘッドレスモード設定を追加
+                "concurrency": concurrency,  # 同時実行数を追加
+                "browser_profile": browser_profile  # 読み込み設定を追加
             }
 
             # ワーカースレッドを作成・起動
-            self.worker = WorkerThread("confirm_lottery", params)
-            self.worker.update_signal.connect(lambda msg: self.confirm_log.append(msg))
+            self.worker = self.create_worker("confirm_lottery", params)
+            self.attach_log(self.confirm_log, "confirm")
             self.worker.progress_signal.connect(self.confirm_progress.setValue)
             self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -668,6 +936,9 @@ class JohokuApp(QMainWindow):
     def start_check_reservation(self):
         csv_file = self.reservation_csv_file.text()
         headless = self.reservation_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.reservation_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.reservation_browser_profile.currentData()  # 読み込み設定を取得
+        engine = self.reservation_engine.currentData()  # 取得方式を取得
 
         # 入力チェック
         if not csv_file:
@@ -685,12 +956,15 @@ class JohokuApp(QMainWindow):
         # パラメータを設定
         params = {
             "csv_file": csv_file,
-            "headless": headless  # ヘッドレスモード設定を追加
+            "headless": headless,  # ヘッドレスモード設定を追加
+            "concurrency": concurrency,  # 同時実行数を追加
+            "engine": engine,  # 取得方式を追加
+            "browser_profile": browser_profile  # 読み込み設定を追加
         }
 
         # ワーカースレッドを作成・起動
-        self.worker = WorkerThread("check_reservation", params)
-        self.worker.update_signal.connect(lambda msg: self.reservation_log.append(msg))
+        self.worker = self.create_worker("check_reservation", params)
+        self.attach_log(self.reservation_log, "reservation")
         self.worker.progress_signal.connect(self.reservation_progress.setValue)
         self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -704,6 +978,9 @@ class JohokuApp(QMainWindow):
     def start_check_expiry(self):
         csv_file = self.expiry_csv_file.text()
         headless = self.expiry_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.expiry_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.expiry_browser_profile.currentData()  # 読み込み設定を取得
+        engine = self.expiry_engine.currentData()  # 取得方式を取得
 
         # 入力チェック
         if not csv_file:
@@ -721,12 +998,15 @@ class JohokuApp(QMainWindow):
         # パラメータを設定
         params = {
             "csv_file": csv_file,
-            "headless": headless  # ヘッドレスモード設定を追加
+            "headless": headless,  # ヘッドレスモード設定を追加
+            "concurrency": concurrency,  # 同時実行数を追加
+            "engine": engine,  # 取得方式を追加
+            "browser_profile": browser_profile  # 読み込み設定を追加
         }
 
         # ワーカースレッドを作成・起動
-        self.worker = WorkerThread("check_expiry", params)
-        self.worker.update_signal.connect(lambda msg: self.expiry_log.append(msg))
+        self.worker = self.create_worker("check_expiry", params)
+        self.attach_log(self.expiry_log, "expiry")
         self.worker.progress_signal.connect(self.expiry_progress.setValue)
         self.worker.finished_signal.connect(self.on_worker_finished)
 
@@ -736,6 +1016,48 @@ class JohokuApp(QMainWindow):
         # スレッドを開始
         self.worker.start()
 
+    # 一括確認処理を開始する関数
+    def start_account_sweep(self):
+        csv_file = self.sweep_csv_file.text()
+        headless = self.sweep_headless_checkbox.isChecked()  # ヘッドレスモード設定を取得
+        concurrency = self.sweep_concurrency.value()  # 同時実行数を取得
+        browser_profile = self.sweep_browser_profile.currentData()  # 読み込み設定を取得
+        engine = self.sweep_engine.currentData()  # 取得方式を取得
+
+        # 入力チェック
+        if not csv_file:
+            QMessageBox.warning(self, "入力エラー", "CSVファイルを指定してください。")
+            return
+
+        # ファイルの存在確認
+        if not os.path.exists(csv_file):
+            QMessageBox.warning(self, "ファイルエラー", f"ファイル {csv_file} が見つかりません。")
+            return
+
+        # ログをクリア
+        self.sweep_log.clear()
+
+        # パラメータを設定
+        params = {
+            "csv_file": csv_file,
+            "headless": headless,
+            "concurrency": concurrency,
+            "engine": engine,
+            "browser_profile": browser_profile
+        }
+
+        # ワーカースレッドを作成・起動
+        self.worker = self.create_worker("account_sweep", params)
+        self.attach_log(self.sweep_log, "sweep")
+        self.worker.progress_signal.connect(self.sweep_progress.setValue)
+        self.worker.finished_signal.connect(self.on_worker_finished)
+
+        # ボタンの状態を変更
+        self.sweep_button.setEnabled(False)
+
+        # スレッドを開始
+        self.worker.start()
+
     # ワーカースレッド終了時の処理
     def on_worker_finished(self, success, message):
         # ボタンの状態を元に戻す
@@ -745,6 +1067,7 @@ class JohokuApp(QMainWindow):
         self.confirm_button.setEnabled(True)
         self.reservation_button.setEnabled(True)
         self.expiry_button.setEnabled(True)
+        self.sweep_button.setEnabled(True)
 
         if success:
             QMessageBox.information(self, "完了", message)
@@ -0,0 +1,278 @@
+"""結果のデータベースを表形式で表示するモジュール"""
+import sqlite3
+
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                             QLineEdit, QTableView, QAbstractItemView, QHeaderView)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from ..automation.result_store import KIND_LOTTERY_STATUS, KIND_RESERVATION, KIND_EXPIRY, KIND_CONFIRMATION
+
+# 1回に読み込む行数（スクロールして末尾に近づくと次の分を読み込む）
+PAGE_SIZE = 200
+
+# 利用者番号の入力が止まってから絞り込むまでの時間（ミリ秒）
+FILTER_DELAY_MS = 300
+
+# 結果ファイルと、表示するデータベースの結果の種類
+RESULT_FILE_KINDS = {
+    "reservation_info.txt": KIND_LOTTERY_STATUS,
+    "r_info.txt": KIND_RESERVATION,
+    "expiry.txt": KIND_EXPIRY,
+    "lottery_results.txt": KIND_CONFIRMATION,
+}
+
+# 表示する列（見出し, results テーブルの列, 並べ替えに使う列）
+COLUMNS = (
+    ("利用者番号", "account", "account"),
+    ("氏名", "name", "name"),
+    ("状態", "status", "status"),
+    ("内容", "detail", "detail"),
+    ("利用日", "use_date", "date_key"),
+    ("時刻", "use_time", "use_time"),
+    ("施設", "facility", "facility"),
+    ("有効期限", "expiry", "expiry"),
+    ("処理時間", "elapsed", "elapsed"),
+)
+
+# 状態の表示名
+STATUS_LABELS = {
+    'ok': "取得済み",
+    'none': "なし",
+    'display_error': "表示エラー",
+    'login_failed': "ログイン失敗",
+    'error': "エラー",
+    'confirmed': "確定成功",
+    'confirmed_no_popup': "確定成功（確認画面なし）",
+    'confirm_error': "確定エラー",
+    'no_results': "当選なし",
+    'no_table': "当選結果なし",
+    'menu_error': "メニューエラー",
+}
+
+
+def open_result_db(path):
+    """結果のデータベースを読み取り専用で開く（タスクの実行中でも読み取れる）"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def has_results(path, kind):
+    """データベースに kind の結果が記録されているかを返す"""
+    conn = open_result_db(path)
+    try:
+        return conn.execute("SELECT 1 FROM results WHERE kind = ? LIMIT 1", (kind,)).fetchone() is not None
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    1回の実行の結果をデータベースから PAGE_SIZE 行ずつ読み込むモデル。
+    並べ替えと絞り込みはSQL（ORDER BY / WHERE）で行い、インデックスを使って先頭のページだけを読み直します。
+    """
+
+    def __init__(self, conn, kind, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.kind = kind
+        self.run_id = None
+        self.filters = {}
+        self.order = "seq, id"
+        self.total = 0
+        self._rows = []
+
+    def _where(self):
+        clauses = ["run_id = ?", "kind = ?"]
+        parameters = [self.run_id, self.kind]
+        if self.filters.get('account'):
+            # 前方一致（LIKE ではインデックスが使えないため範囲で指定する）
+            clauses.append("account >= ? AND account < ?")
+            parameters += [self.filters['account'], self.filters['account'] + "\uffff"]
+        for name in ('date_key', 'use_time', 'status'):
+            if self.filters.get(name) is not None:
+                clauses.append(f"{name} = ?")
+                parameters.append(self.filters[name])
+        return " AND ".join(clauses), parameters
+
+    def refresh(self):
+        """条件を変えた後に、件数と先頭のページを読み直す"""
+        self.beginResetModel()
+        self._rows = []
+        self.total = 0
+        if self.run_id is not None:
+            where, parameters = self._where()
+            self.total = self.conn.execute(f"SELECT COUNT(*) FROM results WHERE {where}", parameters).fetchone()[0]
+            self._rows = self._load(0, PAGE_SIZE)
+        self.endResetModel()
+
+    def _load(self, offset, limit):
+        where, parameters = self._where()
+        return self.conn.execute(
+            f"SELECT * FROM results WHERE {where} ORDER BY {self.order} LIMIT ? OFFSET ?",
+            parameters + [limit, offset],
+        ).fetchall()
+
+    def set_filter(self, name, value):
+        """絞り込みの条件を設定する（Noneまたは空文字で解除）"""
+        self.filters[name] = value if value not in ("", None) else None
+        self.refresh()
+
+    def distinct_values(self, column):
+        """表示中の実行で column がとる値を (値, date_key) のリストで返す（絞り込みの候補）"""
+        if self.run_id is None:
+            return []
+        key = "date_key" if column == "use_date" else column
+        return [tuple(row) for row in self.conn.execute(
+            f"SELECT DISTINCT {column}, {key} FROM results WHERE run_id = ? AND kind = ? AND {column} IS NOT NULL"
+            f" ORDER BY {key}",
+            (self.run_id, self.kind),
+        )]
+
+    def runs(self):
+        """この種類の結果がある実行を新しい順に (run_id, 開始日時) のリストで返す"""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT run_id, started_at FROM runs WHERE run_id IN (SELECT DISTINCT run_id FROM results WHERE kind = ?)"
+            " ORDER BY run_id DESC",
+            (self.kind,),
+        )]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and len(self._rows) < self.total
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        rows = self._load(len(self._rows), min(PAGE_SIZE, self.total - len(self._rows)))
+        if not rows:
+            # 読み込みの間に件数が変わった場合
+            self.total = len(self._rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        value = self._rows[index.row()][COLUMNS[index.column()][1]]
+        if value is None:
+            return ""
+        column = COLUMNS[index.column()][1]
+        if column == "status":
+            return STATUS_LABELS.get(value, value)
+        if column == "elapsed":
+            return f"{value:.1f}秒"
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return section + 1
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        direction = "DESC" if order == Qt.DescendingOrder else "ASC"
+        self.order = f"{COLUMNS[column][2]} {direction}, seq, id"
+        self.refresh()
+
+
+class ResultViewer(QMainWindow):
+    """結果を実行ごとに表で表示し、利用者番号・利用日・時刻・状態で絞り込むウィンドウ"""
+
+    def __init__(self, db_path, kind, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setGeometry(200, 200, 1000, 600)
+        self.model = ResultTableModel(open_result_db(db_path), kind, self)
+
+        central = QWidget()
+        layout = QVBoxLayout()
+
+        # 実行の選択
+        run_layout = QHBoxLayout()
+        run_layout.addWidget(QLabel("実行:"))
+        self.run_combo = QComboBox()
+        for run_id, started_at in self.model.runs():
+            self.run_combo.addItem(f"{started_at}（#{run_id}）", run_id)
+        self.run_combo.currentIndexChanged.connect(self.change_run)
+        run_layout.addWidget(self.run_combo, 1)
+        layout.addLayout(run_layout)
+
+        # 絞り込み
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("利用者番号:"))
+        self.account_input = QLineEdit()
+        self.account_input.setPlaceholderText("前方一致")
+        filter_layout.addWidget(self.account_input)
+        self.account_timer = QTimer(self)
+        self.account_timer.setSingleShot(True)
+        self.account_timer.setInterval(FILTER_DELAY_MS)
+        self.account_timer.timeout.connect(lambda: self.apply_filter('account', self.account_input.text().strip()))
+        self.account_input.textChanged.connect(self.account_timer.start)
+
+        self.filter_combos = {}
+        for label, name in (("利用日:", 'date_key'), ("時刻:", 'use_time'), ("状態:", 'status')):
+            filter_layout.addWidget(QLabel(label))
+            combo = QComboBox()
+            combo.currentIndexChanged.connect(lambda _, name=name, combo=combo: self.apply_filter(name, combo.currentData()))
+            filter_layout.addWidget(combo)
+            self.filter_combos[name] = combo
+        layout.addLayout(filter_layout)
+
+        # 結果の表（スクロールに合わせて読み込む）
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+        self.model.modelReset.connect(self.update_count)
+        self.model.rowsInserted.connect(self.update_count)
+
+        central.setLayout(layout)
+        self.setCentralWidget(central)
+
+        self.change_run()
+
+    def change_run(self):
+        """選択した実行の結果を表示し、絞り込みの候補を作り直す"""
+        self.model.filters = {}
+        self.model.run_id = self.run_combo.currentData()
+        for name, combo in self.filter_combos.items():
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem("すべて", None)
+            column = "use_date" if name == 'date_key' else name
+            for value, key in self.model.distinct_values(column):
+                combo.addItem(STATUS_LABELS.get(value, value) if name == 'status' else value, key)
+            combo.blockSignals(False)
+        self.account_input.blockSignals(True)
+        self.account_input.clear()
+        self.account_input.blockSignals(False)
+        self.model.refresh()
+
+    def apply_filter(self, name, value):
+        self.model.set_filter(name, value)
+
+    def update_count(self):
+        self.count_label.setText(f"{self.model.total}件（{self.model.rowCount()}件を読み込み済み）")
+
+    def closeEvent(self, event):
+        self.model.conn.close()
+        super().closeEvent(event)
@@ -1,13 +1,35 @@
 """ヘルパー関数モジュール"""
 import os
-from PyQt5.QtCore import QStandardPaths
+import sys
+
+
+def get_documents_dir():
+    """
+    ユーザーのドキュメントディレクトリを取得する。
+    画面（PyQt5）を使っている場合はQtの設定に従い、コマンドラインから実行した場合はPyQt5を読み込まずに求めます。
+    """
+    if "PyQt5.QtCore" in sys.modules:
+        from PyQt5.QtCore import QStandardPaths
+        return QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
+
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+            buffer = ctypes.create_unicode_buffer(wintypes.MAX_PATH)
+            # CSIDL_PERSONAL（ドキュメント）。OneDrive等に移動されていても正しい場所を返す
+            if ctypes.windll.shell32.SHGetFolderPathW(None, 5, None, 0, buffer) == 0 and buffer.value:
+                return buffer.value
+        except Exception:
+            pass
+    return os.path.join(os.path.expanduser("~"), "Documents")
 
 
 def get_writable_dir():
     """書き込み可能なディレクトリを取得する"""
     try:
         # ユーザーのドキュメントディレクトリを試す
-        docs_dir = QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
+        docs_dir = get_documents_dir()
         app_dir = os.path.join(docs_dir, "JohokuTennisApp")
 
         # ディレクトリが存在しない場合は作成
@@ -0,0 +1,174 @@
+"""HTML解析モジュール（標準ライブラリのみで簡易的なDOMを構築する）"""
+import re
+from html.parser import HTMLParser
+
+# 閉じタグを持たない要素
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# 閉じタグが省略されることがある要素と、それを暗黙的に閉じる要素
+IMPLICIT_CLOSE = {
+    'tr': {'tr'},
+    'td': {'td', 'th', 'tr'},
+    'th': {'td', 'th', 'tr'},
+    'li': {'li'},
+    'option': {'option'},
+    'p': {'p', 'div', 'table', 'ul', 'ol', 'form'},
+}
+
+# テキスト化の際に改行として扱う要素
+BLOCK_ELEMENTS = {
+    'br', 'div', 'p', 'tr', 'li', 'table', 'tbody', 'thead',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'form', 'ul', 'ol'
+}
+
+
+class Element:
+    """HTML要素を表すクラス"""
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+
+    def get(self, name, default=None):
+        """属性値を取得する"""
+        value = self.attrs.get(name)
+        return default if value is None else value
+
+    @property
+    def id(self):
+        return self.attrs.get('id')
+
+    @property
+    def classes(self):
+        return (self.attrs.get('class') or '').split()
+
+    def iter(self):
+        """自身を含む全ての子孫要素を文書順に返す"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Element):
+                yield node
+                stack.extend(reversed(node.children))
+
+    def find_all(self, tag=None, id=None, class_name=None, attrs=None):
+        """条件に一致する子孫要素をすべて返す"""
+        results = []
+        for element in self.iter():
+            if element is self:
+                continue
+            if tag and element.tag != tag:
+                continue
+            if id and element.id != id:
+                continue
+            if class_name and class_name not in element.classes:
+                continue
+            if attrs and any(element.attrs.get(k) != v for k, v in attrs.items()):
+                continue
+            results.append(element)
+        return results
+
+    def find(self, tag=None, id=None, class_name=None, attrs=None):
+        """条件に一致する最初の子孫要素を返す（見つからない場合はNone）"""
+        found = self.find_all(tag, id, class_name, attrs)
+        return found[0] if found else None
+
+    def child_elements(self, tag=None):
+        """直下の子要素を返す"""
+        return [c for c in self.children if isinstance(c, Element) and (tag is None or c.tag == tag)]
+
+    def ancestor(self, tag):
+        """指定したタグの最も近い祖先要素を返す"""
+        node = self.parent
+        while node is not None:
+            if node.tag == tag:
+                return node
+            node = node.parent
+        return None
+
+    def following_siblings(self, tag=None):
+        """後ろに続く兄弟要素を返す"""
+        if self.parent is None:
+            return []
+        siblings = self.parent.child_elements()
+        index = siblings.index(self)
+        return [s for s in siblings[index + 1:] if tag is None or s.tag == tag]
+
+    @property
+    def text(self):
+        """Seleniumの.textに近い形で表示テキストを返す"""
+        parts = []
+        self._collect_text(parts)
+        text = ''.join(parts)
+        lines = [re.sub(r'[ \t\r\f\v　]+', ' ', line).strip() for line in text.split('\n')]
+        return '\n'.join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        if self.tag in ('script', 'style', 'template'):
+            return
+        if self.tag in BLOCK_ELEMENTS:
+            parts.append('\n')
+        for child in self.children:
+            if isinstance(child, Element):
+                child._collect_text(parts)
+            else:
+                parts.append(child.replace('\n', ' '))
+        if self.tag in BLOCK_ELEMENTS or self.tag in ('td', 'th'):
+            parts.append('\n' if self.tag in BLOCK_ELEMENTS else ' ')
+
+    def __repr__(self):
+        return f"<Element {self.tag} id={self.id!r} class={self.attrs.get('class')!r}>"
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element('#document')
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        # 閉じタグが省略された要素を暗黙的に閉じる
+        closers = [t for t, triggers in IMPLICIT_CLOSE.items() if tag in triggers]
+        if closers:
+            node = self.current
+            while node is not None and node is not self.root:
+                if node.tag in closers:
+                    self.current = node.parent
+                elif node.tag in ('table', 'tbody', 'thead', 'ul', 'ol', 'select', 'div'):
+                    break
+                node = node.parent
+
+        element = Element(tag, attrs, self.current)
+        self.current.children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.current = element
+
+    def handle_startendtag(self, tag, attrs):
+        element = Element(tag, attrs, self.current)
+        self.current.children.append(element)
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not None and node is not self.root:
+            if node.tag == tag:
+                self.current = node.parent
+                return
+            node = node.parent
+        # 対応する開始タグがない閉じタグは無視する
+
+    def handle_data(self, data):
+        if data:
+            self.current.children.append(data)
+
+
+def parse_html(html):
+    """HTML文字列を解析してルート要素を返す"""
+    builder = _TreeBuilder()
+    builder.feed(html or '')
+    builder.close()
+    return builder.root
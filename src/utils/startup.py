@@ -0,0 +1,53 @@
+"""起動時間を計測するモジュール（標準ライブラリのみを使い、最初に読み込む）"""
+import os
+import sys
+import time
+import threading
+from datetime import datetime
+
+# 起動時間の記録ファイル（1回の起動につき1行追記する）
+STARTUP_LOG_FILE = "startup_timing.log"
+
+
+class StartupTimer:
+    """起動処理の各段階までの経過時間を記録するクラス"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self._lock = threading.Lock()
+        self._written = False
+
+    def mark(self, name):
+        """起動からの経過時間を記録する"""
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self):
+        """記録した経過時間を1行の文字列にまとめる"""
+        with self._lock:
+            marks = list(self.marks)
+        return " / ".join(f"{name}: {elapsed:.3f}秒" for name, elapsed in marks)
+
+    def write_report(self, directory=None):
+        """記録を起動時間の記録ファイルに追記する（環境変数 JOHOKU_STARTUP_TIMING があれば画面にも表示）"""
+        with self._lock:
+            if self._written:
+                return
+            self._written = True
+
+        line = f"{datetime.now():%Y-%m-%d %H:%M:%S}\t{self.report()}"
+        if os.environ.get("JOHOKU_STARTUP_TIMING"):
+            print(f"[起動時間] {line}", file=sys.stderr)
+        try:
+            if directory is None:
+                from .helpers import get_writable_dir
+                directory = get_writable_dir()
+            with open(os.path.join(directory, STARTUP_LOG_FILE), "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+        except Exception:
+            pass
+
+
+# アプリ全体で共有する計測器（このモジュールを読み込んだ時点を起点とする）
+startup_timer = StartupTimer()